@@ -1,9 +1,9 @@
 from typing import List
 
 from genyrator import create_entity, create_column, TypeOption, create_identifier_column, create_relationship, \
-    JoinOption
+    JoinOption, LoadingStrategy
 from genyrator.entities.Column import ForeignKeyRelationship
-from genyrator.entities.Entity import all_operations, Entity, create_api_path
+from genyrator.entities.Entity import all_operations, Entity, OperationOption, create_api_path
 from genyrator.entities.Schema import create_schema, Schema
 
 book_entity = create_entity(
@@ -34,6 +34,7 @@ book_entity = create_entity(
             foreign_key_relationship=ForeignKeyRelationship(
                 target_entity='author',
                 target_entity_identifier_column_type=TypeOption.UUID,
+                sqlalchemy_options={'ondelete': '"SET NULL"'},
             ),
         ),
         create_column(
@@ -111,7 +112,7 @@ book_entity = create_entity(
             secondary_join_name='book2_id',
         ),
     ],
-    operations=all_operations,
+    operations=all_operations | {OperationOption.export_all, OperationOption.import_all, OperationOption.delete_all},
     api_paths=[
         create_api_path(
             joined_entities=[
@@ -126,6 +127,9 @@ book_entity = create_entity(
             route='author',
         )
     ],
+    default_page_size=50,
+    max_page_size=500,
+    version_column='updated',
 )
 
 related_book = create_entity(
@@ -135,10 +139,11 @@ related_book = create_entity(
     ),
     columns=[
         create_column(
-            name='book1_id', type_option=TypeOption.int,
+            name='book1_id', type_option=TypeOption.int, index=False,
             foreign_key_relationship=ForeignKeyRelationship(
                 target_entity='book',
                 target_entity_identifier_column_type=TypeOption.UUID,
+                sqlalchemy_options={'ondelete': '"CASCADE"'},
             ),
         ),
         create_column(
@@ -146,6 +151,7 @@ related_book = create_entity(
             foreign_key_relationship=ForeignKeyRelationship(
                 target_entity='book',
                 target_entity_identifier_column_type=TypeOption.UUID,
+                sqlalchemy_options={'ondelete': '"CASCADE"'},
             ),
         ),
     ],
@@ -173,6 +179,8 @@ related_book = create_entity(
             join=JoinOption.to_one,
         ),
     ],
+    # Serves lookups of book1_id as well as of both books
+    indexes=[['book1_id', 'book2_id']],
 )
 
 author_entity = create_entity(
@@ -190,6 +198,7 @@ author_entity = create_entity(
             foreign_key_relationship=ForeignKeyRelationship(
                 target_entity='author',
                 target_entity_identifier_column_type=TypeOption.UUID,
+                sqlalchemy_options={'ondelete': '"SET NULL"'},
             ),
         ),
         create_column(
@@ -197,6 +206,7 @@ author_entity = create_entity(
             foreign_key_relationship=ForeignKeyRelationship(
                 target_entity='author',
                 target_entity_identifier_column_type=TypeOption.UUID,
+                sqlalchemy_options={'ondelete': '"SET NULL"'},
             ),
         ),
     ],
@@ -210,8 +220,9 @@ author_entity = create_entity(
             nullable=False,
             lazy=False,
             join=JoinOption.to_many,
+            loading=LoadingStrategy.selectin,
             property_name='books',
-            cascade='all',
+            passive_deletes=True,
         ),
         create_relationship(
             target_entity_class_name='Book',
@@ -223,6 +234,7 @@ author_entity = create_entity(
             lazy=False,
             join=JoinOption.to_one,
             property_name='favourite_book',
+            passive_deletes=True,
         ),
         create_relationship(
             target_entity_class_name='Book',
@@ -233,7 +245,9 @@ author_entity = create_entity(
             nullable=True,
             lazy=False,
             join=JoinOption.to_many,
+            loading=LoadingStrategy.selectin,
             property_name='collaborations',
+            passive_deletes=True,
         ),
         create_relationship(
             target_entity_class_name='Author',
@@ -245,6 +259,7 @@ author_entity = create_entity(
             lazy=True,
             join=JoinOption.to_many,
             property_name='favourite_of',
+            passive_deletes=True,
         ),
         create_relationship(
             target_entity_class_name='Author',
@@ -268,6 +283,7 @@ author_entity = create_entity(
             lazy=True,
             join=JoinOption.to_many,
             property_name='hated_by',
+            passive_deletes=True,
         ),
         create_relationship(
             target_entity_class_name='Author',
@@ -293,6 +309,7 @@ author_entity = create_entity(
             endpoint='author-books',
         ),
     ],
+    max_expand_depth=2,
 )
 
 review_entity = create_entity(
@@ -310,6 +327,7 @@ review_entity = create_entity(
             foreign_key_relationship=ForeignKeyRelationship(
                 target_entity='book',
                 target_entity_identifier_column_type=TypeOption.UUID,
+                sqlalchemy_options={'ondelete': '"CASCADE"'},
             ),
         )
     ],
@@ -339,6 +357,7 @@ genre_entity = create_entity(
     relationships=[
         create_relationship(
             target_entity_class_name='Book', nullable=True, lazy=False, join=JoinOption.to_many,
+            loading=LoadingStrategy.selectin,
             join_table='book_genre', target_identifier_column_name='book_id',
             source_identifier_column_name='genre_id'
         ),
@@ -354,6 +373,7 @@ book_genre_entity = create_entity(
             foreign_key_relationship=ForeignKeyRelationship(
                 target_entity='book',
                 target_entity_identifier_column_type=TypeOption.UUID,
+                sqlalchemy_options={'ondelete': '"CASCADE"'},
             ),
         ),
         create_column(
@@ -361,6 +381,7 @@ book_genre_entity = create_entity(
             foreign_key_relationship=ForeignKeyRelationship(
                 target_entity='genre',
                 target_entity_identifier_column_type=TypeOption.UUID,
+                sqlalchemy_options={'ondelete': '"CASCADE"'},
             ),
         ),
     ],
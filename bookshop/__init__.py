@@ -1,9 +1,12 @@
 from flask_marshmallow import Marshmallow
 from bookshop.resources import api
 from bookshop.config import config
+from bookshop.sqlalchemy import enable_sqlite_foreign_keys
 from bookshop.sqlalchemy import db
 
 app = config()
 db.init_app(app)
+with app.app_context():
+    enable_sqlite_foreign_keys(db.engine)
 ma = Marshmallow(app)
-api.init_app(app)
+api.init_app(app)
\ No newline at end of file
@@ -0,0 +1,39 @@
+import datetime
+import hashlib
+import json
+from typing import Any, Dict
+
+from flask import request
+from werkzeug.http import http_date, parse_date, quote_etag, unquote_etag
+
+
+def cache_validators(version: Any, *state: Any, last_modified: bool = True) -> Dict[str, str]:
+    """The ETag of a response built from rows last changed at `version`
+
+    The ETag also covers `state` and the query string, as `fields`, `expand`
+    and paging change the body. Datetime versions also give a Last-Modified,
+    unless the response can change without its version changing.
+    """
+    key = json.dumps([str(version), *[str(value) for value in state], request.query_string.decode()])
+    headers = {'ETag': quote_etag(hashlib.sha1(key.encode()).hexdigest(), weak=True)}
+    if last_modified and isinstance(version, datetime.datetime):
+        # Versions are naive UTC timestamps, such as `datetime.datetime.utcnow()`
+        headers['Last-Modified'] = http_date(version.replace(tzinfo=datetime.timezone.utc))
+    return headers
+
+
+def response_validators(body: Any) -> Dict[str, str]:
+    """The ETag of a response built from rows which change without a version, from the body itself"""
+    key = json.dumps(body, sort_keys=True, default=str)
+    return {'ETag': quote_etag(hashlib.sha1(key.encode()).hexdigest(), weak=True)}
+
+
+def not_modified(headers: Dict[str, str]) -> bool:
+    """Whether the request's If-None-Match or If-Modified-Since matches `headers`"""
+    if request.if_none_match:
+        etag, _ = unquote_etag(headers['ETag'])
+        return request.if_none_match.contains_weak(etag)
+    last_modified = headers.get('Last-Modified')
+    if last_modified is None or request.if_modified_since is None:
+        return False
+    return parse_date(last_modified) <= request.if_modified_since
\ No newline at end of file
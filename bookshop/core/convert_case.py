@@ -1,9 +1,97 @@
+import functools
+
 import inflection
 
+_JSON_NAMES = {
+    'author': 'author',
+    'author_id': 'authorId',
+    'book': 'book',
+    'book1': 'book1',
+    'book1_id': 'book1Id',
+    'book2': 'book2',
+    'book2_id': 'book2Id',
+    'book_genre_id': 'bookGenreId',
+    'book_id': 'bookId',
+    'books': 'books',
+    'collaborations': 'collaborations',
+    'collaborator': 'collaborator',
+    'collaborator_id': 'collaboratorId',
+    'created': 'created',
+    'favourite_author': 'favouriteAuthor',
+    'favourite_author_id': 'favouriteAuthorId',
+    'favourite_book': 'favouriteBook',
+    'favourite_of': 'favouriteOf',
+    'genre': 'genre',
+    'genre_id': 'genreId',
+    'hated_author': 'hatedAuthor',
+    'hated_author_id': 'hatedAuthorId',
+    'hated_by': 'hatedBy',
+    'id': 'id',
+    'name': 'name',
+    'published': 'published',
+    'rating': 'rating',
+    'related_book_uuid': 'relatedBookUuid',
+    'related_books': 'relatedBooks',
+    'review_id': 'reviewId',
+    'reviews': 'reviews',
+    'text': 'text',
+    'title': 'title',
+    'updated': 'updated',
+}
 
-def to_json_name(x: str) -> str:
+_PYTHON_NAMES = {
+    'author': 'author',
+    'authorId': 'author_id',
+    'book': 'book',
+    'book1': 'book1',
+    'book1Id': 'book1_id',
+    'book2': 'book2',
+    'book2Id': 'book2_id',
+    'bookGenreId': 'book_genre_id',
+    'bookId': 'book_id',
+    'books': 'books',
+    'collaborations': 'collaborations',
+    'collaborator': 'collaborator',
+    'collaboratorId': 'collaborator_id',
+    'created': 'created',
+    'favouriteAuthor': 'favourite_author',
+    'favouriteAuthorId': 'favourite_author_id',
+    'favouriteBook': 'favourite_book',
+    'favouriteOf': 'favourite_of',
+    'genre': 'genre',
+    'genreId': 'genre_id',
+    'hatedAuthor': 'hated_author',
+    'hatedAuthorId': 'hated_author_id',
+    'hatedBy': 'hated_by',
+    'id': 'id',
+    'name': 'name',
+    'published': 'published',
+    'rating': 'rating',
+    'relatedBookUuid': 'related_book_uuid',
+    'relatedBooks': 'related_books',
+    'reviewId': 'review_id',
+    'reviews': 'reviews',
+    'text': 'text',
+    'title': 'title',
+    'updated': 'updated',
+}
+
+
+@functools.lru_cache(maxsize=1024)
+def _camelize(x: str) -> str:
     return inflection.camelize(x, False)
 
 
-def to_python_name(x: str) -> str:
+@functools.lru_cache(maxsize=1024)
+def _underscore(x: str) -> str:
     return inflection.underscore(x)
+
+
+def to_json_name(x: str) -> str:
+    json_name = _JSON_NAMES.get(x)
+    return json_name if json_name is not None else _camelize(x)
+
+
+def to_python_name(x: str) -> str:
+    python_name = _PYTHON_NAMES.get(x)
+    return python_name if python_name is not None else _underscore(x)
\ No newline at end of file
@@ -0,0 +1,15 @@
+from flask import abort, request
+
+
+def expand_depth(default: int, maximum: int) -> int:
+    """The number of levels of eager relationships requested by `expand`"""
+    expand = request.args.get('expand')
+    if expand is None:
+        return default
+    try:
+        depth = int(expand)
+    except ValueError:
+        abort(400, 'expand must be an integer')
+    if depth < 0:
+        abort(400, 'expand cannot be negative')
+    return min(depth, maximum)
\ No newline at end of file
@@ -0,0 +1,20 @@
+from typing import Collection, List, Optional
+
+from flask import abort, request
+
+
+def requested_fields(allowed: Collection[str]) -> Optional[List[str]]:
+    """The JSON keys requested by `fields`, or None to return every key"""
+    values = request.args.getlist('fields')
+    if not values:
+        return None
+    fields = [field.strip() for value in values for field in value.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        abort(400, 'Unknown fields: {}'.format(', '.join(unknown)))
+    return fields
+
+
+def fields_mask(fields: Optional[List[str]]) -> Optional[str]:
+    """A Flask-RESTX mask which only marshals the requested keys"""
+    return '{{{}}}'.format(','.join(fields)) if fields is not None else None
\ No newline at end of file
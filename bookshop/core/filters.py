@@ -0,0 +1,53 @@
+import datetime
+import operator
+from typing import Any, Callable, Dict, List, Optional
+
+from flask import abort, request
+
+COMPARISONS: Dict[str, Callable[[Any, Any], Any]] = {
+    'lt':  operator.lt,
+    'lte': operator.le,
+    'gt':  operator.gt,
+    'gte': operator.ge,
+}
+
+CONVERTERS: Dict[str, Callable[[str], Any]] = {
+    'string':   str,
+    'int':      int,
+    'float':    float,
+    'date':     datetime.date.fromisoformat,
+    'datetime': datetime.datetime.fromisoformat,
+}
+
+
+def filter_by_operators(query: Any, column: Any, name: str, type_name: str, operators: List[str]) -> Any:
+    """Filter a query by the `name[operator]=value` arguments of the query string
+
+    Values are converted to the type of the column so that the database can
+    compare them with an index range scan.
+    """
+    for operator_name in operators:
+        value = request.args.get('{}[{}]'.format(name, operator_name))
+        if value is None:
+            continue
+        if operator_name == 'prefix':
+            # A range rather than LIKE, so that the column's index serves it
+            query = query.filter(column >= value)
+            upper_bound = _after_prefix(value)
+            if upper_bound is not None:
+                query = query.filter(column < upper_bound)
+            continue
+        try:
+            converted = CONVERTERS[type_name](value)
+        except ValueError:
+            abort(400, 'Invalid value for {}[{}]'.format(name, operator_name))
+        query = query.filter(COMPARISONS[operator_name](column, converted))
+    return query
+
+
+def _after_prefix(prefix: str) -> Optional[str]:
+    """The smallest string which is larger than every string starting with `prefix`"""
+    prefix = prefix.rstrip(chr(0x10FFFF))
+    if not prefix:
+        return None
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
\ No newline at end of file
@@ -0,0 +1,127 @@
+import base64
+import binascii
+import datetime
+import json
+import uuid
+from typing import Any, List, Mapping, Optional, Tuple, Type, Union
+from urllib.parse import urlencode
+
+from flask import abort, request
+from sqlalchemy import tuple_
+
+
+def encode_cursor(values: List[Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor: str, types: Tuple[Union[Type, Tuple[Type, ...]], ...]) -> List[Any]:
+    """Return the values in a cursor, aborting if it was not created by `encode_cursor`"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        abort(400, 'Invalid cursor')
+    if not isinstance(values, list) or len(values) != len(types) or \
+            not all(isinstance(value, t) for value, t in zip(values, types)):
+        abort(400, 'Invalid cursor')
+    return values
+
+
+def page_size(default: Optional[int], maximum: Optional[int]) -> Optional[int]:
+    """The number of rows requested by `limit`, or None to return every row"""
+    limit = request.args.get('limit')
+    if limit is None:
+        return default if default is not None else maximum
+    try:
+        size = int(limit)
+    except ValueError:
+        abort(400, 'limit must be an integer')
+    if size < 1:
+        abort(400, 'limit must be at least 1')
+    return min(size, maximum) if maximum is not None else size
+
+
+def total_count_requested() -> bool:
+    """Whether `total_count=true` asks for the number of matching rows in `X-Total-Count`"""
+    requested = request.args.get('total_count', 'false').lower()
+    if requested not in ('true', 'false'):
+        abort(400, 'total_count must be true or false')
+    return requested == 'true'
+
+
+def next_page_url(cursor: str) -> str:
+    args = request.args.copy()
+    args['cursor'] = cursor
+    return '{}?{}'.format(request.base_url, urlencode(list(args.items(multi=True))))
+
+
+def sort_order(sortable: Mapping[str, Any]) -> Tuple[Optional[str], bool]:
+    """The key requested by `sort`, which is descending if it starts with `-`"""
+    sort = request.args.get('sort')
+    if sort is None:
+        return None, False
+    descending = sort.startswith('-')
+    key = sort[1:] if descending else sort
+    if key not in sortable:
+        abort(400, 'Cannot sort by {}'.format(key))
+    return key, descending
+
+
+def read_page(query: Any, columns: List[Any], descending: bool, size: Optional[int]) -> Tuple[List[Any], Optional[str]]:
+    """Read the rows after the requested `cursor` in the order of `columns`
+
+    The last column must be unique so that every row has its own place in the
+    order. With a size this is an `ORDER BY ... LIMIT` query, which an index on
+    the columns serves without sorting the table. Returns the rows and the URL
+    of the next page, if there is one.
+    """
+    cursor = request.args.get('cursor')
+    if cursor is not None:
+        values = decode_cursor(cursor, tuple(_cursor_type(column) for column in columns))
+        after = [_from_cursor(column, value) for column, value in zip(columns, values)]
+        if len(columns) == 1:
+            position, after_position = columns[0], after[0]
+        else:
+            position, after_position = tuple_(*columns), tuple_(*after)
+        query = query.filter(position < after_position if descending else position > after_position)
+    query = query.order_by(*[column.desc() if descending else column for column in columns])
+    if size is not None:
+        query = query.limit(size + 1)
+    result = query.all()
+    if size is None or len(result) <= size:
+        return result, None
+    result = result[:size]
+    return result, next_page_url(encode_cursor([_to_cursor(getattr(result[-1], column.key)) for column in columns]))
+
+
+def _python_type(column: Any) -> Type:
+    column_type = column.type
+    try:
+        # Variants, such as the BigInteger primary keys, defer to the type they wrap
+        return getattr(column_type, 'impl', column_type).python_type
+    except NotImplementedError:
+        return str
+
+
+def _cursor_type(column: Any) -> Union[Type, Tuple[Type, ...]]:
+    python_type = _python_type(column)
+    if python_type is float:
+        return (int, float)
+    return python_type if python_type in (int, str) else str
+
+
+def _to_cursor(value: Any) -> Any:
+    if isinstance(value, (datetime.date, uuid.UUID)):
+        return str(value) if isinstance(value, uuid.UUID) else value.isoformat()
+    return value
+
+
+def _from_cursor(column: Any, value: Any) -> Any:
+    python_type = _python_type(column)
+    try:
+        if python_type in (datetime.date, datetime.datetime):
+            return python_type.fromisoformat(value)
+        if python_type is uuid.UUID:
+            return uuid.UUID(value)
+    except ValueError:
+        abort(400, 'Invalid cursor')
+    return value
\ No newline at end of file
@@ -2,13 +2,17 @@ import uuid
 from typing import Optional
 
 from flask import request, abort, url_for
-from flask_restx import Resource, fields, Namespace
-from sqlalchemy.orm import joinedload
-from sqlalchemy.orm import noload
+from flask_restx import Resource, fields, Namespace, marshal
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload, load_only, noload, selectinload
 
 from bookshop.core.convert_dict import (
     python_dict_to_json_dict, json_dict_to_python_dict
 )
+from bookshop.core.expand import expand_depth
+from bookshop.core.fields import fields_mask, requested_fields
+from bookshop.core.filters import filter_by_operators
+from bookshop.core.pagination import page_size, read_page, sort_order, total_count_requested
 from bookshop.sqlalchemy import db
 from bookshop.sqlalchemy.model import Author
 from bookshop.sqlalchemy.convert_properties import (
@@ -16,7 +20,11 @@ from bookshop.sqlalchemy.convert_properties import (
 )
 from bookshop.schema import AuthorSchema
 from bookshop.sqlalchemy.model_to_dict import model_to_dict
-from bookshop.sqlalchemy.convert_dict_to_marshmallow_result import convert_dict_to_marshmallow_result
+from bookshop.sqlalchemy.serializers import author_loader_options, serialize_author
+from bookshop.sqlalchemy.identifier_cache import retry_with_fresh_identifiers
+from bookshop.sqlalchemy.convert_dict_to_marshmallow_result import (
+    convert_dict_to_marshmallow_result, flush_instance,
+)
 from bookshop.domain.Author import author as author_domain_model
 
 api = Namespace('authors',
@@ -37,36 +45,102 @@ author_schema = AuthorSchema()
 authors_many_schema = AuthorSchema(many=True)
 
 
+def _apply_filters(query):  # type: ignore
+    """Filter a query by the columns given in the query string"""
+    param_author_id = request.args.getlist('author_id')
+    if param_author_id:
+        query = query.filter(Author.author_id.in_(param_author_id))
+    param_name = request.args.getlist('name')
+    if param_name:
+        query = query.filter(Author.name.in_(param_name))
+    query = filter_by_operators(
+        query, Author.name, 'name', 'string',
+        ['lt', 'lte', 'gt', 'gte', 'prefix'],
+    )
+    param_favourite_author_id = request.args.getlist('favourite_author_id')
+    if param_favourite_author_id:
+        query = query.filter(Author.favourite_author_id.in_(param_favourite_author_id))
+    param_hated_author_id = request.args.getlist('hated_author_id')
+    if param_hated_author_id:
+        query = query.filter(Author.hated_author_id.in_(param_hated_author_id))
+    return query
+
+
+author_field_columns = {
+    'id': 'author_id',
+    'name': 'name',
+    'favouriteAuthor': 'favourite_author_id',
+    'hatedAuthor': 'hated_author_id',
+}
+author_field_relationships = {
+    'books': 'books',
+    'favouriteBook': 'favourite_book',
+    'collaborations': 'collaborations',
+}
+author_field_names = set(author_field_columns) | set(author_field_relationships)
+author_sortable_columns = {
+    'id': Author.author_id,
+    'name': Author.name,
+}
+
+
+def _total_count_header():  # type: ignore
+    """Count the rows matching the filters with `count(*)`, without loading them"""
+    count = _apply_filters(db.session.query(func.count()).select_from(Author)).scalar()
+    return {'X-Total-Count': str(count)}
+
+
+def _loader_options(depth, selected_fields):  # type: ignore
+    """Loader options which only load the requested fields and the relationships serialized `depth` levels deep"""
+    if selected_fields is None:
+        return author_loader_options(depth)
+    columns = [
+        getattr(Author, author_field_columns[field])
+        for field in selected_fields if field in author_field_columns
+    ]
+    return [
+        load_only(Author.id, *columns),
+        *[
+            noload(getattr(Author, relationship))
+            for field, relationship in author_field_relationships.items() if field not in selected_fields
+        ],
+        *author_loader_options(depth, selected_fields),
+    ]
+
+
 @api.route('/author/<authorId>', endpoint='author_by_id')  # noqa: E501
 class AuthorResource(Resource):  # type: ignore
     @api.doc(id='get-author-by-id', responses={401: 'Unauthorised', 404: 'Not Found'})  # noqa: E501
-    @api.marshal_with(author_model)
+    @api.response(200, 'Success', author_model)
     def get(self, authorId):  # type: ignore
+        selected_fields = requested_fields(author_field_names)
+        depth = expand_depth(1, 2)
         id_validation_errors = author_schema.validate({
           'author_id': authorId
         }, session=db.session, partial=True)
         if id_validation_errors:
             abort(404)
 
-        result: Optional[Author] = Author.query.filter_by(author_id=authorId).first()  # noqa: E501
+        result: Optional[Author] = Author.query.filter_by(author_id=authorId).options(*_loader_options(depth, selected_fields)).first()  # noqa: E501
         if result is None:
             abort(404)
-        response = python_dict_to_json_dict(model_to_dict(
-            result,
-        )), 200
+        response = marshal(
+            serialize_author(result, depth, selected_fields), author_model,
+            mask=fields_mask(selected_fields),
+        ), 200
         return response
 
     @api.doc(id='delete-author-by-id', responses={401: 'Unauthorised', 404: 'Not Found'})
     def delete(self, authorId):  # type: ignore
-        result: Optional[Author] = Author.query.filter_by(author_id=authorId).first()
-        if result is None:
+        deleted = Author.query.filter_by(author_id=authorId).delete(synchronize_session=False)
+        if not deleted:
             abort(404)
-        db.session.delete(result)
         db.session.commit()
         return '', 204
 
     @api.expect(author_model, validate=False)
     @api.marshal_with(author_model)
+    @retry_with_fresh_identifiers
     def put(self, authorId):  # type: ignore
         data = request.get_json(force=True)
         if not isinstance(data, dict):
@@ -75,6 +149,8 @@ class AuthorResource(Resource):  # type: ignore
         if 'id' not in data:
             data['id'] = authorId
 
+        result: Optional[Author] = Author.query.filter_by(author_id=authorId).first()
+
         marshmallow_schema_or_errors = convert_dict_to_marshmallow_result(
             data=data,
             identifier=authorId,
@@ -82,6 +158,7 @@ class AuthorResource(Resource):  # type: ignore
             domain_model=author_domain_model,
             sqlalchemy_model=Author,
             schema=author_schema,
+            instance=result,
         )
 
         if isinstance(marshmallow_schema_or_errors, list):
@@ -90,13 +167,14 @@ class AuthorResource(Resource):  # type: ignore
             abort(400, python_dict_to_json_dict(marshmallow_schema_or_errors.errors))
 
         db.session.add(marshmallow_schema_or_errors.data)
+        flush_instance(marshmallow_schema_or_errors.data)
+        response = serialize_author(marshmallow_schema_or_errors.data)
         db.session.commit()
 
-        return python_dict_to_json_dict(model_to_dict(
-            marshmallow_schema_or_errors.data,
-        )), 201
+        return response, 201
 
     @api.expect(author_model, validate=False)
+    @retry_with_fresh_identifiers
     def patch(self, authorId):  # type: ignore
         id_validation_errors = author_schema.validate({
           'author_id': authorId
@@ -104,8 +182,7 @@ class AuthorResource(Resource):  # type: ignore
         if id_validation_errors:
             abort(404)
 
-        result: Optional[Author] = Author.query.filter_by(author_id=authorId)\
-            .options(noload('*')).first()  # noqa: E501
+        result: Optional[Author] = Author.query.filter_by(author_id=authorId).first()  # noqa: E501
 
         if result is None:
             abort(404)
@@ -115,13 +192,14 @@ class AuthorResource(Resource):  # type: ignore
             abort(400)
 
         marshmallow_schema_or_errors = convert_dict_to_marshmallow_result(
-            data=json_dict_to_python_dict(model_to_dict(result)),
+            data=data,
             identifier=authorId,
             identifier_column='author_id',
             domain_model=author_domain_model,
             sqlalchemy_model=Author,
             schema=author_schema,
-            patch_data=data,
+            instance=result,
+            partial=True,
         )
 
         if isinstance(marshmallow_schema_or_errors, list):
@@ -129,33 +207,41 @@ class AuthorResource(Resource):  # type: ignore
         if marshmallow_schema_or_errors.errors:
             abort(400, python_dict_to_json_dict(marshmallow_schema_or_errors.errors))
 
-        db.session.add(marshmallow_schema_or_errors.data)
+        flush_instance(marshmallow_schema_or_errors.data)
+        response = serialize_author(marshmallow_schema_or_errors.data)
         db.session.commit()
 
-        return python_dict_to_json_dict(model_to_dict(
-            marshmallow_schema_or_errors.data,
-        )), 200
+        return response, 200
     
 
 @api.route('/author', endpoint='authors')  # noqa: E501
 class ManyAuthorResource(Resource):  # type: ignore
     def get(self):
-        query = Author.query
-        param_author_id = request.args.getlist('author_id')
-        if param_author_id:
-            query = query.filter(Author.author_id.in_(param_author_id))
-        param_name = request.args.getlist('name')
-        if param_name:
-            query = query.filter(Author.name.in_(param_name))
-        param_favourite_author_id = request.args.getlist('favourite_author_id')
-        if param_favourite_author_id:
-            query = query.filter(Author.favourite_author_id.in_(param_favourite_author_id))
-        param_hated_author_id = request.args.getlist('hated_author_id')
-        if param_hated_author_id:
-            query = query.filter(Author.hated_author_id.in_(param_hated_author_id))
-        result = query.all()
-        return python_dict_to_json_dict({"data": [model_to_dict(r) for r in result]})
-
+        selected_fields = requested_fields(author_field_names)
+        depth = expand_depth(1, 2)
+        query = _apply_filters(Author.query).options(*_loader_options(depth, selected_fields))
+        sort_key, descending = sort_order(author_sortable_columns)
+        size = page_size(None, None)
+        headers = _total_count_header() if total_count_requested() else {}
+        # The primary key breaks ties so that every row has its own place in the order
+        columns = [Author.id]
+        if sort_key is not None:
+            columns.insert(0, author_sortable_columns[sort_key])
+        paged = size is not None or sort_key is not None or request.args.get('cursor') is not None
+        if paged:
+            result, next_url = read_page(query, columns, descending, size)
+        else:
+            result, next_url = query.all(), None
+        response = {"data": [serialize_author(r, depth, selected_fields) for r in result]}
+        if paged:
+            response["next"] = next_url
+        return response, 200, headers
+
+    @api.doc(id='count-authors', responses={401: 'Unauthorised'})
+    def head(self):  # type: ignore
+        return '', 200, _total_count_header()
+
+    @retry_with_fresh_identifiers
     def post(self):  # type: ignore
         data = request.get_json(force=True)
         if not isinstance(data, dict):
@@ -170,6 +256,7 @@ class ManyAuthorResource(Resource):  # type: ignore
             domain_model=author_domain_model,
             sqlalchemy_model=Author,
             schema=author_schema,
+            instance=None,
         )
 
         if isinstance(marshmallow_schema_or_errors, list):
@@ -178,11 +265,11 @@ class ManyAuthorResource(Resource):  # type: ignore
             abort(400, python_dict_to_json_dict(marshmallow_schema_or_errors.errors))
 
         db.session.add(marshmallow_schema_or_errors.data)
+        flush_instance(marshmallow_schema_or_errors.data)
+        response = serialize_author(marshmallow_schema_or_errors.data)
         db.session.commit()
 
-        return python_dict_to_json_dict(model_to_dict(
-            marshmallow_schema_or_errors.data,
-        )), 201
+        return response, 201
 
 
 @api.route('/author/<authorId>/books/reviews', endpoint='books-review')  # noqa: E501
@@ -192,7 +279,7 @@ class Review(Resource):  # type: ignore
         result: Optional[Author] = Author \
             .query \
             .options(
-                joinedload('books')
+                selectinload('books')
                 .joinedload('review')
             ) \
             .filter_by(
@@ -218,7 +305,7 @@ class Books(Resource):  # type: ignore
         result: Optional[Author] = Author \
             .query \
             .options(
-                joinedload('books')
+                selectinload('books')
             ) \
             .filter_by(
                 author_id=authorId) \
@@ -1,14 +1,20 @@
+import json
 import uuid
 from typing import Optional
 
-from flask import request, abort, url_for
-from flask_restx import Resource, fields, Namespace
-from sqlalchemy.orm import joinedload
-from sqlalchemy.orm import noload
+from flask import request, abort, url_for, Response, stream_with_context
+from flask_restx import Resource, fields, Namespace, marshal
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload, load_only, noload
 
+from bookshop.core.conditional import cache_validators, not_modified, response_validators
 from bookshop.core.convert_dict import (
     python_dict_to_json_dict, json_dict_to_python_dict
 )
+from bookshop.core.expand import expand_depth
+from bookshop.core.fields import fields_mask, requested_fields
+from bookshop.core.filters import filter_by_operators
+from bookshop.core.pagination import page_size, read_page, sort_order, total_count_requested
 from bookshop.sqlalchemy import db
 from bookshop.sqlalchemy.model import Book
 from bookshop.sqlalchemy.convert_properties import (
@@ -16,7 +22,12 @@ from bookshop.sqlalchemy.convert_properties import (
 )
 from bookshop.schema import BookSchema
 from bookshop.sqlalchemy.model_to_dict import model_to_dict
-from bookshop.sqlalchemy.convert_dict_to_marshmallow_result import convert_dict_to_marshmallow_result
+from bookshop.sqlalchemy.serializers import book_loader_options, serialize_book
+from bookshop.sqlalchemy.identifier_cache import retry_with_fresh_identifiers
+from bookshop.sqlalchemy.convert_dict_to_marshmallow_result import (
+    convert_dict_to_marshmallow_result, flush_instance,
+)
+from bookshop.sqlalchemy.bulk_import import InvalidJSON, import_rows, read_rows
 from bookshop.domain.Book import book as book_domain_model
 
 api = Namespace('books',
@@ -39,26 +50,158 @@ book_model = api.model('Book', {
 
 book_schema = BookSchema()
 books_many_schema = BookSchema(many=True)
+book_import_schema = BookSchema(transient=True)
+
+EXPORT_BATCH_SIZE = 1000
+
+
+def _apply_filters(query):  # type: ignore
+    """Filter a query by the columns given in the query string"""
+    param_book_id = request.args.getlist('book_id')
+    if param_book_id:
+        query = query.filter(Book.book_id.in_(param_book_id))
+    param_name = request.args.getlist('name')
+    if param_name:
+        query = query.filter(Book.name.in_(param_name))
+    query = filter_by_operators(
+        query, Book.name, 'name', 'string',
+        ['lt', 'lte', 'gt', 'gte', 'prefix'],
+    )
+    param_rating = request.args.getlist('rating')
+    if param_rating:
+        query = query.filter(Book.rating.in_(param_rating))
+    query = filter_by_operators(
+        query, Book.rating, 'rating', 'float',
+        ['lt', 'lte', 'gt', 'gte'],
+    )
+    param_author_id = request.args.getlist('author_id')
+    if param_author_id:
+        query = query.filter(Book.author_id.in_(param_author_id))
+    param_collaborator_id = request.args.getlist('collaborator_id')
+    if param_collaborator_id:
+        query = query.filter(Book.collaborator_id.in_(param_collaborator_id))
+    param_published = request.args.getlist('published')
+    if param_published:
+        query = query.filter(Book.published.in_(param_published))
+    param_created = request.args.getlist('created')
+    if param_created:
+        query = query.filter(Book.created.in_(param_created))
+    param_updated = request.args.getlist('updated')
+    if param_updated:
+        query = query.filter(Book.updated.in_(param_updated))
+    return query
+
+
+book_field_columns = {
+    'id': 'book_id',
+    'name': 'name',
+    'rating': 'rating',
+    'author': 'author_id',
+    'collaborator': 'collaborator_id',
+    'published': 'published',
+    'created': 'created',
+    'updated': 'updated',
+}
+book_field_relationships = {
+    'author': 'author',
+    'collaborator': 'collaborator',
+    'genre': 'genre',
+}
+book_field_names = set(book_field_columns) | set(book_field_relationships)
+book_sortable_columns = {
+    'id': Book.book_id,
+    'name': Book.name,
+    'rating': Book.rating,
+}
+
+
+def _total_count_header():  # type: ignore
+    """Count the rows matching the filters with `count(*)`, without loading them"""
+    count = _apply_filters(db.session.query(func.count()).select_from(Book)).scalar()
+    return {'X-Total-Count': str(count)}
+
+
+def _loader_options(depth, selected_fields):  # type: ignore
+    """Loader options which only load the requested fields and the relationships serialized `depth` levels deep"""
+    if selected_fields is None:
+        return book_loader_options(depth)
+    columns = [
+        getattr(Book, book_field_columns[field])
+        for field in selected_fields if field in book_field_columns
+    ]
+    return [
+        load_only(Book.id, Book.updated, *columns),
+        *[
+            noload(getattr(Book, relationship))
+            for field, relationship in book_field_relationships.items() if field not in selected_fields
+        ],
+        *book_loader_options(depth, selected_fields),
+    ]
+
+
+# Eager relationships which can change without the version column, as they are not foreign keys of this row
+book_unversioned_relationships = {'genre'}
+
+
+def _versioned(depth, selected_fields):  # type: ignore
+    """Whether the version column changes with everything in the response
+
+    Embedded rows, and relationships which are not foreign keys of this row,
+    change without it, so responses which include them are versioned by their
+    body instead, which can only be compared once the rows are loaded.
+    """
+    relationships = {
+        field for field in book_field_relationships if selected_fields is None or field in selected_fields
+    }
+    return not (relationships if depth > 0 else relationships & book_unversioned_relationships)
+
+
+def _page_validators(rows, next_url):  # type: ignore
+    """The ETag of a page, from the primary keys and versions of its rows and the link to the next page
+
+    Deleting a row from a full page changes its primary keys even when no
+    version changes.
+    """
+    versions = sorted((row.id, row.updated) for row in rows)
+    return cache_validators(versions, next_url, last_modified=False)
 
 
 @api.route('/book/<bookId>', endpoint='book_by_id')  # noqa: E501
 class BookResource(Resource):  # type: ignore
     @api.doc(id='get-book-by-id', responses={401: 'Unauthorised', 404: 'Not Found'})  # noqa: E501
-    @api.marshal_with(book_model)
+    @api.response(200, 'Success', book_model)
     def get(self, bookId):  # type: ignore
+        selected_fields = requested_fields(book_field_names)
+        depth = expand_depth(1, 1)
         id_validation_errors = book_schema.validate({
           'book_id': bookId
         }, session=db.session, partial=True)
         if id_validation_errors:
             abort(404)
-
-        result: Optional[Book] = Book.query.filter_by(book_id=bookId).first()  # noqa: E501
+        versioned = _versioned(depth, selected_fields)
+        if versioned and (request.if_none_match or request.if_modified_since):
+            # Answer unchanged rows from their version alone
+            version = db.session.query(Book.updated).filter(Book.book_id == bookId).first()  # noqa: E501
+            if version is None:
+                abort(404)
+            headers = cache_validators(version[0], bookId)
+            if not_modified(headers):
+                return '', 304, headers
+
+        result: Optional[Book] = Book.query.filter_by(book_id=bookId).options(*_loader_options(depth, selected_fields)).first()  # noqa: E501
         if result is None:
             abort(404)
-        response = python_dict_to_json_dict(model_to_dict(
-            result,
-        )), 200
-        return response
+        response = marshal(
+            serialize_book(result, depth, selected_fields), book_model,
+            mask=fields_mask(selected_fields),
+        )
+        if versioned:
+            headers = cache_validators(result.updated, bookId)
+        else:
+            headers = response_validators(response)
+            if not_modified(headers):
+                return '', 304, headers
+        return response, 200, headers
 
     @api.doc(id='delete-book-by-id', responses={401: 'Unauthorised', 404: 'Not Found'})
     def delete(self, bookId):  # type: ignore
@@ -71,6 +214,7 @@ class BookResource(Resource):  # type: ignore
 
     @api.expect(book_model, validate=False)
     @api.marshal_with(book_model)
+    @retry_with_fresh_identifiers
     def put(self, bookId):  # type: ignore
         data = request.get_json(force=True)
         if not isinstance(data, dict):
@@ -79,6 +223,8 @@ class BookResource(Resource):  # type: ignore
         if 'id' not in data:
             data['id'] = bookId
 
+        result: Optional[Book] = Book.query.filter_by(book_id=bookId).first()
+
         marshmallow_schema_or_errors = convert_dict_to_marshmallow_result(
             data=data,
             identifier=bookId,
@@ -86,6 +232,7 @@ class BookResource(Resource):  # type: ignore
             domain_model=book_domain_model,
             sqlalchemy_model=Book,
             schema=book_schema,
+            instance=result,
         )
 
         if isinstance(marshmallow_schema_or_errors, list):
@@ -94,13 +241,14 @@ class BookResource(Resource):  # type: ignore
             abort(400, python_dict_to_json_dict(marshmallow_schema_or_errors.errors))
 
         db.session.add(marshmallow_schema_or_errors.data)
+        flush_instance(marshmallow_schema_or_errors.data)
+        response = serialize_book(marshmallow_schema_or_errors.data)
         db.session.commit()
 
-        return python_dict_to_json_dict(model_to_dict(
-            marshmallow_schema_or_errors.data,
-        )), 201
+        return response, 201
 
     @api.expect(book_model, validate=False)
+    @retry_with_fresh_identifiers
     def patch(self, bookId):  # type: ignore
         id_validation_errors = book_schema.validate({
           'book_id': bookId
@@ -108,8 +256,7 @@ class BookResource(Resource):  # type: ignore
         if id_validation_errors:
             abort(404)
 
-        result: Optional[Book] = Book.query.filter_by(book_id=bookId)\
-            .options(noload('*')).first()  # noqa: E501
+        result: Optional[Book] = Book.query.filter_by(book_id=bookId).first()  # noqa: E501
 
         if result is None:
             abort(404)
@@ -119,13 +266,14 @@ class BookResource(Resource):  # type: ignore
             abort(400)
 
         marshmallow_schema_or_errors = convert_dict_to_marshmallow_result(
-            data=json_dict_to_python_dict(model_to_dict(result)),
+            data=data,
             identifier=bookId,
             identifier_column='book_id',
             domain_model=book_domain_model,
             sqlalchemy_model=Book,
             schema=book_schema,
-            patch_data=data,
+            instance=result,
+            partial=True,
         )
 
         if isinstance(marshmallow_schema_or_errors, list):
@@ -133,45 +281,63 @@ class BookResource(Resource):  # type: ignore
         if marshmallow_schema_or_errors.errors:
             abort(400, python_dict_to_json_dict(marshmallow_schema_or_errors.errors))
 
-        db.session.add(marshmallow_schema_or_errors.data)
+        flush_instance(marshmallow_schema_or_errors.data)
+        response = serialize_book(marshmallow_schema_or_errors.data)
         db.session.commit()
 
-        return python_dict_to_json_dict(model_to_dict(
-            marshmallow_schema_or_errors.data,
-        )), 200
+        return response, 200
     
 
 @api.route('/book', endpoint='books')  # noqa: E501
 class ManyBookResource(Resource):  # type: ignore
     def get(self):
-        query = Book.query
-        param_book_id = request.args.getlist('book_id')
-        if param_book_id:
-            query = query.filter(Book.book_id.in_(param_book_id))
-        param_name = request.args.getlist('name')
-        if param_name:
-            query = query.filter(Book.name.in_(param_name))
-        param_rating = request.args.getlist('rating')
-        if param_rating:
-            query = query.filter(Book.rating.in_(param_rating))
-        param_author_id = request.args.getlist('author_id')
-        if param_author_id:
-            query = query.filter(Book.author_id.in_(param_author_id))
-        param_collaborator_id = request.args.getlist('collaborator_id')
-        if param_collaborator_id:
-            query = query.filter(Book.collaborator_id.in_(param_collaborator_id))
-        param_published = request.args.getlist('published')
-        if param_published:
-            query = query.filter(Book.published.in_(param_published))
-        param_created = request.args.getlist('created')
-        if param_created:
-            query = query.filter(Book.created.in_(param_created))
-        param_updated = request.args.getlist('updated')
-        if param_updated:
-            query = query.filter(Book.updated.in_(param_updated))
-        result = query.all()
-        return python_dict_to_json_dict({"data": [model_to_dict(r) for r in result]})
+        selected_fields = requested_fields(book_field_names)
+        depth = expand_depth(1, 1)
+        query = _apply_filters(Book.query).options(*_loader_options(depth, selected_fields))
+        sort_key, descending = sort_order(book_sortable_columns)
+        size = page_size(50, 500)
+        headers = _total_count_header() if total_count_requested() else {}
+        # The primary key breaks ties so that every row has its own place in the order
+        columns = [Book.id]
+        if sort_key is not None:
+            columns.insert(0, book_sortable_columns[sort_key])
+        paged = size is not None or sort_key is not None or request.args.get('cursor') is not None
+        versioned = _versioned(depth, selected_fields)
+        if versioned and request.if_none_match:
+            # Answer unchanged pages from the primary keys and versions of their rows alone
+            versions = _apply_filters(db.session.query(*columns, Book.updated))
+            rows, next_url = read_page(versions, columns, descending, size) if paged else (versions.all(), None)
+            headers.update(_page_validators(rows, next_url))
+            if not_modified(headers):
+                return '', 304, headers
+        if paged:
+            result, next_url = read_page(query, columns, descending, size)
+        else:
+            result, next_url = query.all(), None
+        response = {"data": [serialize_book(r, depth, selected_fields) for r in result]}
+        if paged:
+            response["next"] = next_url
+        if versioned:
+            headers.update(_page_validators(result, next_url))
+        else:
+            headers.update(response_validators(response))
+            if not_modified(headers):
+                return '', 304, headers
+        return response, 200, headers
+
+    @api.doc(id='count-books', responses={401: 'Unauthorised'})
+    def head(self):  # type: ignore
+        return '', 200, _total_count_header()
+
+    @api.doc(id='delete-books', responses={401: 'Unauthorised'})
+    def delete(self):  # type: ignore
+        query = _apply_filters(Book.query)
+        for result in query:
+            db.session.delete(result)
+        db.session.commit()
+        return '', 204
 
+    @retry_with_fresh_identifiers
     def post(self):  # type: ignore
         data = request.get_json(force=True)
         if not isinstance(data, dict):
@@ -186,6 +352,7 @@ class ManyBookResource(Resource):  # type: ignore
             domain_model=book_domain_model,
             sqlalchemy_model=Book,
             schema=book_schema,
+            instance=None,
         )
 
         if isinstance(marshmallow_schema_or_errors, list):
@@ -194,11 +361,57 @@ class ManyBookResource(Resource):  # type: ignore
             abort(400, python_dict_to_json_dict(marshmallow_schema_or_errors.errors))
 
         db.session.add(marshmallow_schema_or_errors.data)
+        flush_instance(marshmallow_schema_or_errors.data)
+        response = serialize_book(marshmallow_schema_or_errors.data)
         db.session.commit()
 
-        return python_dict_to_json_dict(model_to_dict(
-            marshmallow_schema_or_errors.data,
-        )), 201
+        return response, 201
+
+
+@api.route('/book/export', endpoint='book_export')  # noqa: E501
+class ExportBookResource(Resource):  # type: ignore
+    @api.doc(id='export-books', responses={401: 'Unauthorised'})
+    def get(self):  # type: ignore
+        selected_fields = requested_fields(book_field_names)
+        depth = expand_depth(1, 1)
+        query = _apply_filters(Book.query).options(*_loader_options(depth, selected_fields))
+
+        def generate():
+            last_id = None
+            while True:
+                batch = query
+                if last_id is not None:
+                    batch = batch.filter(Book.id > last_id)
+                result = batch.order_by(Book.id).limit(EXPORT_BATCH_SIZE).all()
+                for row in result:
+                    yield json.dumps(serialize_book(row, depth, selected_fields)) + '\n'
+                if len(result) < EXPORT_BATCH_SIZE:
+                    return
+                last_id = result[-1].id
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+@api.route('/book/import', endpoint='book_import')  # noqa: E501
+class ImportBookResource(Resource):  # type: ignore
+    @api.doc(id='import-books', responses={400: 'Invalid JSON', 401: 'Unauthorised'})
+    def post(self):  # type: ignore
+        try:
+            result = import_rows(
+                read_rows(request.stream),
+                identifier_column='book_id',
+                domain_model=book_domain_model,
+                sqlalchemy_model=Book,
+                schema=book_import_schema,
+                new_identifier=uuid.uuid4,
+            )
+        except InvalidJSON as e:
+            return {'message': 'Invalid JSON: {}'.format(e), 'imported': e.imported}, 400
+
+        return python_dict_to_json_dict({
+            'imported': result.imported,
+            'errors': [{'row': e.row, 'errors': e.errors} for e in result.errors],
+        }), 200
 
 
 @api.route('/book/<bookId>/genres', endpoint='genre')  # noqa: E501
@@ -2,13 +2,16 @@ import uuid
 from typing import Optional
 
 from flask import request, abort, url_for
-from flask_restx import Resource, fields, Namespace
-
-from sqlalchemy.orm import noload
+from flask_restx import Resource, fields, Namespace, marshal
+from sqlalchemy import func
+from sqlalchemy.orm import load_only, noload
 
 from bookshop.core.convert_dict import (
     python_dict_to_json_dict, json_dict_to_python_dict
 )
+from bookshop.core.expand import expand_depth
+from bookshop.core.fields import fields_mask, requested_fields
+from bookshop.core.pagination import page_size, read_page, sort_order, total_count_requested
 from bookshop.sqlalchemy import db
 from bookshop.sqlalchemy.model import BookGenre
 from bookshop.sqlalchemy.convert_properties import (
@@ -16,7 +19,11 @@ from bookshop.sqlalchemy.convert_properties import (
 )
 from bookshop.schema import BookGenreSchema
 from bookshop.sqlalchemy.model_to_dict import model_to_dict
-from bookshop.sqlalchemy.convert_dict_to_marshmallow_result import convert_dict_to_marshmallow_result
+from bookshop.sqlalchemy.serializers import book_genre_loader_options, serialize_book_genre
+from bookshop.sqlalchemy.identifier_cache import retry_with_fresh_identifiers
+from bookshop.sqlalchemy.convert_dict_to_marshmallow_result import (
+    convert_dict_to_marshmallow_result, flush_instance,
+)
 from bookshop.domain.BookGenre import book_genre as book_genre_domain_model
 
 api = Namespace('book_genres',
@@ -35,36 +42,92 @@ book_genre_schema = BookGenreSchema()
 book_genres_many_schema = BookGenreSchema(many=True)
 
 
+def _apply_filters(query):  # type: ignore
+    """Filter a query by the columns given in the query string"""
+    param_book_genre_id = request.args.getlist('book_genre_id')
+    if param_book_genre_id:
+        query = query.filter(BookGenre.book_genre_id.in_(param_book_genre_id))
+    param_book_id = request.args.getlist('book_id')
+    if param_book_id:
+        query = query.filter(BookGenre.book_id.in_(param_book_id))
+    param_genre_id = request.args.getlist('genre_id')
+    if param_genre_id:
+        query = query.filter(BookGenre.genre_id.in_(param_genre_id))
+    return query
+
+
+book_genre_field_columns = {
+    'id': 'book_genre_id',
+    'book': 'book_id',
+    'genre': 'genre_id',
+}
+book_genre_field_relationships = {
+    'book': 'book',
+    'genre': 'genre',
+}
+book_genre_field_names = set(book_genre_field_columns) | set(book_genre_field_relationships)
+book_genre_sortable_columns = {
+    'id': BookGenre.book_genre_id,
+}
+
+
+def _total_count_header():  # type: ignore
+    """Count the rows matching the filters with `count(*)`, without loading them"""
+    count = _apply_filters(db.session.query(func.count()).select_from(BookGenre)).scalar()
+    return {'X-Total-Count': str(count)}
+
+
+def _loader_options(depth, selected_fields):  # type: ignore
+    """Loader options which only load the requested fields and the relationships serialized `depth` levels deep"""
+    if selected_fields is None:
+        return book_genre_loader_options(depth)
+    columns = [
+        getattr(BookGenre, book_genre_field_columns[field])
+        for field in selected_fields if field in book_genre_field_columns
+    ]
+    return [
+        load_only(BookGenre.id, *columns),
+        *[
+            noload(getattr(BookGenre, relationship))
+            for field, relationship in book_genre_field_relationships.items() if field not in selected_fields
+        ],
+        *book_genre_loader_options(depth, selected_fields),
+    ]
+
+
 @api.route('/book-genre/<bookGenreId>', endpoint='book_genre_by_id')  # noqa: E501
 class BookGenreResource(Resource):  # type: ignore
     @api.doc(id='get-book_genre-by-id', responses={401: 'Unauthorised', 404: 'Not Found'})  # noqa: E501
-    @api.marshal_with(book_genre_model)
+    @api.response(200, 'Success', book_genre_model)
     def get(self, bookGenreId):  # type: ignore
+        selected_fields = requested_fields(book_genre_field_names)
+        depth = expand_depth(1, 1)
         id_validation_errors = book_genre_schema.validate({
           'book_genre_id': bookGenreId
         }, session=db.session, partial=True)
         if id_validation_errors:
             abort(404)
 
-        result: Optional[BookGenre] = BookGenre.query.filter_by(book_genre_id=bookGenreId).first()  # noqa: E501
+        result: Optional[BookGenre] = BookGenre.query.filter_by(book_genre_id=bookGenreId).options(*_loader_options(depth, selected_fields)).first()  # noqa: E501
         if result is None:
             abort(404)
-        response = python_dict_to_json_dict(model_to_dict(
-            result,
-        )), 200
+        response = marshal(
+            serialize_book_genre(result, depth, selected_fields), book_genre_model,
+            mask=fields_mask(selected_fields),
+        ), 200
         return response
 
     @api.doc(id='delete-book_genre-by-id', responses={401: 'Unauthorised', 404: 'Not Found'})
     def delete(self, bookGenreId):  # type: ignore
-        result: Optional[BookGenre] = BookGenre.query.filter_by(book_genre_id=bookGenreId).first()
-        if result is None:
+        deleted = BookGenre.query.filter_by(book_genre_id=bookGenreId).delete(synchronize_session=False)
+        if not deleted:
             abort(404)
-        db.session.delete(result)
         db.session.commit()
         return '', 204
 
     @api.expect(book_genre_model, validate=False)
     @api.marshal_with(book_genre_model)
+    @retry_with_fresh_identifiers
     def put(self, bookGenreId):  # type: ignore
         data = request.get_json(force=True)
         if not isinstance(data, dict):
@@ -73,6 +136,8 @@ class BookGenreResource(Resource):  # type: ignore
         if 'id' not in data:
             data['id'] = bookGenreId
 
+        result: Optional[BookGenre] = BookGenre.query.filter_by(book_genre_id=bookGenreId).first()
+
         marshmallow_schema_or_errors = convert_dict_to_marshmallow_result(
             data=data,
             identifier=bookGenreId,
@@ -80,6 +145,7 @@ class BookGenreResource(Resource):  # type: ignore
             domain_model=book_genre_domain_model,
             sqlalchemy_model=BookGenre,
             schema=book_genre_schema,
+            instance=result,
         )
 
         if isinstance(marshmallow_schema_or_errors, list):
@@ -88,13 +154,14 @@ class BookGenreResource(Resource):  # type: ignore
             abort(400, python_dict_to_json_dict(marshmallow_schema_or_errors.errors))
 
         db.session.add(marshmallow_schema_or_errors.data)
+        flush_instance(marshmallow_schema_or_errors.data)
+        response = serialize_book_genre(marshmallow_schema_or_errors.data)
         db.session.commit()
 
-        return python_dict_to_json_dict(model_to_dict(
-            marshmallow_schema_or_errors.data,
-        )), 201
+        return response, 201
 
     @api.expect(book_genre_model, validate=False)
+    @retry_with_fresh_identifiers
     def patch(self, bookGenreId):  # type: ignore
         id_validation_errors = book_genre_schema.validate({
           'book_genre_id': bookGenreId
@@ -102,8 +169,7 @@ class BookGenreResource(Resource):  # type: ignore
         if id_validation_errors:
             abort(404)
 
-        result: Optional[BookGenre] = BookGenre.query.filter_by(book_genre_id=bookGenreId)\
-            .options(noload('*')).first()  # noqa: E501
+        result: Optional[BookGenre] = BookGenre.query.filter_by(book_genre_id=bookGenreId).first()  # noqa: E501
 
         if result is None:
             abort(404)
@@ -113,13 +179,14 @@ class BookGenreResource(Resource):  # type: ignore
             abort(400)
 
         marshmallow_schema_or_errors = convert_dict_to_marshmallow_result(
-            data=json_dict_to_python_dict(model_to_dict(result)),
+            data=data,
             identifier=bookGenreId,
             identifier_column='book_genre_id',
             domain_model=book_genre_domain_model,
             sqlalchemy_model=BookGenre,
             schema=book_genre_schema,
-            patch_data=data,
+            instance=result,
+            partial=True,
         )
 
         if isinstance(marshmallow_schema_or_errors, list):
@@ -127,30 +194,41 @@ class BookGenreResource(Resource):  # type: ignore
         if marshmallow_schema_or_errors.errors:
             abort(400, python_dict_to_json_dict(marshmallow_schema_or_errors.errors))
 
-        db.session.add(marshmallow_schema_or_errors.data)
+        flush_instance(marshmallow_schema_or_errors.data)
+        response = serialize_book_genre(marshmallow_schema_or_errors.data)
         db.session.commit()
 
-        return python_dict_to_json_dict(model_to_dict(
-            marshmallow_schema_or_errors.data,
-        )), 200
+        return response, 200
     
 
 @api.route('/book-genre', endpoint='book_genres')  # noqa: E501
 class ManyBookGenreResource(Resource):  # type: ignore
     def get(self):
-        query = BookGenre.query
-        param_book_genre_id = request.args.getlist('book_genre_id')
-        if param_book_genre_id:
-            query = query.filter(BookGenre.book_genre_id.in_(param_book_genre_id))
-        param_book_id = request.args.getlist('book_id')
-        if param_book_id:
-            query = query.filter(BookGenre.book_id.in_(param_book_id))
-        param_genre_id = request.args.getlist('genre_id')
-        if param_genre_id:
-            query = query.filter(BookGenre.genre_id.in_(param_genre_id))
-        result = query.all()
-        return python_dict_to_json_dict({"data": [model_to_dict(r) for r in result]})
+        selected_fields = requested_fields(book_genre_field_names)
+        depth = expand_depth(1, 1)
+        query = _apply_filters(BookGenre.query).options(*_loader_options(depth, selected_fields))
+        sort_key, descending = sort_order(book_genre_sortable_columns)
+        size = page_size(None, None)
+        headers = _total_count_header() if total_count_requested() else {}
+        # The primary key breaks ties so that every row has its own place in the order
+        columns = [BookGenre.id]
+        if sort_key is not None:
+            columns.insert(0, book_genre_sortable_columns[sort_key])
+        paged = size is not None or sort_key is not None or request.args.get('cursor') is not None
+        if paged:
+            result, next_url = read_page(query, columns, descending, size)
+        else:
+            result, next_url = query.all(), None
+        response = {"data": [serialize_book_genre(r, depth, selected_fields) for r in result]}
+        if paged:
+            response["next"] = next_url
+        return response, 200, headers
+
+    @api.doc(id='count-book-genres', responses={401: 'Unauthorised'})
+    def head(self):  # type: ignore
+        return '', 200, _total_count_header()
 
+    @retry_with_fresh_identifiers
     def post(self):  # type: ignore
         data = request.get_json(force=True)
         if not isinstance(data, dict):
@@ -165,6 +243,7 @@ class ManyBookGenreResource(Resource):  # type: ignore
             domain_model=book_genre_domain_model,
             sqlalchemy_model=BookGenre,
             schema=book_genre_schema,
+            instance=None,
         )
 
         if isinstance(marshmallow_schema_or_errors, list):
@@ -173,8 +252,8 @@ class ManyBookGenreResource(Resource):  # type: ignore
             abort(400, python_dict_to_json_dict(marshmallow_schema_or_errors.errors))
 
         db.session.add(marshmallow_schema_or_errors.data)
+        flush_instance(marshmallow_schema_or_errors.data)
+        response = serialize_book_genre(marshmallow_schema_or_errors.data)
         db.session.commit()
 
-        return python_dict_to_json_dict(model_to_dict(
-            marshmallow_schema_or_errors.data,
-        )), 201
+        return response, 201
@@ -2,13 +2,16 @@ import uuid
 from typing import Optional
 
 from flask import request, abort, url_for
-from flask_restx import Resource, fields, Namespace
-
-from sqlalchemy.orm import noload
+from flask_restx import Resource, fields, Namespace, marshal
+from sqlalchemy import func
+from sqlalchemy.orm import load_only, noload
 
 from bookshop.core.convert_dict import (
     python_dict_to_json_dict, json_dict_to_python_dict
 )
+from bookshop.core.expand import expand_depth
+from bookshop.core.fields import fields_mask, requested_fields
+from bookshop.core.pagination import page_size, read_page, sort_order, total_count_requested
 from bookshop.sqlalchemy import db
 from bookshop.sqlalchemy.model import Genre
 from bookshop.sqlalchemy.convert_properties import (
@@ -16,7 +19,11 @@ from bookshop.sqlalchemy.convert_properties import (
 )
 from bookshop.schema import GenreSchema
 from bookshop.sqlalchemy.model_to_dict import model_to_dict
-from bookshop.sqlalchemy.convert_dict_to_marshmallow_result import convert_dict_to_marshmallow_result
+from bookshop.sqlalchemy.serializers import genre_loader_options, serialize_genre
+from bookshop.sqlalchemy.identifier_cache import retry_with_fresh_identifiers
+from bookshop.sqlalchemy.convert_dict_to_marshmallow_result import (
+    convert_dict_to_marshmallow_result, flush_instance,
+)
 from bookshop.domain.Genre import genre as genre_domain_model
 
 api = Namespace('genres',
@@ -33,23 +40,74 @@ genre_schema = GenreSchema()
 genres_many_schema = GenreSchema(many=True)
 
 
+def _apply_filters(query):  # type: ignore
+    """Filter a query by the columns given in the query string"""
+    param_genre_id = request.args.getlist('genre_id')
+    if param_genre_id:
+        query = query.filter(Genre.genre_id.in_(param_genre_id))
+    param_title = request.args.getlist('title')
+    if param_title:
+        query = query.filter(Genre.title.in_(param_title))
+    return query
+
+
+genre_field_columns = {
+    'id': 'genre_id',
+    'title': 'title',
+}
+genre_field_relationships = {
+    'book': 'book',
+}
+genre_field_names = set(genre_field_columns) | set(genre_field_relationships)
+genre_sortable_columns = {
+    'id': Genre.genre_id,
+}
+
+
+def _total_count_header():  # type: ignore
+    """Count the rows matching the filters with `count(*)`, without loading them"""
+    count = _apply_filters(db.session.query(func.count()).select_from(Genre)).scalar()
+    return {'X-Total-Count': str(count)}
+
+
+def _loader_options(depth, selected_fields):  # type: ignore
+    """Loader options which only load the requested fields and the relationships serialized `depth` levels deep"""
+    if selected_fields is None:
+        return genre_loader_options(depth)
+    columns = [
+        getattr(Genre, genre_field_columns[field])
+        for field in selected_fields if field in genre_field_columns
+    ]
+    return [
+        load_only(Genre.id, *columns),
+        *[
+            noload(getattr(Genre, relationship))
+            for field, relationship in genre_field_relationships.items() if field not in selected_fields
+        ],
+        *genre_loader_options(depth, selected_fields),
+    ]
+
+
 @api.route('/genre/<genreId>', endpoint='genre_by_id')  # noqa: E501
 class GenreResource(Resource):  # type: ignore
     @api.doc(id='get-genre-by-id', responses={401: 'Unauthorised', 404: 'Not Found'})  # noqa: E501
-    @api.marshal_with(genre_model)
+    @api.response(200, 'Success', genre_model)
     def get(self, genreId):  # type: ignore
+        selected_fields = requested_fields(genre_field_names)
+        depth = expand_depth(1, 1)
         id_validation_errors = genre_schema.validate({
           'genre_id': genreId
         }, session=db.session, partial=True)
         if id_validation_errors:
             abort(404)
 
-        result: Optional[Genre] = Genre.query.filter_by(genre_id=genreId).first()  # noqa: E501
+        result: Optional[Genre] = Genre.query.filter_by(genre_id=genreId).options(*_loader_options(depth, selected_fields)).first()  # noqa: E501
         if result is None:
             abort(404)
-        response = python_dict_to_json_dict(model_to_dict(
-            result,
-        )), 200
+        response = marshal(
+            serialize_genre(result, depth, selected_fields), genre_model,
+            mask=fields_mask(selected_fields),
+        ), 200
         return response
 
     @api.doc(id='delete-genre-by-id', responses={401: 'Unauthorised', 404: 'Not Found'})
@@ -63,6 +121,7 @@ class GenreResource(Resource):  # type: ignore
 
     @api.expect(genre_model, validate=False)
     @api.marshal_with(genre_model)
+    @retry_with_fresh_identifiers
     def put(self, genreId):  # type: ignore
         data = request.get_json(force=True)
         if not isinstance(data, dict):
@@ -71,6 +130,8 @@ class GenreResource(Resource):  # type: ignore
         if 'id' not in data:
             data['id'] = genreId
 
+        result: Optional[Genre] = Genre.query.filter_by(genre_id=genreId).first()
+
         marshmallow_schema_or_errors = convert_dict_to_marshmallow_result(
             data=data,
             identifier=genreId,
@@ -78,6 +139,7 @@ class GenreResource(Resource):  # type: ignore
             domain_model=genre_domain_model,
             sqlalchemy_model=Genre,
             schema=genre_schema,
+            instance=result,
         )
 
         if isinstance(marshmallow_schema_or_errors, list):
@@ -86,13 +148,14 @@ class GenreResource(Resource):  # type: ignore
             abort(400, python_dict_to_json_dict(marshmallow_schema_or_errors.errors))
 
         db.session.add(marshmallow_schema_or_errors.data)
+        flush_instance(marshmallow_schema_or_errors.data)
+        response = serialize_genre(marshmallow_schema_or_errors.data)
         db.session.commit()
 
-        return python_dict_to_json_dict(model_to_dict(
-            marshmallow_schema_or_errors.data,
-        )), 201
+        return response, 201
 
     @api.expect(genre_model, validate=False)
+    @retry_with_fresh_identifiers
     def patch(self, genreId):  # type: ignore
         id_validation_errors = genre_schema.validate({
           'genre_id': genreId
@@ -100,8 +163,7 @@ class GenreResource(Resource):  # type: ignore
         if id_validation_errors:
             abort(404)
 
-        result: Optional[Genre] = Genre.query.filter_by(genre_id=genreId)\
-            .options(noload('*')).first()  # noqa: E501
+        result: Optional[Genre] = Genre.query.filter_by(genre_id=genreId).first()  # noqa: E501
 
         if result is None:
             abort(404)
@@ -111,13 +173,14 @@ class GenreResource(Resource):  # type: ignore
             abort(400)
 
         marshmallow_schema_or_errors = convert_dict_to_marshmallow_result(
-            data=json_dict_to_python_dict(model_to_dict(result)),
+            data=data,
             identifier=genreId,
             identifier_column='genre_id',
             domain_model=genre_domain_model,
             sqlalchemy_model=Genre,
             schema=genre_schema,
-            patch_data=data,
+            instance=result,
+            partial=True,
         )
 
         if isinstance(marshmallow_schema_or_errors, list):
@@ -125,27 +188,41 @@ class GenreResource(Resource):  # type: ignore
         if marshmallow_schema_or_errors.errors:
             abort(400, python_dict_to_json_dict(marshmallow_schema_or_errors.errors))
 
-        db.session.add(marshmallow_schema_or_errors.data)
+        flush_instance(marshmallow_schema_or_errors.data)
+        response = serialize_genre(marshmallow_schema_or_errors.data)
         db.session.commit()
 
-        return python_dict_to_json_dict(model_to_dict(
-            marshmallow_schema_or_errors.data,
-        )), 200
+        return response, 200
     
 
 @api.route('/genre', endpoint='genres')  # noqa: E501
 class ManyGenreResource(Resource):  # type: ignore
     def get(self):
-        query = Genre.query
-        param_genre_id = request.args.getlist('genre_id')
-        if param_genre_id:
-            query = query.filter(Genre.genre_id.in_(param_genre_id))
-        param_title = request.args.getlist('title')
-        if param_title:
-            query = query.filter(Genre.title.in_(param_title))
-        result = query.all()
-        return python_dict_to_json_dict({"data": [model_to_dict(r) for r in result]})
-
+        selected_fields = requested_fields(genre_field_names)
+        depth = expand_depth(1, 1)
+        query = _apply_filters(Genre.query).options(*_loader_options(depth, selected_fields))
+        sort_key, descending = sort_order(genre_sortable_columns)
+        size = page_size(None, None)
+        headers = _total_count_header() if total_count_requested() else {}
+        # The primary key breaks ties so that every row has its own place in the order
+        columns = [Genre.id]
+        if sort_key is not None:
+            columns.insert(0, genre_sortable_columns[sort_key])
+        paged = size is not None or sort_key is not None or request.args.get('cursor') is not None
+        if paged:
+            result, next_url = read_page(query, columns, descending, size)
+        else:
+            result, next_url = query.all(), None
+        response = {"data": [serialize_genre(r, depth, selected_fields) for r in result]}
+        if paged:
+            response["next"] = next_url
+        return response, 200, headers
+
+    @api.doc(id='count-genres', responses={401: 'Unauthorised'})
+    def head(self):  # type: ignore
+        return '', 200, _total_count_header()
+
+    @retry_with_fresh_identifiers
     def post(self):  # type: ignore
         data = request.get_json(force=True)
         if not isinstance(data, dict):
@@ -160,6 +237,7 @@ class ManyGenreResource(Resource):  # type: ignore
             domain_model=genre_domain_model,
             sqlalchemy_model=Genre,
             schema=genre_schema,
+            instance=None,
         )
 
         if isinstance(marshmallow_schema_or_errors, list):
@@ -168,8 +246,8 @@ class ManyGenreResource(Resource):  # type: ignore
             abort(400, python_dict_to_json_dict(marshmallow_schema_or_errors.errors))
 
         db.session.add(marshmallow_schema_or_errors.data)
+        flush_instance(marshmallow_schema_or_errors.data)
+        response = serialize_genre(marshmallow_schema_or_errors.data)
         db.session.commit()
 
-        return python_dict_to_json_dict(model_to_dict(
-            marshmallow_schema_or_errors.data,
-        )), 201
+        return response, 201
@@ -2,13 +2,16 @@ import uuid
 from typing import Optional
 
 from flask import request, abort, url_for
-from flask_restx import Resource, fields, Namespace
-
-from sqlalchemy.orm import noload
+from flask_restx import Resource, fields, Namespace, marshal
+from sqlalchemy import func
+from sqlalchemy.orm import load_only, noload
 
 from bookshop.core.convert_dict import (
     python_dict_to_json_dict, json_dict_to_python_dict
 )
+from bookshop.core.expand import expand_depth
+from bookshop.core.fields import fields_mask, requested_fields
+from bookshop.core.pagination import page_size, read_page, sort_order, total_count_requested
 from bookshop.sqlalchemy import db
 from bookshop.sqlalchemy.model import RelatedBook
 from bookshop.sqlalchemy.convert_properties import (
@@ -16,7 +19,11 @@ from bookshop.sqlalchemy.convert_properties import (
 )
 from bookshop.schema import RelatedBookSchema
 from bookshop.sqlalchemy.model_to_dict import model_to_dict
-from bookshop.sqlalchemy.convert_dict_to_marshmallow_result import convert_dict_to_marshmallow_result
+from bookshop.sqlalchemy.serializers import related_book_loader_options, serialize_related_book
+from bookshop.sqlalchemy.identifier_cache import retry_with_fresh_identifiers
+from bookshop.sqlalchemy.convert_dict_to_marshmallow_result import (
+    convert_dict_to_marshmallow_result, flush_instance,
+)
 from bookshop.domain.RelatedBook import related_book as related_book_domain_model
 
 api = Namespace('related_books',
@@ -35,36 +42,92 @@ related_book_schema = RelatedBookSchema()
 related_books_many_schema = RelatedBookSchema(many=True)
 
 
+def _apply_filters(query):  # type: ignore
+    """Filter a query by the columns given in the query string"""
+    param_related_book_uuid = request.args.getlist('related_book_uuid')
+    if param_related_book_uuid:
+        query = query.filter(RelatedBook.related_book_uuid.in_(param_related_book_uuid))
+    param_book1_id = request.args.getlist('book1_id')
+    if param_book1_id:
+        query = query.filter(RelatedBook.book1_id.in_(param_book1_id))
+    param_book2_id = request.args.getlist('book2_id')
+    if param_book2_id:
+        query = query.filter(RelatedBook.book2_id.in_(param_book2_id))
+    return query
+
+
+related_book_field_columns = {
+    'id': 'related_book_uuid',
+    'book1': 'book1_id',
+    'book2': 'book2_id',
+}
+related_book_field_relationships = {
+    'book1': 'book1',
+    'book2': 'book2',
+}
+related_book_field_names = set(related_book_field_columns) | set(related_book_field_relationships)
+related_book_sortable_columns = {
+    'id': RelatedBook.related_book_uuid,
+}
+
+
+def _total_count_header():  # type: ignore
+    """Count the rows matching the filters with `count(*)`, without loading them"""
+    count = _apply_filters(db.session.query(func.count()).select_from(RelatedBook)).scalar()
+    return {'X-Total-Count': str(count)}
+
+
+def _loader_options(depth, selected_fields):  # type: ignore
+    """Loader options which only load the requested fields and the relationships serialized `depth` levels deep"""
+    if selected_fields is None:
+        return related_book_loader_options(depth)
+    columns = [
+        getattr(RelatedBook, related_book_field_columns[field])
+        for field in selected_fields if field in related_book_field_columns
+    ]
+    return [
+        load_only(RelatedBook.id, *columns),
+        *[
+            noload(getattr(RelatedBook, relationship))
+            for field, relationship in related_book_field_relationships.items() if field not in selected_fields
+        ],
+        *related_book_loader_options(depth, selected_fields),
+    ]
+
+
 @api.route('/related-book/<relatedBookUuid>', endpoint='related_book_by_id')  # noqa: E501
 class RelatedBookResource(Resource):  # type: ignore
     @api.doc(id='get-related_book-by-id', responses={401: 'Unauthorised', 404: 'Not Found'})  # noqa: E501
-    @api.marshal_with(related_book_model)
+    @api.response(200, 'Success', related_book_model)
     def get(self, relatedBookUuid):  # type: ignore
+        selected_fields = requested_fields(related_book_field_names)
+        depth = expand_depth(1, 1)
         id_validation_errors = related_book_schema.validate({
           'related_book_uuid': relatedBookUuid
         }, session=db.session, partial=True)
         if id_validation_errors:
             abort(404)
 
-        result: Optional[RelatedBook] = RelatedBook.query.filter_by(related_book_uuid=relatedBookUuid).first()  # noqa: E501
+        result: Optional[RelatedBook] = RelatedBook.query.filter_by(related_book_uuid=relatedBookUuid).options(*_loader_options(depth, selected_fields)).first()  # noqa: E501
         if result is None:
             abort(404)
-        response = python_dict_to_json_dict(model_to_dict(
-            result,
-        )), 200
+        response = marshal(
+            serialize_related_book(result, depth, selected_fields), related_book_model,
+            mask=fields_mask(selected_fields),
+        ), 200
         return response
 
     @api.doc(id='delete-related_book-by-id', responses={401: 'Unauthorised', 404: 'Not Found'})
     def delete(self, relatedBookUuid):  # type: ignore
-        result: Optional[RelatedBook] = RelatedBook.query.filter_by(related_book_uuid=relatedBookUuid).first()
-        if result is None:
+        deleted = RelatedBook.query.filter_by(related_book_uuid=relatedBookUuid).delete(synchronize_session=False)
+        if not deleted:
             abort(404)
-        db.session.delete(result)
         db.session.commit()
         return '', 204
 
     @api.expect(related_book_model, validate=False)
     @api.marshal_with(related_book_model)
+    @retry_with_fresh_identifiers
     def put(self, relatedBookUuid):  # type: ignore
         data = request.get_json(force=True)
         if not isinstance(data, dict):
@@ -73,6 +136,8 @@ class RelatedBookResource(Resource):  # type: ignore
         if 'id' not in data:
             data['id'] = relatedBookUuid
 
+        result: Optional[RelatedBook] = RelatedBook.query.filter_by(related_book_uuid=relatedBookUuid).first()
+
         marshmallow_schema_or_errors = convert_dict_to_marshmallow_result(
             data=data,
             identifier=relatedBookUuid,
@@ -80,6 +145,7 @@ class RelatedBookResource(Resource):  # type: ignore
             domain_model=related_book_domain_model,
             sqlalchemy_model=RelatedBook,
             schema=related_book_schema,
+            instance=result,
         )
 
         if isinstance(marshmallow_schema_or_errors, list):
@@ -88,13 +154,14 @@ class RelatedBookResource(Resource):  # type: ignore
             abort(400, python_dict_to_json_dict(marshmallow_schema_or_errors.errors))
 
         db.session.add(marshmallow_schema_or_errors.data)
+        flush_instance(marshmallow_schema_or_errors.data)
+        response = serialize_related_book(marshmallow_schema_or_errors.data)
         db.session.commit()
 
-        return python_dict_to_json_dict(model_to_dict(
-            marshmallow_schema_or_errors.data,
-        )), 201
+        return response, 201
 
     @api.expect(related_book_model, validate=False)
+    @retry_with_fresh_identifiers
     def patch(self, relatedBookUuid):  # type: ignore
         id_validation_errors = related_book_schema.validate({
           'related_book_uuid': relatedBookUuid
@@ -102,8 +169,7 @@ class RelatedBookResource(Resource):  # type: ignore
         if id_validation_errors:
             abort(404)
 
-        result: Optional[RelatedBook] = RelatedBook.query.filter_by(related_book_uuid=relatedBookUuid)\
-            .options(noload('*')).first()  # noqa: E501
+        result: Optional[RelatedBook] = RelatedBook.query.filter_by(related_book_uuid=relatedBookUuid).first()  # noqa: E501
 
         if result is None:
             abort(404)
@@ -113,13 +179,14 @@ class RelatedBookResource(Resource):  # type: ignore
             abort(400)
 
         marshmallow_schema_or_errors = convert_dict_to_marshmallow_result(
-            data=json_dict_to_python_dict(model_to_dict(result)),
+            data=data,
             identifier=relatedBookUuid,
             identifier_column='related_book_uuid',
             domain_model=related_book_domain_model,
             sqlalchemy_model=RelatedBook,
             schema=related_book_schema,
-            patch_data=data,
+            instance=result,
+            partial=True,
         )
 
         if isinstance(marshmallow_schema_or_errors, list):
@@ -127,30 +194,41 @@ class RelatedBookResource(Resource):  # type: ignore
         if marshmallow_schema_or_errors.errors:
             abort(400, python_dict_to_json_dict(marshmallow_schema_or_errors.errors))
 
-        db.session.add(marshmallow_schema_or_errors.data)
+        flush_instance(marshmallow_schema_or_errors.data)
+        response = serialize_related_book(marshmallow_schema_or_errors.data)
         db.session.commit()
 
-        return python_dict_to_json_dict(model_to_dict(
-            marshmallow_schema_or_errors.data,
-        )), 200
+        return response, 200
     
 
 @api.route('/related-book', endpoint='related_books')  # noqa: E501
 class ManyRelatedBookResource(Resource):  # type: ignore
     def get(self):
-        query = RelatedBook.query
-        param_related_book_uuid = request.args.getlist('related_book_uuid')
-        if param_related_book_uuid:
-            query = query.filter(RelatedBook.related_book_uuid.in_(param_related_book_uuid))
-        param_book1_id = request.args.getlist('book1_id')
-        if param_book1_id:
-            query = query.filter(RelatedBook.book1_id.in_(param_book1_id))
-        param_book2_id = request.args.getlist('book2_id')
-        if param_book2_id:
-            query = query.filter(RelatedBook.book2_id.in_(param_book2_id))
-        result = query.all()
-        return python_dict_to_json_dict({"data": [model_to_dict(r) for r in result]})
+        selected_fields = requested_fields(related_book_field_names)
+        depth = expand_depth(1, 1)
+        query = _apply_filters(RelatedBook.query).options(*_loader_options(depth, selected_fields))
+        sort_key, descending = sort_order(related_book_sortable_columns)
+        size = page_size(None, None)
+        headers = _total_count_header() if total_count_requested() else {}
+        # The primary key breaks ties so that every row has its own place in the order
+        columns = [RelatedBook.id]
+        if sort_key is not None:
+            columns.insert(0, related_book_sortable_columns[sort_key])
+        paged = size is not None or sort_key is not None or request.args.get('cursor') is not None
+        if paged:
+            result, next_url = read_page(query, columns, descending, size)
+        else:
+            result, next_url = query.all(), None
+        response = {"data": [serialize_related_book(r, depth, selected_fields) for r in result]}
+        if paged:
+            response["next"] = next_url
+        return response, 200, headers
+
+    @api.doc(id='count-related-books', responses={401: 'Unauthorised'})
+    def head(self):  # type: ignore
+        return '', 200, _total_count_header()
 
+    @retry_with_fresh_identifiers
     def post(self):  # type: ignore
         data = request.get_json(force=True)
         if not isinstance(data, dict):
@@ -165,6 +243,7 @@ class ManyRelatedBookResource(Resource):  # type: ignore
             domain_model=related_book_domain_model,
             sqlalchemy_model=RelatedBook,
             schema=related_book_schema,
+            instance=None,
         )
 
         if isinstance(marshmallow_schema_or_errors, list):
@@ -173,8 +252,8 @@ class ManyRelatedBookResource(Resource):  # type: ignore
             abort(400, python_dict_to_json_dict(marshmallow_schema_or_errors.errors))
 
         db.session.add(marshmallow_schema_or_errors.data)
+        flush_instance(marshmallow_schema_or_errors.data)
+        response = serialize_related_book(marshmallow_schema_or_errors.data)
         db.session.commit()
 
-        return python_dict_to_json_dict(model_to_dict(
-            marshmallow_schema_or_errors.data,
-        )), 201
+        return response, 201
@@ -2,13 +2,17 @@ import uuid
 from typing import Optional
 
 from flask import request, abort, url_for
-from flask_restx import Resource, fields, Namespace
-
-from sqlalchemy.orm import noload
+from flask_restx import Resource, fields, Namespace, marshal
+from sqlalchemy import func
+from sqlalchemy.orm import load_only, noload
 
 from bookshop.core.convert_dict import (
     python_dict_to_json_dict, json_dict_to_python_dict
 )
+from bookshop.core.expand import expand_depth
+from bookshop.core.fields import fields_mask, requested_fields
+from bookshop.core.filters import filter_by_operators
+from bookshop.core.pagination import page_size, read_page, sort_order, total_count_requested
 from bookshop.sqlalchemy import db
 from bookshop.sqlalchemy.model import Review
 from bookshop.sqlalchemy.convert_properties import (
@@ -16,7 +20,11 @@ from bookshop.sqlalchemy.convert_properties import (
 )
 from bookshop.schema import ReviewSchema
 from bookshop.sqlalchemy.model_to_dict import model_to_dict
-from bookshop.sqlalchemy.convert_dict_to_marshmallow_result import convert_dict_to_marshmallow_result
+from bookshop.sqlalchemy.serializers import review_loader_options, serialize_review
+from bookshop.sqlalchemy.identifier_cache import retry_with_fresh_identifiers
+from bookshop.sqlalchemy.convert_dict_to_marshmallow_result import (
+    convert_dict_to_marshmallow_result, flush_instance,
+)
 from bookshop.domain.Review import review as review_domain_model
 
 api = Namespace('reviews',
@@ -34,36 +42,96 @@ review_schema = ReviewSchema()
 reviews_many_schema = ReviewSchema(many=True)
 
 
+def _apply_filters(query):  # type: ignore
+    """Filter a query by the columns given in the query string"""
+    param_review_id = request.args.getlist('review_id')
+    if param_review_id:
+        query = query.filter(Review.review_id.in_(param_review_id))
+    param_text = request.args.getlist('text')
+    if param_text:
+        query = query.filter(Review.text.in_(param_text))
+    query = filter_by_operators(
+        query, Review.text, 'text', 'string',
+        ['lt', 'lte', 'gt', 'gte', 'prefix'],
+    )
+    param_book_id = request.args.getlist('book_id')
+    if param_book_id:
+        query = query.filter(Review.book_id.in_(param_book_id))
+    return query
+
+
+review_field_columns = {
+    'id': 'review_id',
+    'text': 'text',
+    'book': 'book_id',
+}
+review_field_relationships = {
+    'book': 'book',
+}
+review_field_names = set(review_field_columns) | set(review_field_relationships)
+review_sortable_columns = {
+    'id': Review.review_id,
+    'text': Review.text,
+}
+
+
+def _total_count_header():  # type: ignore
+    """Count the rows matching the filters with `count(*)`, without loading them"""
+    count = _apply_filters(db.session.query(func.count()).select_from(Review)).scalar()
+    return {'X-Total-Count': str(count)}
+
+
+def _loader_options(depth, selected_fields):  # type: ignore
+    """Loader options which only load the requested fields and the relationships serialized `depth` levels deep"""
+    if selected_fields is None:
+        return review_loader_options(depth)
+    columns = [
+        getattr(Review, review_field_columns[field])
+        for field in selected_fields if field in review_field_columns
+    ]
+    return [
+        load_only(Review.id, *columns),
+        *[
+            noload(getattr(Review, relationship))
+            for field, relationship in review_field_relationships.items() if field not in selected_fields
+        ],
+        *review_loader_options(depth, selected_fields),
+    ]
+
+
 @api.route('/review/<reviewId>', endpoint='review_by_id')  # noqa: E501
 class ReviewResource(Resource):  # type: ignore
     @api.doc(id='get-review-by-id', responses={401: 'Unauthorised', 404: 'Not Found'})  # noqa: E501
-    @api.marshal_with(review_model)
+    @api.response(200, 'Success', review_model)
     def get(self, reviewId):  # type: ignore
+        selected_fields = requested_fields(review_field_names)
+        depth = expand_depth(1, 1)
         id_validation_errors = review_schema.validate({
           'review_id': reviewId
         }, session=db.session, partial=True)
         if id_validation_errors:
             abort(404)
 
-        result: Optional[Review] = Review.query.filter_by(review_id=reviewId).first()  # noqa: E501
+        result: Optional[Review] = Review.query.filter_by(review_id=reviewId).options(*_loader_options(depth, selected_fields)).first()  # noqa: E501
         if result is None:
             abort(404)
-        response = python_dict_to_json_dict(model_to_dict(
-            result,
-        )), 200
+        response = marshal(
+            serialize_review(result, depth, selected_fields), review_model,
+            mask=fields_mask(selected_fields),
+        ), 200
         return response
 
     @api.doc(id='delete-review-by-id', responses={401: 'Unauthorised', 404: 'Not Found'})
     def delete(self, reviewId):  # type: ignore
-        result: Optional[Review] = Review.query.filter_by(review_id=reviewId).first()
-        if result is None:
+        deleted = Review.query.filter_by(review_id=reviewId).delete(synchronize_session=False)
+        if not deleted:
             abort(404)
-        db.session.delete(result)
         db.session.commit()
         return '', 204
 
     @api.expect(review_model, validate=False)
     @api.marshal_with(review_model)
+    @retry_with_fresh_identifiers
     def put(self, reviewId):  # type: ignore
         data = request.get_json(force=True)
         if not isinstance(data, dict):
@@ -72,6 +140,8 @@ class ReviewResource(Resource):  # type: ignore
         if 'id' not in data:
             data['id'] = reviewId
 
+        result: Optional[Review] = Review.query.filter_by(review_id=reviewId).first()
+
         marshmallow_schema_or_errors = convert_dict_to_marshmallow_result(
             data=data,
             identifier=reviewId,
@@ -79,6 +149,7 @@ class ReviewResource(Resource):  # type: ignore
             domain_model=review_domain_model,
             sqlalchemy_model=Review,
             schema=review_schema,
+            instance=result,
         )
 
         if isinstance(marshmallow_schema_or_errors, list):
@@ -87,13 +158,14 @@ class ReviewResource(Resource):  # type: ignore
             abort(400, python_dict_to_json_dict(marshmallow_schema_or_errors.errors))
 
         db.session.add(marshmallow_schema_or_errors.data)
+        flush_instance(marshmallow_schema_or_errors.data)
+        response = serialize_review(marshmallow_schema_or_errors.data)
         db.session.commit()
 
-        return python_dict_to_json_dict(model_to_dict(
-            marshmallow_schema_or_errors.data,
-        )), 201
+        return response, 201
 
     @api.expect(review_model, validate=False)
+    @retry_with_fresh_identifiers
     def patch(self, reviewId):  # type: ignore
         id_validation_errors = review_schema.validate({
           'review_id': reviewId
@@ -101,8 +173,7 @@ class ReviewResource(Resource):  # type: ignore
         if id_validation_errors:
             abort(404)
 
-        result: Optional[Review] = Review.query.filter_by(review_id=reviewId)\
-            .options(noload('*')).first()  # noqa: E501
+        result: Optional[Review] = Review.query.filter_by(review_id=reviewId).first()  # noqa: E501
 
         if result is None:
             abort(404)
@@ -112,13 +183,14 @@ class ReviewResource(Resource):  # type: ignore
             abort(400)
 
         marshmallow_schema_or_errors = convert_dict_to_marshmallow_result(
-            data=json_dict_to_python_dict(model_to_dict(result)),
+            data=data,
             identifier=reviewId,
             identifier_column='review_id',
             domain_model=review_domain_model,
             sqlalchemy_model=Review,
             schema=review_schema,
-            patch_data=data,
+            instance=result,
+            partial=True,
         )
 
         if isinstance(marshmallow_schema_or_errors, list):
@@ -126,30 +198,41 @@ class ReviewResource(Resource):  # type: ignore
         if marshmallow_schema_or_errors.errors:
             abort(400, python_dict_to_json_dict(marshmallow_schema_or_errors.errors))
 
-        db.session.add(marshmallow_schema_or_errors.data)
+        flush_instance(marshmallow_schema_or_errors.data)
+        response = serialize_review(marshmallow_schema_or_errors.data)
         db.session.commit()
 
-        return python_dict_to_json_dict(model_to_dict(
-            marshmallow_schema_or_errors.data,
-        )), 200
+        return response, 200
     
 
 @api.route('/review', endpoint='reviews')  # noqa: E501
 class ManyReviewResource(Resource):  # type: ignore
     def get(self):
-        query = Review.query
-        param_review_id = request.args.getlist('review_id')
-        if param_review_id:
-            query = query.filter(Review.review_id.in_(param_review_id))
-        param_text = request.args.getlist('text')
-        if param_text:
-            query = query.filter(Review.text.in_(param_text))
-        param_book_id = request.args.getlist('book_id')
-        if param_book_id:
-            query = query.filter(Review.book_id.in_(param_book_id))
-        result = query.all()
-        return python_dict_to_json_dict({"data": [model_to_dict(r) for r in result]})
+        selected_fields = requested_fields(review_field_names)
+        depth = expand_depth(1, 1)
+        query = _apply_filters(Review.query).options(*_loader_options(depth, selected_fields))
+        sort_key, descending = sort_order(review_sortable_columns)
+        size = page_size(None, None)
+        headers = _total_count_header() if total_count_requested() else {}
+        # The primary key breaks ties so that every row has its own place in the order
+        columns = [Review.id]
+        if sort_key is not None:
+            columns.insert(0, review_sortable_columns[sort_key])
+        paged = size is not None or sort_key is not None or request.args.get('cursor') is not None
+        if paged:
+            result, next_url = read_page(query, columns, descending, size)
+        else:
+            result, next_url = query.all(), None
+        response = {"data": [serialize_review(r, depth, selected_fields) for r in result]}
+        if paged:
+            response["next"] = next_url
+        return response, 200, headers
+
+    @api.doc(id='count-reviews', responses={401: 'Unauthorised'})
+    def head(self):  # type: ignore
+        return '', 200, _total_count_header()
 
+    @retry_with_fresh_identifiers
     def post(self):  # type: ignore
         data = request.get_json(force=True)
         if not isinstance(data, dict):
@@ -164,6 +247,7 @@ class ManyReviewResource(Resource):  # type: ignore
             domain_model=review_domain_model,
             sqlalchemy_model=Review,
             schema=review_schema,
+            instance=None,
         )
 
         if isinstance(marshmallow_schema_or_errors, list):
@@ -172,8 +256,8 @@ class ManyReviewResource(Resource):  # type: ignore
             abort(400, python_dict_to_json_dict(marshmallow_schema_or_errors.errors))
 
         db.session.add(marshmallow_schema_or_errors.data)
+        flush_instance(marshmallow_schema_or_errors.data)
+        response = serialize_review(marshmallow_schema_or_errors.data)
         db.session.commit()
 
-        return python_dict_to_json_dict(model_to_dict(
-            marshmallow_schema_or_errors.data,
-        )), 201
+        return response, 201
@@ -1,3 +1,25 @@
+import sqlite3
+from typing import Any
+
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 
 db = SQLAlchemy()
+
+
+def enable_sqlite_foreign_keys(engine: Engine) -> None:
+    """Enforce foreign keys, and so ON DELETE clauses, on an engine's SQLite connections
+
+    SQLite ignores them unless each connection asks for them. Call this before
+    the engine first connects. Engines of other databases are unaffected.
+    """
+    if not event.contains(engine, 'connect', _enable_foreign_keys):
+        event.listen(engine, 'connect', _enable_foreign_keys)
+
+
+def _enable_foreign_keys(dbapi_connection: Any, connection_record: Any) -> None:
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
\ No newline at end of file
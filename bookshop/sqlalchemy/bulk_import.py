@@ -0,0 +1,175 @@
+import itertools
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, IO, List, NamedTuple, Optional, Set, Tuple
+
+from marshmallow_sqlalchemy import SQLAlchemySchema as ModelSchema
+from sqlalchemy import inspect
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.declarative import DeclarativeMeta
+
+from bookshop.sqlalchemy import db
+from bookshop.core.convert_dict import json_dict_to_python_dict
+from bookshop.domain.types import DomainModel
+from bookshop.sqlalchemy.convert_dict_to_marshmallow_result import preserve_user_json
+from bookshop.sqlalchemy.convert_properties import convert_properties_to_sqlalchemy_properties
+from bookshop.sqlalchemy.identifier_cache import discard_used_primary_keys, identifier_key
+from bookshop.sqlalchemy.join_entities import create_joined_entity_id_maps, parse_identifier
+
+DEFAULT_CHUNK_SIZE = 1000
+
+RowError = NamedTuple('RowError', [('row', int), ('errors', Any)])
+ImportResult = NamedTuple('ImportResult', [('imported', int), ('errors', List[RowError])])
+
+
+class InvalidJSON(Exception):
+    """The input could not be read as JSON after `imported` rows had been committed"""
+
+    def __init__(self, message: str, imported: int = 0) -> None:
+        super().__init__(message)
+        self.imported = imported
+
+
+def read_rows(stream: IO[bytes]) -> Iterator[Tuple[int, Any]]:
+    """Yield each row of a JSON array or of newline delimited JSON with its row number
+
+    NDJSON is read a line at a time. A line which is not valid JSON is yielded
+    as a `RowError` so that the rest of the rows can still be imported. An array
+    which is not valid JSON raises `InvalidJSON`.
+    """
+    first_line = stream.readline()
+    while first_line and not first_line.strip():
+        first_line = stream.readline()
+    if first_line.lstrip().startswith(b'['):
+        try:
+            rows = json.loads(first_line + stream.read())
+        except ValueError as e:
+            raise InvalidJSON(str(e)) from e
+        yield from enumerate(rows)
+        return
+    lines = (line for line in itertools.chain([first_line], iter(stream.readline, b'')) if line.strip())
+    for row_number, line in enumerate(lines):
+        try:
+            yield row_number, json.loads(line)
+        except ValueError as e:
+            yield row_number, RowError(row_number, ['Invalid JSON: {}'.format(e)])
+
+
+def import_rows(
+        rows:              Iterable[Tuple[int, Any]],
+        identifier_column: str,
+        domain_model:      DomainModel,
+        sqlalchemy_model:  DeclarativeMeta,
+        schema:            ModelSchema,
+        new_identifier:    Optional[Callable[[], Any]] = None,
+        chunk_size:        int = DEFAULT_CHUNK_SIZE,
+) -> ImportResult:
+    """Insert rows in chunks, committing after each chunk
+
+    Every row in a chunk has its foreign keys resolved with one query per target
+    model and its identifier checked against existing rows with one query, is
+    validated by `schema`, and the valid rows are inserted in a single batch.
+    `schema` should be transient so that validating a row does not query the
+    session. Rows which fail are reported by row number and do not stop the rest
+    of the import. `InvalidJSON` from reading the rows is raised with the number
+    of rows already imported.
+    """
+    imported = 0
+    errors: List[RowError] = []
+    rows = iter(rows)
+    while True:
+        try:
+            chunk = list(itertools.islice(rows, chunk_size))
+        except InvalidJSON as e:
+            raise InvalidJSON(str(e), imported) from e
+        if not chunk:
+            break
+        chunk_imported, chunk_errors = _import_chunk(
+            chunk, identifier_column, domain_model, sqlalchemy_model, schema, new_identifier,
+        )
+        imported += chunk_imported
+        errors.extend(chunk_errors)
+    return ImportResult(imported, errors)
+
+
+def _import_chunk(
+        chunk:             List[Tuple[int, Any]],
+        identifier_column: str,
+        domain_model:      DomainModel,
+        sqlalchemy_model:  DeclarativeMeta,
+        schema:            ModelSchema,
+        new_identifier:    Optional[Callable[[], Any]],
+) -> Tuple[int, List[RowError]]:
+    errors: List[RowError] = []
+    rows: List[Tuple[int, Dict[str, Any]]] = []
+    identifier = getattr(sqlalchemy_model, identifier_column)
+    for row_number, row in chunk:
+        if isinstance(row, RowError):
+            errors.append(row)
+        elif not isinstance(row, dict):
+            errors.append(RowError(row_number, ['Each row must be a JSON object']))
+        else:
+            if row.get('id') is None and new_identifier is not None:
+                row = {**row, 'id': new_identifier()}
+            if row.get('id') is None:
+                errors.append(RowError(row_number, {'id': ['Missing identifier']}))
+            elif parse_identifier(identifier, row['id']) is None:
+                errors.append(RowError(row_number, {'id': ['Invalid identifier {}'.format(row['id'])]}))
+            else:
+                rows.append((row_number, row))
+
+    existing = _existing_identifiers(sqlalchemy_model, identifier_column, [row['id'] for _, row in rows])
+    joined_entity_ids = create_joined_entity_id_maps(domain_model, [row for _, row in rows])
+
+    column_keys = set(attribute.key for attribute in inspect(sqlalchemy_model).column_attrs)
+    mappings = []
+    mapped_row_numbers = []
+    seen = set()
+    for (row_number, row), joined_entities in zip(rows, joined_entity_ids):
+        key = identifier_key(row['id'])
+        if key in existing or key in seen:
+            errors.append(RowError(row_number, {'id': ['{} already exists'.format(row['id'])]}))
+            continue
+        if isinstance(joined_entities, list):
+            errors.append(RowError(row_number, [error for row_errors in joined_entities for error in row_errors]))
+            continue
+        data = convert_properties_to_sqlalchemy_properties(
+            domain_model, joined_entities, json_dict_to_python_dict(preserve_user_json(row)),
+        )
+        result = schema.load(data)
+        if result.errors:
+            errors.append(RowError(row_number, result.errors))
+            continue
+        seen.add(key)
+        mappings.append({k: getattr(result.data, k) for k in data if k in column_keys})
+        mapped_row_numbers.append(row_number)
+
+    imported = len(mappings)
+    try:
+        db.session.bulk_insert_mappings(sqlalchemy_model, mappings)
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        if discard_used_primary_keys(db.session()):
+            # Cached primary keys may point at rows another process deleted
+            return _import_chunk(chunk, identifier_column, domain_model, sqlalchemy_model, schema, new_identifier)
+        imported = 0
+        errors.extend(
+            RowError(row_number, ['Could not insert the chunk containing this row: {}'.format(e.__class__.__name__)])
+            for row_number in mapped_row_numbers
+        )
+    return imported, sorted(errors, key=lambda error: error.row)
+
+
+def _existing_identifiers(
+        sqlalchemy_model:  DeclarativeMeta,
+        identifier_column: str,
+        identifiers:       List[Any],
+) -> Set[str]:
+    """The `identifier_key`s of the identifiers which are already in the table"""
+    if not identifiers:
+        return set()
+    column = getattr(sqlalchemy_model, identifier_column)
+    return set(
+        identifier_key(identifier) for identifier, in
+        db.session.query(column).filter(column.in_(identifiers))
+    )
\ No newline at end of file
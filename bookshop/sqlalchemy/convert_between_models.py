@@ -1,23 +1,50 @@
-import importlib
+from typing import Dict
 
 from sqlalchemy.ext.declarative import DeclarativeMeta
-from flask_restx import Model
 
-from bookshop.core import convert_case
 from bookshop.domain.types import DomainModel
+from bookshop.domain.Author import author as author_domain_model
+from bookshop.domain.Book import book as book_domain_model
+from bookshop.domain.BookGenre import book_genre as book_genre_domain_model
+from bookshop.domain.Genre import genre as genre_domain_model
+from bookshop.domain.RelatedBook import related_book as related_book_domain_model
+from bookshop.domain.Review import review as review_domain_model
+from bookshop.sqlalchemy.model import (
+    Author,
+    Book,
+    BookGenre,
+    Genre,
+    RelatedBook,
+    Review,
+)
+
+# built once at import so finding the domain model for a row is a single dict lookup
+domain_models_by_sqlalchemy_class: Dict[type, DomainModel] = {
+    Author: author_domain_model,
+    Book: book_domain_model,
+    BookGenre: book_genre_domain_model,
+    Genre: genre_domain_model,
+    RelatedBook: related_book_domain_model,
+    Review: review_domain_model,
+}
 
 
 def convert_sqlalchemy_model_to_domain_model(
         sqlalchemy_model: DeclarativeMeta
 ) -> DomainModel:
-    class_name = sqlalchemy_model.__class__.__name__
-    domain_module = importlib.import_module(f'bookshop.domain.{class_name}')
-    return getattr(domain_module, convert_case.to_python_name(class_name))
+    return convert_sqlalchemy_class_to_domain_model(type(sqlalchemy_model))
 
 
 def convert_sqlalchemy_class_to_domain_model(
-        sqlalchemy_class: Model,
-):
-    class_name = sqlalchemy_class.__name__
-    domain_module = importlib.import_module(f'data_pipeline.generated.domain.{class_name}')
-    return getattr(domain_module, convert_case.to_python_name(class_name))
+        sqlalchemy_class: type,
+) -> DomainModel:
+    try:
+        return domain_models_by_sqlalchemy_class[sqlalchemy_class]
+    except KeyError:
+        # subclasses of the generated models, eg. a model_alias
+        for base_class in sqlalchemy_class.__mro__[1:]:
+            if base_class in domain_models_by_sqlalchemy_class:
+                domain_model = domain_models_by_sqlalchemy_class[base_class]
+                domain_models_by_sqlalchemy_class[sqlalchemy_class] = domain_model
+                return domain_model
+        raise
\ No newline at end of file
@@ -1,6 +1,7 @@
 from typing import Optional, Union, List, Mapping, Any
 
 from marshmallow_sqlalchemy import SQLAlchemySchema as ModelSchema
+from sqlalchemy import inspect
 from sqlalchemy.ext.declarative import DeclarativeMeta
 from sqlalchemy.orm import noload
 
@@ -11,6 +12,10 @@ from bookshop.sqlalchemy.convert_properties import convert_properties_to_sqlalch
 from bookshop.sqlalchemy.join_entities import create_joined_entity_id_map
 
 
+# Passed as `instance` when the caller has not looked up the row being written
+NOT_LOADED: Any = object()
+
+
 def convert_dict_to_marshmallow_result(
         data:              Mapping[str, Any],
         identifier:        str,
@@ -19,10 +24,19 @@ def convert_dict_to_marshmallow_result(
         sqlalchemy_model:  DeclarativeMeta,
         schema:            ModelSchema,
         patch_data:        Optional[Mapping[str, Any]] = None,
+        instance:          Any = NOT_LOADED,
+        partial:           bool = False,
 ) -> Union[ModelSchema, List[str]]:
-    result = sqlalchemy_model.query.filter_by(
-        **{identifier_column: identifier}
-    ).options(noload('*')).first()
+    """Load request data into a new or existing row
+
+    Pass the row being written, or None if it does not exist, as `instance`
+    to save looking it up again. With `partial` only the properties in `data`
+    are validated and changed.
+    """
+    if instance is NOT_LOADED:
+        instance = sqlalchemy_model.query.filter_by(
+            **{identifier_column: identifier}
+        ).options(noload('*')).first()
 
     if patch_data is not None:
         data = {**data, **patch_data}
@@ -41,19 +55,37 @@ def convert_dict_to_marshmallow_result(
         json_dict_to_python_dict(preserve_user_json(data)),
     )
 
-    if result is not None:
+    if instance is not None:
         # don't use the 'id' from the json request
-        data = {**data, **{'id': result.id}}
+        data = {**data, **{'id': instance.id}}
 
     marshmallow_result = schema.load(
         json_dict_to_python_dict(data),
         session=db.session,
-        instance=result,
+        instance=instance,
+        partial=partial,
     )
 
     return marshmallow_result
 
 
+def flush_instance(instance: Any) -> None:
+    """Flush a written row so that it can be serialized before committing
+
+    Relationships whose foreign keys were changed are expired so that they
+    are reloaded for the new keys, every other loaded value is kept.
+    """
+    state = inspect(instance)
+    changed = set(attribute.key for attribute in state.attrs if attribute.history.has_changes())
+    db.session.flush()
+    stale = [
+        relationship.key for relationship in state.mapper.relationships
+        if any(column.key in changed for column in relationship.local_columns)
+    ]
+    if stale:
+        db.session.expire(instance, stale)
+
+
 def preserve_user_json(
         data:         Mapping[str, Any],
 ) -> Mapping[str, Any]:
@@ -0,0 +1,220 @@
+import functools
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from bookshop.sqlalchemy import db
+from bookshop.sqlalchemy.model import (
+    Book,
+    Author,
+    Review,
+    Genre,
+    BookGenre,
+    RelatedBook,
+)
+
+DEFAULT_MAX_SIZE = 10000
+
+IDENTIFIER_COLUMNS = {
+    Book: 'book_id',
+    Author: 'author_id',
+    Review: 'review_id',
+    Genre: 'genre_id',
+    BookGenre: 'book_genre_id',
+    RelatedBook: 'related_book_uuid',
+}
+
+CacheKey = Tuple[Any, str, str]
+
+
+def identifier_key(value: Any) -> str:
+    """Compare identifiers as strings, with UUIDs in their canonical form"""
+    try:
+        return str(uuid.UUID(str(value)))
+    except ValueError:
+        return str(value)
+
+
+class IdentifierCache(object):
+    """A process-wide LRU map of (model, identifier column, identifier) to primary key
+
+    Identifiers never point at a different row once it exists, so a hit saves
+    a query. Rows inserted in a transaction are only cached once it commits,
+    and deleted rows are evicted as soon as they are flushed. Set `max_size`
+    to 0 to disable caching.
+    """
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        self.max_size = max_size
+        self._entries: 'OrderedDict[CacheKey, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: CacheKey) -> Optional[Any]:
+        with self._lock:
+            primary_key = self._entries.get(key)
+            if primary_key is not None:
+                self._entries.move_to_end(key)
+            return primary_key
+
+    def put_many(self, entries: Mapping[CacheKey, Any]) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            for key, primary_key in entries.items():
+                self._entries[key] = primary_key
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard_many(self, keys: Iterable[CacheKey]) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+identifier_cache = IdentifierCache()
+
+
+def get_cached_primary_keys(
+    session: Session,
+    keys:    Iterable[CacheKey],
+) -> Dict[CacheKey, Any]:
+    """Look up keys in the cache, including rows inserted earlier in this session's transaction"""
+    pending = _pending(session)
+    used = _used(session)
+    found = {}
+    for key in keys:
+        primary_key = pending.get(key)
+        if primary_key is None:
+            primary_key = identifier_cache.get(key)
+            if primary_key is not None:
+                used.add(key)
+        if primary_key is not None:
+            found[key] = primary_key
+    return found
+
+
+def cache_primary_keys(session: Session, entries: Mapping[CacheKey, Any]) -> None:
+    """Cache primary keys read from the database
+
+    Rows inserted by this session's open transaction are left to be cached
+    when the transaction commits.
+    """
+    pending = _pending(session)
+    identifier_cache.put_many({key: value for key, value in entries.items() if key not in pending})
+
+
+def discard_used_primary_keys(session: Session) -> bool:
+    """Evict the cached primary keys this session has used, returning whether there were any"""
+    used = session.info.pop('identifier_cache_used', set())
+    identifier_cache.discard_many(used)
+    return bool(used)
+
+
+def retry_with_fresh_identifiers(handler: Callable[..., Any]) -> Callable[..., Any]:
+    """Run a write once more if it fails after using cached primary keys
+
+    Each process has its own cache, so a row may have been deleted by another
+    process since its primary key was cached. The retry looks identifiers up
+    in the database, so a row which no longer exists gives the usual 400.
+    """
+    @functools.wraps(handler)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        try:
+            return handler(*args, **kwargs)
+        except IntegrityError:
+            db.session.rollback()
+            if not discard_used_primary_keys(db.session()):
+                raise
+            return handler(*args, **kwargs)
+    return wrapper
+
+
+def _identifier(instance: Any) -> Optional[Tuple[Any, str]]:
+    for model in type(instance).__mro__:
+        if model in IDENTIFIER_COLUMNS:
+            return model, IDENTIFIER_COLUMNS[model]
+    return None
+
+
+def _cache_key(instance: Any) -> Optional[CacheKey]:
+    identifier = _identifier(instance)
+    if identifier is None:
+        return None
+    model, column = identifier
+    value = getattr(instance, column)
+    return (model, column, identifier_key(value)) if value is not None else None
+
+
+@functools.lru_cache(maxsize=None)
+def _cascades_on_delete(model: Any) -> bool:
+    """Whether deleting a row can make the database delete rows of other tables"""
+    table = inspect(model).local_table
+    return any(
+        foreign_key.ondelete is not None and foreign_key.column.table is table
+        for other_table in table.metadata.tables.values()
+        for foreign_key in other_table.foreign_keys
+    )
+
+
+def _pending(session: Session) -> Dict[CacheKey, Any]:
+    return session.info.setdefault('identifier_cache_pending', {})
+
+
+def _used(session: Session) -> Set[CacheKey]:
+    return session.info.setdefault('identifier_cache_used', set())
+
+
+@event.listens_for(db.session, 'after_flush')
+def _after_flush(session: Session, flush_context: Any) -> None:
+    pending = _pending(session)
+    if any(_cascades_on_delete(type(instance)) for instance in session.deleted):
+        pending.clear()
+        identifier_cache.clear()
+    evicted = [_cache_key(instance) for instance in session.deleted]
+    for instance in session.dirty:
+        identifier = _identifier(instance)
+        if identifier is not None:
+            model, column = identifier
+            evicted.extend(
+                (model, column, identifier_key(value))
+                for value in inspect(instance).attrs[column].history.deleted if value is not None
+            )
+    for key in evicted:
+        pending.pop(key, None)
+    identifier_cache.discard_many(key for key in evicted if key is not None)
+    for instance in session.new:
+        key = _cache_key(instance)
+        if key is not None:
+            pending[key] = instance.id
+
+
+@event.listens_for(db.session, 'after_commit')
+def _after_commit(session: Session) -> None:
+    identifier_cache.put_many(session.info.pop('identifier_cache_pending', {}))
+    session.info.pop('identifier_cache_used', None)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _after_rollback(session: Session) -> None:
+    session.info.pop('identifier_cache_pending', None)
+
+
+@event.listens_for(db.session, 'after_bulk_delete')
+@event.listens_for(db.session, 'after_bulk_update')
+def _after_bulk_change(context: Any) -> None:
+    # The changed rows are not known, and database cascades may remove rows of
+    # other models too, so forget everything
+    _pending(context.session).clear()
+    identifier_cache.clear()
\ No newline at end of file
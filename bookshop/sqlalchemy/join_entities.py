@@ -1,41 +1,125 @@
-from typing import Any, Mapping, Union, List
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
 
+from bookshop.sqlalchemy import db
 from bookshop.core.convert_case import to_json_name
-from bookshop.domain.types import DomainModel
+from bookshop.domain.types import DomainModel, Relationship
+from bookshop.sqlalchemy.identifier_cache import (
+    cache_primary_keys, get_cached_primary_keys, identifier_key,
+)
+
+JoinedEntitiesOrErrors = Union[List[str], Mapping[str, Any]]
+
+
+def parse_identifier(column: Any, value: Any) -> Optional[Any]:
+    """Convert an identifier to the type of `column`, or None if it cannot be one
+
+    Binding a value which is not of the column's type, such as a malformed
+    UUID, fails the whole query, so identifiers are checked before querying.
+    """
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    try:
+        if python_type is uuid.UUID:
+            return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+        if python_type is int:
+            return int(str(value))
+    except ValueError:
+        return None
+    return value
 
 
 def create_joined_entity_id_map(
     domain_model: DomainModel,
     data:         Mapping[str, Any]
-) -> Union[List[str], Mapping[str, Any]]:
-    errors = []
-    joined_entities = {}
-    for external_identifier, relationship in domain_model.external_identifier_map.items():
-        json_relationship_name = to_json_name(external_identifier)
-        if json_relationship_name not in data:
-            continue
-        target_identifier_value = data[json_relationship_name]
-        filter_kwargs = {relationship.target_identifier_column: target_identifier_value}
-        result = relationship.sqlalchemy_model_class \
-                .query \
-                .with_entities(relationship.sqlalchemy_model_class.id) \
-                .filter_by(**filter_kwargs) \
-                .first()
-        if relationship.nullable is False and result is None and target_identifier_value is not None:
-            errors.append(
-                [f'Could not find {relationship.target_name} with {json_relationship_name} equal to {target_identifier_value}']
-            )
-        elif relationship.nullable is True and result is None:
-            continue
-        else:
-            joined_entities[external_identifier] = result[0]
-    return joined_entities if not errors else errors
+) -> JoinedEntitiesOrErrors:
+    return create_joined_entity_id_maps(domain_model, [data])[0]
 
 
 def create_joined_entity_map(
     domain_model: DomainModel,
     data:         Mapping[str, Any]
-) -> Union[List[str], Mapping[str, Any]]:
+) -> JoinedEntitiesOrErrors:
+    return create_joined_entity_maps(domain_model, [data])[0]
+
+
+def create_joined_entity_id_maps(
+    domain_model: DomainModel,
+    rows:         List[Mapping[str, Any]],
+) -> List[JoinedEntitiesOrErrors]:
+    """Map the external identifiers of every row to the primary keys they refer to
+
+    All identifiers which point at the same target model are resolved with a
+    single query, however many rows and relationships refer to it. Identifiers
+    which are in the identifier cache are not queried at all.
+    """
+    return _create_joined_maps(
+        domain_model, rows, lambda model, column, values: (
+            model.query.with_entities(column, model.id).filter(column.in_(values))
+        ),
+        use_identifier_cache=True,
+    )
+
+
+def create_joined_entity_maps(
+    domain_model: DomainModel,
+    rows:         List[Mapping[str, Any]],
+) -> List[JoinedEntitiesOrErrors]:
+    """Map the external identifiers of every row to the entities they refer to"""
+    return _create_joined_maps(
+        domain_model, rows, lambda model, column, values: (
+            (getattr(entity, column.key), entity) for entity in model.query.filter(column.in_(values))
+        ),
+    )
+
+
+def _create_joined_maps(
+    domain_model:         DomainModel,
+    rows:                 List[Mapping[str, Any]],
+    query:                Callable[[Any, Any, List[Any]], Iterable[Tuple[Any, Any]]],
+    use_identifier_cache: bool = False,
+) -> List[JoinedEntitiesOrErrors]:
+    values_by_target: Dict[Tuple[Any, str], set] = {}
+    for external_identifier, relationship in domain_model.external_identifier_map.items():
+        json_relationship_name = to_json_name(external_identifier)
+        model, column_name = _target(relationship)
+        column = getattr(model, column_name)
+        values = values_by_target.setdefault((model, column_name), set())
+        for row in rows:
+            value = row.get(json_relationship_name)
+            # Malformed identifiers are not queried, so they are reported as not found
+            if isinstance(value, (str, int, uuid.UUID)) and parse_identifier(column, value) is not None:
+                values.add(value)
+
+    session = db.session()
+    results_by_target = {}
+    for (model, column_name), values in values_by_target.items():
+        values_by_key = {identifier_key(value): value for value in values}
+        results = {}
+        if use_identifier_cache:
+            cached = get_cached_primary_keys(session, [(model, column_name, key) for key in values_by_key])
+            results = {key: primary_key for (_, _, key), primary_key in cached.items()}
+        missing = [value for key, value in values_by_key.items() if key not in results]
+        if missing:
+            queried = {
+                identifier_key(identifier): result
+                for identifier, result in query(model, getattr(model, column_name), missing)
+            }
+            if use_identifier_cache:
+                cache_primary_keys(session, {(model, column_name, key): result for key, result in queried.items()})
+            results.update(queried)
+        results_by_target[(model, column_name)] = results
+
+    return [_joined_entities_for_row(domain_model, row, results_by_target) for row in rows]
+
+
+def _joined_entities_for_row(
+    domain_model:      DomainModel,
+    data:              Mapping[str, Any],
+    results_by_target: Mapping[Tuple[Any, str], Mapping[str, Any]],
+) -> JoinedEntitiesOrErrors:
     errors = []
     joined_entities = {}
     for external_identifier, relationship in domain_model.external_identifier_map.items():
@@ -43,8 +127,9 @@ def create_joined_entity_map(
         if json_relationship_name not in data:
             continue
         target_identifier_value = data[json_relationship_name]
-        filter_kwargs = {relationship.target_identifier_column: target_identifier_value}
-        result = relationship.sqlalchemy_model_class.query.filter_by(**filter_kwargs).first()
+        result = None
+        if isinstance(target_identifier_value, (str, int, uuid.UUID)):
+            result = results_by_target.get(_target(relationship), {}).get(identifier_key(target_identifier_value))
         if relationship.nullable is False and result is None and target_identifier_value is not None:
             errors.append(
                 [f'Could not find {relationship.target_name} with {json_relationship_name} equal to {target_identifier_value}']
@@ -53,4 +138,8 @@ def create_joined_entity_map(
             continue
         else:
             joined_entities[external_identifier] = result
-    return joined_entities if not errors else errors
\ No newline at end of file
+    return joined_entities if not errors else errors
+
+
+def _target(relationship: Relationship) -> Tuple[Any, str]:
+    return relationship.sqlalchemy_model_class, relationship.target_identifier_column
@@ -15,42 +15,45 @@ class Author(db.Model):  # type: ignore
     id =                  db.Column(BigIntegerVariantType, primary_key=True, autoincrement=True)  # noqa: E501
     author_id =           db.Column(UUIDType, index=True, nullable=False)  # noqa: E501
     name =                db.Column(db.String, index=True, nullable=False)  # noqa: E501
-    favourite_author_id = db.Column(db.BigInteger, db.ForeignKey('author.id'), nullable=True)  # noqa: E501
-    hated_author_id =     db.Column(db.BigInteger, db.ForeignKey('author.id'), nullable=True)  # noqa: E501
+    favourite_author_id = db.Column(db.BigInteger, db.ForeignKey('author.id', ondelete="SET NULL"), index=True, nullable=True)  # noqa: E501
+    hated_author_id =     db.Column(db.BigInteger, db.ForeignKey('author.id', ondelete="SET NULL"), index=True, nullable=True)  # noqa: E501
 
     # Relationships
     books = db.relationship(
         'Book',
-        lazy=False,
+        lazy='selectin',
         uselist=True,
         order_by='Book.id',
         foreign_keys='Book.author_id',
-        cascade='all',
+        passive_deletes=True,
     )
     favourite_book = db.relationship(
         'Book',
-        lazy=False,
+        lazy='joined',
         uselist=False,
         order_by='Book.id',
         foreign_keys='Book.author_id',
+        passive_deletes=True,
     )
     collaborations = db.relationship(
         'Book',
-        lazy=False,
+        lazy='selectin',
         uselist=True,
         order_by='Book.id',
         foreign_keys='Book.collaborator_id',
+        passive_deletes=True,
     )
     favourite_of = db.relationship(
         'Author',
-        lazy=True,
+        lazy='select',
         uselist=True,
         order_by='Author.id',
         foreign_keys=[favourite_author_id],
+        passive_deletes=True,
     )
     favourite_author = db.relationship(
         'Author',
-        lazy=True,
+        lazy='select',
         uselist=False,
         order_by='Author.id',
         primaryjoin=id==favourite_author_id,
@@ -58,14 +61,15 @@ class Author(db.Model):  # type: ignore
     )
     hated_by = db.relationship(
         'Author',
-        lazy=True,
+        lazy='select',
         uselist=True,
         order_by='Author.id',
         foreign_keys=[hated_author_id],
+        passive_deletes=True,
     )
     hated_author = db.relationship(
         'Author',
-        lazy=True,
+        lazy='select',
         uselist=False,
         order_by='Author.id',
         primaryjoin=id==hated_author_id,
@@ -16,8 +16,8 @@ class Book(db.Model):  # type: ignore
     book_id =         db.Column(UUIDType, index=True, nullable=False)  # noqa: E501
     name =            db.Column(db.String, index=True, nullable=False)  # noqa: E501
     rating =          db.Column(db.Float, index=True, nullable=False)  # noqa: E501
-    author_id =       db.Column(db.BigInteger, db.ForeignKey('author.id', ondelete="CASCADE"), nullable=True)  # noqa: E501
-    collaborator_id = db.Column(db.BigInteger, db.ForeignKey('author.id'), nullable=True)  # noqa: E501
+    author_id =       db.Column(db.BigInteger, db.ForeignKey('author.id', ondelete="CASCADE"), index=True, nullable=True)  # noqa: E501
+    collaborator_id = db.Column(db.BigInteger, db.ForeignKey('author.id', ondelete="SET NULL"), index=True, nullable=True)  # noqa: E501
     published =       db.Column(db.Date, nullable=True)  # noqa: E501
     created =         db.Column(db.DateTime, server_default=text('CURRENT_TIMESTAMP'), nullable=True)  # noqa: E501
     updated =         db.Column(db.DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow, nullable=True)  # noqa: E501
@@ -25,34 +25,34 @@ class Book(db.Model):  # type: ignore
     # Relationships
     author = db.relationship(
         'Author',
-        lazy=False,
+        lazy='joined',
         uselist=False,
         order_by='Author.id',
         foreign_keys=[author_id],
     )
     collaborator = db.relationship(
         'Author',
-        lazy=False,
+        lazy='joined',
         uselist=False,
         order_by='Author.id',
         foreign_keys=[collaborator_id],
     )
     reviews = db.relationship(
         'Review',
-        lazy=True,
+        lazy='select',
         uselist=True,
         order_by='Review.id',
     )
     genre = db.relationship(
         'Genre',
-        lazy=False,
+        lazy='joined',
         uselist=False,
         order_by='Genre.id',
         secondary='book_genre',
     )
     related_books = db.relationship(
         'Book',
-        lazy=True,
+        lazy='select',
         uselist=True,
         order_by='Book.id',
         secondary='related_book',
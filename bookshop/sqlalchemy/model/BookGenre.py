@@ -14,20 +14,20 @@ class BookGenre(db.Model):  # type: ignore
     # Properties
     id =            db.Column(BigIntegerVariantType, primary_key=True, autoincrement=True)  # noqa: E501
     book_genre_id = db.Column(UUIDType, index=True, nullable=False)  # noqa: E501
-    book_id =       db.Column(db.BigInteger, db.ForeignKey('book.id'), nullable=True)  # noqa: E501
-    genre_id =      db.Column(db.BigInteger, db.ForeignKey('genre.id'), nullable=True)  # noqa: E501
+    book_id =       db.Column(db.BigInteger, db.ForeignKey('book.id', ondelete="CASCADE"), index=True, nullable=True)  # noqa: E501
+    genre_id =      db.Column(db.BigInteger, db.ForeignKey('genre.id', ondelete="CASCADE"), index=True, nullable=True)  # noqa: E501
 
     # Relationships
     book = db.relationship(
         'Book',
-        lazy=False,
+        lazy='joined',
         uselist=False,
         order_by='Book.id',
         foreign_keys=[book_id],
     )
     genre = db.relationship(
         'Genre',
-        lazy=False,
+        lazy='joined',
         uselist=False,
         order_by='Genre.id',
         foreign_keys=[genre_id],
@@ -19,7 +19,7 @@ class Genre(db.Model):  # type: ignore
     # Relationships
     book = db.relationship(
         'Book',
-        lazy=False,
+        lazy='selectin',
         uselist=True,
         order_by='Book.id',
         secondary='book_genre',
@@ -1,5 +1,5 @@
 from sqlalchemy_utils import UUIDType
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import Index, UniqueConstraint
 from sqlalchemy.types import JSON as JSONType
 
 # Available for custom sqlalchemy_options
@@ -14,23 +14,23 @@ class RelatedBook(db.Model):  # type: ignore
     # Properties
     id =                db.Column(BigIntegerVariantType, primary_key=True, autoincrement=True)  # noqa: E501
     related_book_uuid = db.Column(UUIDType, index=True, nullable=False)  # noqa: E501
-    book1_id =          db.Column(db.BigInteger, db.ForeignKey('book.id'), nullable=True)  # noqa: E501
-    book2_id =          db.Column(db.BigInteger, db.ForeignKey('book.id'), nullable=True)  # noqa: E501
+    book1_id =          db.Column(db.BigInteger, db.ForeignKey('book.id', ondelete="CASCADE"), nullable=True)  # noqa: E501
+    book2_id =          db.Column(db.BigInteger, db.ForeignKey('book.id', ondelete="CASCADE"), index=True, nullable=True)  # noqa: E501
 
     # Relationships
     book1 = db.relationship(
         'Book',
-        lazy=False,
+        lazy='joined',
         uselist=False,
         order_by='Book.id',
         foreign_keys=[book1_id],
     )
     book2 = db.relationship(
         'Book',
-        lazy=False,
+        lazy='joined',
         uselist=False,
         order_by='Book.id',
         foreign_keys=[book2_id],
     )
 
-    __table_args__ = (UniqueConstraint('related_book_uuid', ), )
+    __table_args__ = (UniqueConstraint('related_book_uuid', ), Index('ix_related_book_book1_id_book2_id', 'book1_id', 'book2_id', ), )
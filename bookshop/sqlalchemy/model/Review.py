@@ -15,12 +15,12 @@ class Review(db.Model):  # type: ignore
     id =        db.Column(BigIntegerVariantType, primary_key=True, autoincrement=True)  # noqa: E501
     review_id = db.Column(UUIDType, index=True, nullable=False)  # noqa: E501
     text =      db.Column(db.String, index=True, nullable=False)  # noqa: E501
-    book_id =   db.Column(db.BigInteger, db.ForeignKey('book.id'), nullable=True)  # noqa: E501
+    book_id =   db.Column(db.BigInteger, db.ForeignKey('book.id', ondelete="CASCADE"), index=True, nullable=True)  # noqa: E501
 
     # Relationships
     book = db.relationship(
         'Book',
-        lazy=False,
+        lazy='joined',
         uselist=False,
         order_by='Book.id',
         foreign_keys=[book_id],
@@ -0,0 +1,515 @@
+import datetime
+import uuid
+from typing import Any, Callable, Collection, Dict, List, Optional
+
+from sqlalchemy.orm import Load
+
+from bookshop.sqlalchemy.model import (
+    Author,
+    Book,
+    BookGenre,
+    Genre,
+    RelatedBook,
+    Review,
+)
+
+
+def _uuid_to_json(value: Any) -> Any:
+    return str(value) if isinstance(value, uuid.UUID) else value
+
+
+def _date_to_json(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime.date) else value
+
+
+_book_getters: Dict[str, Callable[[Book], Any]] = {
+    'id': lambda row: _uuid_to_json(row.book_id),
+    'name': lambda row: row.name,
+    'rating': lambda row: row.rating,
+    'author': lambda row: row.author_id,
+    'collaborator': lambda row: row.collaborator_id,
+    'published': lambda row: _date_to_json(row.published),
+    'created': lambda row: _date_to_json(row.created),
+    'updated': lambda row: _date_to_json(row.updated),
+}
+
+
+def _book_properties(row: Book) -> Dict[str, Any]:
+    return {key: get(row) for key, get in _book_getters.items()}
+
+
+def _book_fields(row: Book, depth: int, fields: Collection[str]) -> Dict[str, Any]:
+    data = {key: get(row) for key, get in _book_getters.items() if key in fields}
+    if 'author' in fields:
+        related = row.author
+        if related is not None:
+            data['author'] = (_author_with_relationships(related, depth - 1) if depth > 0 else _uuid_to_json(related.author_id))
+    if 'collaborator' in fields:
+        related = row.collaborator
+        if related is not None:
+            data['collaborator'] = (_author_with_relationships(related, depth - 1) if depth > 0 else _uuid_to_json(related.author_id))
+    if 'genre' in fields:
+        related = row.genre
+        data['genre'] = (_genre_with_relationships(related, depth - 1) if depth > 0 else _uuid_to_json(related.genre_id)) if related is not None else None
+    return data
+
+
+def _book_with_relationships(row: Book, depth: int) -> Dict[str, Any]:
+    data = _book_properties(row)
+    related = row.author
+    if related is not None:
+        data['author'] = (_author_with_relationships(related, depth - 1) if depth > 0 else _uuid_to_json(related.author_id))
+    related = row.collaborator
+    if related is not None:
+        data['collaborator'] = (_author_with_relationships(related, depth - 1) if depth > 0 else _uuid_to_json(related.author_id))
+    related = row.genre
+    data['genre'] = (_genre_with_relationships(related, depth - 1) if depth > 0 else _uuid_to_json(related.genre_id)) if related is not None else None
+    return data
+
+
+def serialize_book(
+    row:    Book,
+    depth:  int = 1,
+    fields: Optional[Collection[str]] = None,
+) -> Dict[str, Any]:
+    """Serialize a Book with its eager relationships embedded `depth` levels deep
+
+    Rows at the deepest level, and the row itself with a depth of 0, give
+    their eager relationships as the related rows' identifiers. Only the keys
+    in `fields` are serialized, and only those attributes are read, when it is
+    given.
+    """
+    if fields is not None:
+        return _book_fields(row, depth, fields)
+    return _book_with_relationships(row, depth)
+
+
+def _book_loader_options(path: Any, depth: int, fields: Optional[Collection[str]]) -> List[Any]:
+    options: List[Any] = []
+    if fields is None or 'author' in fields:
+        loader = path.joinedload(Book.author)
+        if depth > 0:
+            options.extend([loader, *_author_loader_options(loader, depth - 1, None)])
+        else:
+            options.append(loader.load_only(Author.author_id))
+    if fields is None or 'collaborator' in fields:
+        loader = path.joinedload(Book.collaborator)
+        if depth > 0:
+            options.extend([loader, *_author_loader_options(loader, depth - 1, None)])
+        else:
+            options.append(loader.load_only(Author.author_id))
+    if fields is None or 'genre' in fields:
+        loader = path.joinedload(Book.genre)
+        if depth > 0:
+            options.extend([loader, *_genre_loader_options(loader, depth - 1, None)])
+        else:
+            options.append(loader.load_only(Genre.genre_id))
+    return options
+
+
+def book_loader_options(
+    depth:  int = 1,
+    fields: Optional[Collection[str]] = None,
+) -> List[Any]:
+    """Loader options for the rows `serialize_book` reads at `depth`
+
+    Each relationship is loaded for every row at once, so serializing a list
+    does not query once per row. Below the deepest embedded rows only the
+    identifiers of related rows are loaded.
+    """
+    return _book_loader_options(Load(Book), depth, fields)
+
+
+_author_getters: Dict[str, Callable[[Author], Any]] = {
+    'id': lambda row: _uuid_to_json(row.author_id),
+    'name': lambda row: row.name,
+    'favouriteAuthor': lambda row: row.favourite_author_id,
+    'hatedAuthor': lambda row: row.hated_author_id,
+}
+
+
+def _author_properties(row: Author) -> Dict[str, Any]:
+    return {key: get(row) for key, get in _author_getters.items()}
+
+
+def _author_fields(row: Author, depth: int, fields: Collection[str]) -> Dict[str, Any]:
+    data = {key: get(row) for key, get in _author_getters.items() if key in fields}
+    if 'books' in fields:
+        data['books'] = [
+            (_book_with_relationships(related, depth - 1) if depth > 0 else _uuid_to_json(related.book_id)) for related in row.books
+        ]
+    if 'favouriteBook' in fields:
+        related = row.favourite_book
+        data['favouriteBook'] = (_book_with_relationships(related, depth - 1) if depth > 0 else _uuid_to_json(related.book_id)) if related is not None else None
+    if 'collaborations' in fields:
+        data['collaborations'] = [
+            (_book_with_relationships(related, depth - 1) if depth > 0 else _uuid_to_json(related.book_id)) for related in row.collaborations
+        ]
+    return data
+
+
+def _author_with_relationships(row: Author, depth: int) -> Dict[str, Any]:
+    data = _author_properties(row)
+    data['books'] = [
+        (_book_with_relationships(related, depth - 1) if depth > 0 else _uuid_to_json(related.book_id)) for related in row.books
+    ]
+    related = row.favourite_book
+    data['favouriteBook'] = (_book_with_relationships(related, depth - 1) if depth > 0 else _uuid_to_json(related.book_id)) if related is not None else None
+    data['collaborations'] = [
+        (_book_with_relationships(related, depth - 1) if depth > 0 else _uuid_to_json(related.book_id)) for related in row.collaborations
+    ]
+    return data
+
+
+def serialize_author(
+    row:    Author,
+    depth:  int = 1,
+    fields: Optional[Collection[str]] = None,
+) -> Dict[str, Any]:
+    """Serialize a Author with its eager relationships embedded `depth` levels deep
+
+    Rows at the deepest level, and the row itself with a depth of 0, give
+    their eager relationships as the related rows' identifiers. Only the keys
+    in `fields` are serialized, and only those attributes are read, when it is
+    given.
+    """
+    if fields is not None:
+        return _author_fields(row, depth, fields)
+    return _author_with_relationships(row, depth)
+
+
+def _author_loader_options(path: Any, depth: int, fields: Optional[Collection[str]]) -> List[Any]:
+    options: List[Any] = []
+    if fields is None or 'books' in fields:
+        loader = path.selectinload(Author.books)
+        if depth > 0:
+            options.extend([loader, *_book_loader_options(loader, depth - 1, None)])
+        else:
+            options.append(loader.load_only(Book.book_id))
+    if fields is None or 'favouriteBook' in fields:
+        loader = path.joinedload(Author.favourite_book)
+        if depth > 0:
+            options.extend([loader, *_book_loader_options(loader, depth - 1, None)])
+        else:
+            options.append(loader.load_only(Book.book_id))
+    if fields is None or 'collaborations' in fields:
+        loader = path.selectinload(Author.collaborations)
+        if depth > 0:
+            options.extend([loader, *_book_loader_options(loader, depth - 1, None)])
+        else:
+            options.append(loader.load_only(Book.book_id))
+    return options
+
+
+def author_loader_options(
+    depth:  int = 1,
+    fields: Optional[Collection[str]] = None,
+) -> List[Any]:
+    """Loader options for the rows `serialize_author` reads at `depth`
+
+    Each relationship is loaded for every row at once, so serializing a list
+    does not query once per row. Below the deepest embedded rows only the
+    identifiers of related rows are loaded.
+    """
+    return _author_loader_options(Load(Author), depth, fields)
+
+
+_review_getters: Dict[str, Callable[[Review], Any]] = {
+    'id': lambda row: _uuid_to_json(row.review_id),
+    'text': lambda row: row.text,
+    'book': lambda row: row.book_id,
+}
+
+
+def _review_properties(row: Review) -> Dict[str, Any]:
+    return {key: get(row) for key, get in _review_getters.items()}
+
+
+def _review_fields(row: Review, depth: int, fields: Collection[str]) -> Dict[str, Any]:
+    data = {key: get(row) for key, get in _review_getters.items() if key in fields}
+    if 'book' in fields:
+        related = row.book
+        if related is not None:
+            data['book'] = (_book_with_relationships(related, depth - 1) if depth > 0 else _uuid_to_json(related.book_id))
+    return data
+
+
+def _review_with_relationships(row: Review, depth: int) -> Dict[str, Any]:
+    data = _review_properties(row)
+    related = row.book
+    if related is not None:
+        data['book'] = (_book_with_relationships(related, depth - 1) if depth > 0 else _uuid_to_json(related.book_id))
+    return data
+
+
+def serialize_review(
+    row:    Review,
+    depth:  int = 1,
+    fields: Optional[Collection[str]] = None,
+) -> Dict[str, Any]:
+    """Serialize a Review with its eager relationships embedded `depth` levels deep
+
+    Rows at the deepest level, and the row itself with a depth of 0, give
+    their eager relationships as the related rows' identifiers. Only the keys
+    in `fields` are serialized, and only those attributes are read, when it is
+    given.
+    """
+    if fields is not None:
+        return _review_fields(row, depth, fields)
+    return _review_with_relationships(row, depth)
+
+
+def _review_loader_options(path: Any, depth: int, fields: Optional[Collection[str]]) -> List[Any]:
+    options: List[Any] = []
+    if fields is None or 'book' in fields:
+        loader = path.joinedload(Review.book)
+        if depth > 0:
+            options.extend([loader, *_book_loader_options(loader, depth - 1, None)])
+        else:
+            options.append(loader.load_only(Book.book_id))
+    return options
+
+
+def review_loader_options(
+    depth:  int = 1,
+    fields: Optional[Collection[str]] = None,
+) -> List[Any]:
+    """Loader options for the rows `serialize_review` reads at `depth`
+
+    Each relationship is loaded for every row at once, so serializing a list
+    does not query once per row. Below the deepest embedded rows only the
+    identifiers of related rows are loaded.
+    """
+    return _review_loader_options(Load(Review), depth, fields)
+
+
+_genre_getters: Dict[str, Callable[[Genre], Any]] = {
+    'id': lambda row: _uuid_to_json(row.genre_id),
+    'title': lambda row: row.title,
+}
+
+
+def _genre_properties(row: Genre) -> Dict[str, Any]:
+    return {key: get(row) for key, get in _genre_getters.items()}
+
+
+def _genre_fields(row: Genre, depth: int, fields: Collection[str]) -> Dict[str, Any]:
+    data = {key: get(row) for key, get in _genre_getters.items() if key in fields}
+    if 'book' in fields:
+        data['book'] = [
+            (_book_with_relationships(related, depth - 1) if depth > 0 else _uuid_to_json(related.book_id)) for related in row.book
+        ]
+    return data
+
+
+def _genre_with_relationships(row: Genre, depth: int) -> Dict[str, Any]:
+    data = _genre_properties(row)
+    data['book'] = [
+        (_book_with_relationships(related, depth - 1) if depth > 0 else _uuid_to_json(related.book_id)) for related in row.book
+    ]
+    return data
+
+
+def serialize_genre(
+    row:    Genre,
+    depth:  int = 1,
+    fields: Optional[Collection[str]] = None,
+) -> Dict[str, Any]:
+    """Serialize a Genre with its eager relationships embedded `depth` levels deep
+
+    Rows at the deepest level, and the row itself with a depth of 0, give
+    their eager relationships as the related rows' identifiers. Only the keys
+    in `fields` are serialized, and only those attributes are read, when it is
+    given.
+    """
+    if fields is not None:
+        return _genre_fields(row, depth, fields)
+    return _genre_with_relationships(row, depth)
+
+
+def _genre_loader_options(path: Any, depth: int, fields: Optional[Collection[str]]) -> List[Any]:
+    options: List[Any] = []
+    if fields is None or 'book' in fields:
+        loader = path.selectinload(Genre.book)
+        if depth > 0:
+            options.extend([loader, *_book_loader_options(loader, depth - 1, None)])
+        else:
+            options.append(loader.load_only(Book.book_id))
+    return options
+
+
+def genre_loader_options(
+    depth:  int = 1,
+    fields: Optional[Collection[str]] = None,
+) -> List[Any]:
+    """Loader options for the rows `serialize_genre` reads at `depth`
+
+    Each relationship is loaded for every row at once, so serializing a list
+    does not query once per row. Below the deepest embedded rows only the
+    identifiers of related rows are loaded.
+    """
+    return _genre_loader_options(Load(Genre), depth, fields)
+
+
+_book_genre_getters: Dict[str, Callable[[BookGenre], Any]] = {
+    'id': lambda row: _uuid_to_json(row.book_genre_id),
+    'book': lambda row: row.book_id,
+    'genre': lambda row: row.genre_id,
+}
+
+
+def _book_genre_properties(row: BookGenre) -> Dict[str, Any]:
+    return {key: get(row) for key, get in _book_genre_getters.items()}
+
+
+def _book_genre_fields(row: BookGenre, depth: int, fields: Collection[str]) -> Dict[str, Any]:
+    data = {key: get(row) for key, get in _book_genre_getters.items() if key in fields}
+    if 'book' in fields:
+        related = row.book
+        if related is not None:
+            data['book'] = (_book_with_relationships(related, depth - 1) if depth > 0 else _uuid_to_json(related.book_id))
+    if 'genre' in fields:
+        related = row.genre
+        if related is not None:
+            data['genre'] = (_genre_with_relationships(related, depth - 1) if depth > 0 else _uuid_to_json(related.genre_id))
+    return data
+
+
+def _book_genre_with_relationships(row: BookGenre, depth: int) -> Dict[str, Any]:
+    data = _book_genre_properties(row)
+    related = row.book
+    if related is not None:
+        data['book'] = (_book_with_relationships(related, depth - 1) if depth > 0 else _uuid_to_json(related.book_id))
+    related = row.genre
+    if related is not None:
+        data['genre'] = (_genre_with_relationships(related, depth - 1) if depth > 0 else _uuid_to_json(related.genre_id))
+    return data
+
+
+def serialize_book_genre(
+    row:    BookGenre,
+    depth:  int = 1,
+    fields: Optional[Collection[str]] = None,
+) -> Dict[str, Any]:
+    """Serialize a BookGenre with its eager relationships embedded `depth` levels deep
+
+    Rows at the deepest level, and the row itself with a depth of 0, give
+    their eager relationships as the related rows' identifiers. Only the keys
+    in `fields` are serialized, and only those attributes are read, when it is
+    given.
+    """
+    if fields is not None:
+        return _book_genre_fields(row, depth, fields)
+    return _book_genre_with_relationships(row, depth)
+
+
+def _book_genre_loader_options(path: Any, depth: int, fields: Optional[Collection[str]]) -> List[Any]:
+    options: List[Any] = []
+    if fields is None or 'book' in fields:
+        loader = path.joinedload(BookGenre.book)
+        if depth > 0:
+            options.extend([loader, *_book_loader_options(loader, depth - 1, None)])
+        else:
+            options.append(loader.load_only(Book.book_id))
+    if fields is None or 'genre' in fields:
+        loader = path.joinedload(BookGenre.genre)
+        if depth > 0:
+            options.extend([loader, *_genre_loader_options(loader, depth - 1, None)])
+        else:
+            options.append(loader.load_only(Genre.genre_id))
+    return options
+
+
+def book_genre_loader_options(
+    depth:  int = 1,
+    fields: Optional[Collection[str]] = None,
+) -> List[Any]:
+    """Loader options for the rows `serialize_book_genre` reads at `depth`
+
+    Each relationship is loaded for every row at once, so serializing a list
+    does not query once per row. Below the deepest embedded rows only the
+    identifiers of related rows are loaded.
+    """
+    return _book_genre_loader_options(Load(BookGenre), depth, fields)
+
+
+_related_book_getters: Dict[str, Callable[[RelatedBook], Any]] = {
+    'id': lambda row: _uuid_to_json(row.related_book_uuid),
+    'book1': lambda row: row.book1_id,
+    'book2': lambda row: row.book2_id,
+}
+
+
+def _related_book_properties(row: RelatedBook) -> Dict[str, Any]:
+    return {key: get(row) for key, get in _related_book_getters.items()}
+
+
+def _related_book_fields(row: RelatedBook, depth: int, fields: Collection[str]) -> Dict[str, Any]:
+    data = {key: get(row) for key, get in _related_book_getters.items() if key in fields}
+    if 'book1' in fields:
+        related = row.book1
+        if related is not None:
+            data['book1'] = (_book_with_relationships(related, depth - 1) if depth > 0 else _uuid_to_json(related.book_id))
+    if 'book2' in fields:
+        related = row.book2
+        if related is not None:
+            data['book2'] = (_book_with_relationships(related, depth - 1) if depth > 0 else _uuid_to_json(related.book_id))
+    return data
+
+
+def _related_book_with_relationships(row: RelatedBook, depth: int) -> Dict[str, Any]:
+    data = _related_book_properties(row)
+    related = row.book1
+    if related is not None:
+        data['book1'] = (_book_with_relationships(related, depth - 1) if depth > 0 else _uuid_to_json(related.book_id))
+    related = row.book2
+    if related is not None:
+        data['book2'] = (_book_with_relationships(related, depth - 1) if depth > 0 else _uuid_to_json(related.book_id))
+    return data
+
+
+def serialize_related_book(
+    row:    RelatedBook,
+    depth:  int = 1,
+    fields: Optional[Collection[str]] = None,
+) -> Dict[str, Any]:
+    """Serialize a RelatedBook with its eager relationships embedded `depth` levels deep
+
+    Rows at the deepest level, and the row itself with a depth of 0, give
+    their eager relationships as the related rows' identifiers. Only the keys
+    in `fields` are serialized, and only those attributes are read, when it is
+    given.
+    """
+    if fields is not None:
+        return _related_book_fields(row, depth, fields)
+    return _related_book_with_relationships(row, depth)
+
+
+def _related_book_loader_options(path: Any, depth: int, fields: Optional[Collection[str]]) -> List[Any]:
+    options: List[Any] = []
+    if fields is None or 'book1' in fields:
+        loader = path.joinedload(RelatedBook.book1)
+        if depth > 0:
+            options.extend([loader, *_book_loader_options(loader, depth - 1, None)])
+        else:
+            options.append(loader.load_only(Book.book_id))
+    if fields is None or 'book2' in fields:
+        loader = path.joinedload(RelatedBook.book2)
+        if depth > 0:
+            options.extend([loader, *_book_loader_options(loader, depth - 1, None)])
+        else:
+            options.append(loader.load_only(Book.book_id))
+    return options
+
+
+def related_book_loader_options(
+    depth:  int = 1,
+    fields: Optional[Collection[str]] = None,
+) -> List[Any]:
+    """Loader options for the rows `serialize_related_book` reads at `depth`
+
+    Each relationship is loaded for every row at once, so serializing a list
+    does not query once per row. Below the deepest embedded rows only the
+    identifiers of related rows are loaded.
+    """
+    return _related_book_loader_options(Load(RelatedBook), depth, fields)
@@ -12,6 +12,7 @@ from genyrator.entities.Column import (
 )
 from genyrator.types import (
     TypeOption,
+    FilterOperator,
     string_to_type_option,
     python_type_to_type_option,
     type_option_to_type_constructor,
@@ -20,6 +21,7 @@ from genyrator.entities.Relationship import (
     Relationship,
     create_relationship,
     JoinOption,
+    LoadingStrategy,
 )
 from genyrator.entities.Entity import (
     Entity,
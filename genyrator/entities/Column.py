@@ -1,10 +1,13 @@
+import warnings
 from typing import Optional, Union, List, Tuple, Dict, Type, Mapping
 import attr
+from genyrator.errors import GenyratorError, GenyratorWarning
 from genyrator.inflector import pythonize, to_class_name, to_json_case, humanize
 from genyrator.types import (
     SqlAlchemyTypeOption, PythonTypeOption, TypeOption, type_option_to_sqlalchemy_type,
     type_option_to_python_type, type_option_to_default_value, RestplusTypeOption,
-    type_option_to_restplus_type, type_option_to_faker_method, type_option_to_faker_options
+    type_option_to_restplus_type, type_option_to_faker_method, type_option_to_faker_options, FilterOperator,
+    type_option_to_filter_operators,
 )
 
 
@@ -32,6 +35,8 @@ class Column(object):
     index:              bool =                  attr.ib()
     nullable:           bool =                  attr.ib()
     sqlalchemy_options: List[Tuple[str, str]] = attr.ib()
+    filter_operators:   List[FilterOperator] =  attr.ib()
+    sortable:           bool =                  attr.ib()
 
 
 @attr.s
@@ -49,7 +54,7 @@ class IdentifierColumn(Column):
 def create_column(
         name:                     str,
         type_option:              TypeOption,
-        index:                    bool = False,
+        index:                    Optional[bool] = None,
         nullable:                 bool = True,
         identifier:               bool = False,
         display_name:             Optional[str] = None,
@@ -58,6 +63,8 @@ def create_column(
         faker_method:             Optional[str] = None,
         faker_options:            Optional[str] = None,
         sqlalchemy_options:       Optional[Dict[str, str]] = None,
+        filter_operators:         Optional[List[FilterOperator]] = None,
+        sortable:                 Optional[bool] = None,
 ) -> Union[Column, IdentifierColumn, ForeignKey]:
     """Return a column to be attached to an entity
 
@@ -66,7 +73,8 @@ def create_column(
 
         type_option: The type of the column.
 
-        index:       Whether to create a database index for the column.
+        index:       Whether to create a database index for the column. Defaults to True for
+                     foreign keys, which are used to load relationships and by cascades.
 
         nullable:    Whether to allow the column to be nullable in the database.
 
@@ -85,6 +93,16 @@ def create_column(
                       of this column.
 
         sqlalchemy_options: Pass additional keyword arguments to the SQLAlchemy column object.
+
+        filter_operators: Operators such as `rating[gte]=` which list endpoints accept for this
+                          column on top of equality. Defaults to comparisons for orderable types,
+                          plus `prefix` for strings, on indexed columns other than foreign keys.
+                          Only those operators are allowed for a type. A warning is given if
+                          operators are given for a column with no index.
+
+        sortable: Whether list endpoints can be sorted by this column. Defaults to True for
+                  indexed columns which are not nullable. Nullable columns cannot be sorted
+                  because rows without a value have no place in the page order.
     """
     if identifier is True:
         constructor: Type[Column] = IdentifierColumn
@@ -99,6 +117,30 @@ def create_column(
     if sqlalchemy_options is None:
         sqlalchemy_options = {}
 
+    if index is None:
+        index = constructor is ForeignKey
+
+    if sortable is None:
+        sortable = index and not nullable and constructor is not ForeignKey and \
+            type_option not in (TypeOption.dict, TypeOption.list)
+    elif sortable and nullable:
+        raise GenyratorError('Column {} cannot be sortable because it is nullable'.format(name))
+
+    allowed_filter_operators = type_option_to_filter_operators(type_option)
+    if filter_operators is None:
+        filter_operators = allowed_filter_operators if index and constructor is not ForeignKey else []
+    else:
+        for filter_operator in filter_operators:
+            if filter_operator not in allowed_filter_operators:
+                raise GenyratorError('Column {} of type {} cannot be filtered with {}'.format(
+                    name, type_option.value, filter_operator.value,
+                ))
+        if filter_operators and not index:
+            warnings.warn(
+                'Column {} has filter operators but no index, so filtering it will scan the table'.format(name),
+                GenyratorWarning, stacklevel=2,
+            )
+
     args = {
         "python_name":        pythonize(name),
         "class_name":         to_class_name(name),
@@ -115,6 +157,8 @@ def create_column(
         "faker_method":       faker_method,
         "faker_options":      faker_options,
         "sqlalchemy_options": list(sqlalchemy_options.items()),
+        "filter_operators":   filter_operators,
+        "sortable":           sortable,
     }
     if foreign_key_relationship is not None:
         args['relationship'] = '{}.{}'.format(
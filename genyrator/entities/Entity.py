@@ -1,10 +1,12 @@
 from enum import Enum
 
 import attr
-from typing import List, Optional, Union, NamedTuple, Set
+from typing import Dict, List, Optional, Union, NamedTuple, Set
 
-from genyrator.entities.Relationship import Relationship
+from genyrator.entities.Relationship import JoinOption, Relationship, RelationshipWithoutJoinTable
 from genyrator.entities.Column import Column, IdentifierColumn
+from genyrator.errors import GenyratorError
+from genyrator.types import TypeOption
 from genyrator.inflector import pythonize, pluralize, dasherize, humanize, to_class_name, to_json_case
 
 APIPath = NamedTuple(
@@ -40,6 +42,8 @@ class OperationOption(Enum):
     get_all =           'get_all'
     delete_one =        'delete_one'
     delete_all =        'delete_all'
+    export_all =        'export_all'
+    import_all =        'import_all'
 
 
 def string_to_operation_option(option: str) -> OperationOption:
@@ -52,10 +56,16 @@ def string_to_operation_option(option: str) -> OperationOption:
         "get_all":           OperationOption.get_all,
         "delete_one":        OperationOption.delete_one,
         "delete_all":        OperationOption.delete_all,
+        "export_all":        OperationOption.export_all,
+        "import_all":        OperationOption.import_all,
     }[option]
 
 
-all_operations: Set[OperationOption] = set([o for o in OperationOption])
+# Operations which are only generated when they are explicitly requested
+opt_in_operations: Set[OperationOption] = set([
+    OperationOption.export_all, OperationOption.import_all, OperationOption.delete_all,
+])
+all_operations: Set[OperationOption] = set([o for o in OperationOption if o not in opt_in_operations])
 
 
 @attr.s
@@ -68,6 +78,7 @@ class Entity(object):
     relationships:         List[Relationship] =       attr.ib()
     table_name:            Optional[str] =            attr.ib()
     uniques:               List[List[str]] =          attr.ib()
+    indexes:               List[List[str]] =          attr.ib()
     max_property_length:   int =                      attr.ib()
     plural:                str =                      attr.ib()
     dashed_plural:         str =                      attr.ib()
@@ -84,8 +95,15 @@ class Entity(object):
     supports_patch:        bool =                     attr.ib()
     supports_delete_one:   bool =                     attr.ib()
     supports_delete_all:   bool =                     attr.ib()
+    supports_export_all:   bool =                     attr.ib()
+    supports_import_all:   bool =                     attr.ib()
     model_alias:           Optional[ImportAlias] =    attr.ib()
     additional_properties: List[AdditionalProperty] = attr.ib()
+    default_page_size:     Optional[int] =            attr.ib(default=None)
+    max_page_size:         Optional[int] =            attr.ib(default=None)
+    default_expand_depth:  int =                      attr.ib(default=1)
+    max_expand_depth:      int =                      attr.ib(default=1)
+    version_column:        Optional[str] =            attr.ib(default=None)
 
     @property
     def has_joined_entities(self):
@@ -93,6 +111,69 @@ class Entity(object):
             len(api_path.joined_entities) > 0 for api_path in self.api_paths
         )
 
+    @property
+    def supports_set_based_delete(self) -> bool:
+        """Whether rows can be deleted with a DELETE statement instead of through the session
+
+        This is only safe when SQLAlchemy would not load any related rows to
+        delete or update them, ie. every relationship from the parent side
+        leaves that to the database with `passive_deletes` and no relationship
+        cascades deletes to its parent.
+        """
+        for relationship in self.relationships:
+            if relationship.source_foreign_key_column_name is None:
+                if not relationship.passive_deletes:
+                    return False
+            elif relationship.cascade is not None and \
+                    any(option in relationship.cascade for option in ['all', 'delete']):
+                return False
+        return True
+
+    @property
+    def json_translation_map(self) -> Dict[str, str]:
+        """Map of property name to the key it is serialized under
+
+        The identifier column is always serialized as `id` and the JSON key of a
+        to-one relationship is serialized under the relationship's property name.
+        """
+        translation_map = {self.identifier_column.python_name: 'id'}
+        for relationship in self.relationships:
+            if isinstance(relationship, RelationshipWithoutJoinTable) and relationship.join == JoinOption.to_one:
+                translation_map[relationship.key_alias_in_json] = relationship.property_name
+        return translation_map
+
+    @property
+    def column_json_names(self) -> Dict[str, str]:
+        """Map of column name to the JSON key it is serialized under"""
+        translation_map = self.json_translation_map
+        return {
+            column.python_name: to_json_case(translation_map.get(column.python_name, column.python_name))
+            for column in self.columns
+        }
+
+    @property
+    def sortable_columns(self) -> Dict[str, str]:
+        """Map of the JSON key list endpoints can be sorted by to its column name"""
+        json_names = self.column_json_names
+        return {json_names[column.python_name]: column.python_name for column in self.columns if column.sortable}
+
+    @property
+    def unversioned_relationships(self) -> List[str]:
+        """JSON keys of the eager relationships which can change without the version column
+
+        Only to-one relationships through a foreign key column of the entity are
+        written with its rows.
+        """
+        return [
+            relationship.json_property_name for relationship in self.relationships
+            if not relationship.lazy and not self._is_foreign_key_of_row(relationship)
+        ]
+
+    @staticmethod
+    def _is_foreign_key_of_row(relationship: Relationship) -> bool:
+        return isinstance(relationship, RelationshipWithoutJoinTable) and \
+            relationship.join == JoinOption.to_one and relationship.source_foreign_key_column_name is not None
+
 
 def create_entity(
         class_name:         str,
@@ -100,6 +181,7 @@ def create_entity(
         columns:            List[Column],
         relationships:      List[Relationship] = list(),
         uniques:            List[List[str]] = list(),
+        indexes:            List[List[str]] = list(),
         operations:         Optional[Set[OperationOption]] = None,
         display_name:       Optional[str] = None,
         table_name:         Optional[str] = None,
@@ -109,7 +191,12 @@ def create_entity(
         resource_path:      Optional[str] = None,
         api_paths:          Optional[List[APIPath]] = None,
         model_alias:        Optional[ImportAlias] = None,
-        additional_properties: Optional[List[AdditionalProperty]] = None
+        additional_properties: Optional[List[AdditionalProperty]] = None,
+        default_page_size:  Optional[int] = None,
+        max_page_size:      Optional[int] = None,
+        default_expand_depth: int = 1,
+        max_expand_depth:   Optional[int] = None,
+        version_column:     Optional[str] = None,
 ) -> Entity:
     """Return a fully configured Entity
 
@@ -134,7 +221,15 @@ def create_entity(
         uniques:             A list of list of column names that require unique indexes.
                              The identifier column does not need to appear in here.
 
+        indexes:             A list of list of column names to create composite indexes
+                             on, such as a foreign key followed by a column the related
+                             rows are filtered or sorted by. An index on several columns
+                             also serves lookups on its first column alone, so that
+                             column can be created with `index=False`.
+
         operations:          HTTP actions which should be generated for this entity.
+                             Defaults to `all_operations`, which leaves out opt in
+                             operations such as `export_all`, `import_all` and `delete_all`.
 
         display_name:        Human readable name (eg Book Club). Has sensible default.
 
@@ -159,10 +254,34 @@ def create_entity(
 
         additional_properties: Key value pairs to be added to the SQLAlchemy model.
                                They will end up in the model as `key = value`.
+
+        default_page_size:   Number of rows returned by the list endpoint when no `limit`
+                             is requested. By default every row is returned.
+
+        max_page_size:       Largest `limit` the list endpoint will honour. Also used as the
+                             page size when there is no default page size.
+
+        default_expand_depth: How many levels of eager relationships are embedded in
+                             responses which do not ask for an `expand` depth. With 0 the
+                             eager relationships are replaced by their identifiers.
+
+        max_expand_depth:    Largest `expand` depth the endpoints will honour. Defaults to
+                             `default_expand_depth`.
+
+        version_column:      A datetime or int column which changes whenever a row does,
+                             such as an `updated` timestamp. `GET` responses then carry an
+                             `ETag`, and a `Last-Modified` for datetimes, and are answered
+                             with a 304 from a query of that column alone when unchanged.
     """
     operations = operations if operations is not None else all_operations
+    _validate_page_sizes(default_page_size, max_page_size)
+    max_expand_depth = max_expand_depth if max_expand_depth is not None else default_expand_depth
+    _validate_expand_depths(default_expand_depth, max_expand_depth)
     python_name = pythonize(class_name)
     columns = [identifier_column, *columns]
+    _validate_indexes(indexes, columns)
+    if version_column is not None:
+        version_column = _validate_version_column(pythonize(version_column), columns)
     if [identifier_column.python_name] not in uniques:
         uniques = [[identifier_column.python_name], *uniques]
     max_property_length = _calculate_max_property_length(
@@ -178,12 +297,13 @@ def create_entity(
         display_name=display_name if display_name is not None else humanize(class_name),
         table_name=table_name if table_name is not None else None,
         uniques=uniques,
+        indexes=indexes,
         plural=plural if plural is not None else pluralize(python_name),
         dashed_plural=dashed_plural if dashed_plural is not None else dasherize(pluralize(python_name)),
         resource_namespace=resource_namespace if resource_namespace is not None else pluralize(python_name),
         resource_path=resource_path if resource_path is not None else '/',
         dashed_name=dasherize(python_name),
-        table_args=_convert_uniques_to_table_args_string(uniques),
+        table_args=_convert_table_args_to_string(table_name or python_name, uniques, indexes),
         operations=operations if operations is not None else all_operations,
         api_paths=api_paths if api_paths is not None else [],
         supports_put=OperationOption.create_with_id in operations,
@@ -193,8 +313,15 @@ def create_entity(
         supports_patch=OperationOption.patch in operations,
         supports_delete_one=OperationOption.delete_one in operations,
         supports_delete_all=OperationOption.delete_all in operations,
+        supports_export_all=OperationOption.export_all in operations,
+        supports_import_all=OperationOption.import_all in operations,
         model_alias=model_alias,
         additional_properties=additional_properties if additional_properties is not None else [],
+        default_page_size=default_page_size,
+        max_page_size=max_page_size,
+        default_expand_depth=default_expand_depth,
+        max_expand_depth=max_expand_depth,
+        version_column=version_column,
     )
 
 
@@ -213,13 +340,51 @@ def create_api_path(
                    python_name=python_name, property_name=property_name)
 
 
-def _convert_uniques_to_table_args_string(uniques: List[List[str]]) -> str:
-    unique_constraints = []
+def _validate_page_sizes(default_page_size: Optional[int], max_page_size: Optional[int]) -> None:
+    for page_size in [default_page_size, max_page_size]:
+        if page_size is not None and page_size < 1:
+            raise GenyratorError('Page sizes must be at least 1')
+    if default_page_size is not None and max_page_size is not None and default_page_size > max_page_size:
+        raise GenyratorError('default_page_size cannot be larger than max_page_size')
+
+
+def _validate_expand_depths(default_expand_depth: int, max_expand_depth: int) -> None:
+    if default_expand_depth < 0:
+        raise GenyratorError('default_expand_depth cannot be negative')
+    if default_expand_depth > max_expand_depth:
+        raise GenyratorError('default_expand_depth cannot be larger than max_expand_depth')
+
+
+def _validate_indexes(indexes: List[List[str]], columns: List[Column]) -> None:
+    column_names = set(['id', *[column.python_name for column in columns]])
+    for index_columns in indexes:
+        if not index_columns:
+            raise GenyratorError('Indexes must have at least one column')
+        for column_name in index_columns:
+            if column_name not in column_names:
+                raise GenyratorError('Cannot index unknown column {}'.format(column_name))
+
+
+def _validate_version_column(version_column: str, columns: List[Column]) -> str:
+    column = next((column for column in columns if column.python_name == version_column), None)
+    if column is None:
+        raise GenyratorError('Unknown version column {}'.format(version_column))
+    if column.type_option not in (TypeOption.datetime, TypeOption.int):
+        raise GenyratorError('Version column {} must be a datetime or an int'.format(version_column))
+    return version_column
+
+
+def _convert_table_args_to_string(table_name: str, uniques: List[List[str]], indexes: List[List[str]]) -> str:
+    table_args = []
     for unique_columns in uniques:
-        unique_constraints.append('UniqueConstraint({}, )'.format(
+        table_args.append('UniqueConstraint({}, )'.format(
             ', '.join(["'{}'".format(uc) for uc in unique_columns])
         ))
-    return '({}, )'.format(', '.join(unique_constraints))
+    for index_columns in indexes:
+        table_args.append("Index('ix_{}_{}', {}, )".format(
+            table_name, '_'.join(index_columns), ', '.join(["'{}'".format(ic) for ic in index_columns])
+        ))
+    return '({}, )'.format(', '.join(table_args))
 
 
 def _calculate_max_property_length(
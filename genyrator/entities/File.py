@@ -1,8 +1,13 @@
+import hashlib
+import json
 import os
-from typing import List, NamedTuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, NamedTuple, Optional
 import attr
 
 from genyrator.entities.Template import Template
+from genyrator.errors import GenyratorError
 from genyrator.template_config import TemplateConfig
 
 FileList = NamedTuple('FileList', [
@@ -14,31 +19,176 @@ FileList = NamedTuple('FileList', [
     ('domain_models',    List['File']),
     ('resources',        List['File']), ])
 
+MANIFEST_FILE_NAME = '.genyrator-manifest.json'
+READ_CHUNK_SIZE = 64 * 1024
+
+# path of a written file -> {'hash': ..., 'size': ..., 'mtime_ns': ...}
+Manifest = Dict[str, Dict[str, Any]]
+
 
 @attr.s
 class File(object):
-    file_name: str =       attr.ib()
-    file_path: List[str] = attr.ib()
-    contents:  str =       attr.ib()
+    """A file to be generated
 
-    def write(self):
-        file_path = os.path.join(*self.file_path)
-        try:
-            os.makedirs(file_path)
-        except FileExistsError:
-            ...
-        file = os.path.join(file_path, self.file_name)
-        with open(file, 'w') as f:
+    If the file is created from a template its contents are only rendered
+    the first time they are accessed or the file is written.
+    """
+    file_name: str =                attr.ib()
+    file_path: List[str] =          attr.ib()
+    template:  Optional[Template] = attr.ib(default=None, repr=False)
+    _contents: Optional[str] =      attr.ib(default=None, repr=False)
+
+    @property
+    def contents(self) -> str:
+        if self._contents is None:
+            if self.template is None:
+                raise GenyratorError('File {} has no contents or template'.format(self.file_name))
+            self._contents = self.template.render()
+        return self._contents
+
+    @property
+    def path(self) -> str:
+        return os.path.join(*self.file_path, self.file_name)
+
+    def write(self, manifest: Optional[Manifest] = None) -> bool:
+        """Write the file unless an identical file already exists
+
+        Returns whether the file was written. Skipping identical files leaves
+        their mtime alone, so reloaders and `__pycache__` are not disturbed.
+
+        If the contents have not been rendered yet the template is streamed
+        straight to disk, so the contents are never held in memory.
+
+        Args:
+            manifest: Hashes recorded by a previous write. If the file on disk
+                      still has the recorded size and mtime it is not read again.
+                      Updated in place with the hash of this file.
+        """
+        if self._contents is None and self.template is not None:
+            return self._stream(manifest)
+        file = self.path
+        contents_hash = hash_contents(self.contents)
+        if self._is_unchanged(manifest, contents_hash):
+            _update_manifest(manifest, file, contents_hash)
+            return False
+        os.makedirs(os.path.join(*self.file_path), exist_ok=True)
+        with open(file, 'w', encoding='utf-8') as f:
             f.write(self.contents)
+        _update_manifest(manifest, file, contents_hash)
+        return True
+
+    def _stream(self, manifest: Optional[Manifest]) -> bool:
+        assert self.template is not None
+        file = self.path
+        os.makedirs(os.path.join(*self.file_path), exist_ok=True)
+        temporary_file = os.path.join(
+            *self.file_path, '.{}.{}.tmp'.format(self.file_name, os.getpid()),
+        )
+        digest = hashlib.sha256()
+        try:
+            with open(temporary_file, 'w', encoding='utf-8') as f:
+                for chunk in self.template.generate():
+                    digest.update(chunk.encode('utf-8'))
+                    f.write(chunk)
+            contents_hash = digest.hexdigest()
+            if self._is_unchanged(manifest, contents_hash):
+                os.remove(temporary_file)
+                _update_manifest(manifest, file, contents_hash)
+                return False
+            os.replace(temporary_file, file)
+        except BaseException:
+            if os.path.exists(temporary_file):
+                os.remove(temporary_file)
+            raise
+        _update_manifest(manifest, file, contents_hash)
+        return True
+
+    def _is_unchanged(self, manifest: Optional[Manifest], contents_hash: str) -> bool:
+        file = self.path
+        if manifest is not None and _manifest_entry_matches(manifest.get(file), file, contents_hash):
+            return True
+        return _read_file_hash(file) == contents_hash
+
+
+def hash_contents(contents: str) -> str:
+    return hashlib.sha256(contents.encode('utf-8')).hexdigest()
+
+
+def read_manifest(manifest_path: str) -> Manifest:
+    try:
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def write_manifest(manifest_path: str, manifest: Manifest) -> None:
+    os.makedirs(os.path.dirname(manifest_path) or '.', exist_ok=True)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def _manifest_entry_matches(entry: Optional[Dict[str, Any]], file: str, contents_hash: str) -> bool:
+    if entry is None or entry.get('hash') != contents_hash:
+        return False
+    try:
+        stat = os.stat(file)
+    except FileNotFoundError:
+        return False
+    return entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns
+
+
+def _read_file_hash(file: str) -> Optional[str]:
+    digest = hashlib.sha256()
+    try:
+        with open(file, encoding='utf-8') as f:
+            for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), ''):
+                digest.update(chunk.encode('utf-8'))
+    except (FileNotFoundError, UnicodeDecodeError):
+        return None
+    return digest.hexdigest()
+
+
+def _update_manifest(manifest: Optional[Manifest], file: str, contents_hash: str) -> None:
+    if manifest is None:
+        return
+    stat = os.stat(file)
+    manifest[file] = {'hash': contents_hash, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
 
 
 def create_files_from_template_config(
         file_path:       List[str],
-        template_config: TemplateConfig
+        template_config: TemplateConfig,
+        workers:         Optional[int] = None,
 ) -> FileList:
-    args = {}
-    for key, templates in template_config._asdict().items():
-        args[key] = [create_file_from_template(file_path, template) for template in templates]
+    """Render every template in the config into a file
+
+    Args:
+        file_path:       The directory the files will be written into.
+
+        template_config: The templates to render.
+
+        workers:         The number of processes to render the templates with.
+                         If None the files are rendered in this process the first
+                         time their contents are needed.
+    """
+    keyed_templates = [
+        (key, template)
+        for key, templates in template_config._asdict().items()
+        for template in templates
+    ]
+    templates = [template for _, template in keyed_templates]
+    if workers is None:
+        files = [create_file_from_template(file_path, template) for template in templates]
+    else:
+        render = partial(_render_file_from_template, file_path)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunksize = max(1, len(templates) // (workers * 4))
+            files = list(executor.map(render, templates, chunksize=chunksize))
+    args: Dict[str, List[File]] = {key: [] for key in template_config._fields}
+    for (key, _), file in zip(keyed_templates, files):
+        args[key].append(file)
     return FileList(**args)
 
 
@@ -52,5 +202,14 @@ def create_file_from_template(file_path: List[str], template: Template) -> File:
     return File(
         file_name=file_name,
         file_path=file_path,
-        contents=template.render(),
+        template=template,
+    )
+
+
+def _render_file_from_template(file_path: List[str], template: Template) -> File:
+    file = create_file_from_template(file_path, template)
+    return File(
+        file_name=file.file_name,
+        file_path=file.file_path,
+        contents=file.contents,
     )
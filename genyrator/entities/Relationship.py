@@ -11,6 +11,18 @@ class JoinOption(Enum):
     to_many = 'to_many'
 
 
+class LoadingStrategy(Enum):
+    select =   'select'
+    joined =   'joined'
+    selectin = 'selectin'
+    subquery = 'subquery'
+    raise_ =   'raise'
+    noload =   'noload'
+
+
+eager_loading_strategies = {LoadingStrategy.joined, LoadingStrategy.selectin, LoadingStrategy.subquery}
+
+
 @attr.s
 class Relationship(object):
     python_name:                    str =            attr.ib()
@@ -25,6 +37,7 @@ class Relationship(object):
     key_alias_in_json:              str =            attr.ib()
     nullable:                       bool =           attr.ib()
     lazy:                           bool =           attr.ib()
+    loading:                        LoadingStrategy = attr.ib()
     join:                           JoinOption =     attr.ib()
     secondary_join_name:            Optional[str] =  attr.ib()
     passive_deletes:                Optional[Union[bool, str]] = attr.ib()
@@ -60,6 +73,7 @@ def create_relationship(
         passive_deletes:                Optional[Union[bool, str]] = None,
         cascade:                        Optional[str] = None,
         post_update:                    bool = False,
+        loading:                        Optional[LoadingStrategy] = None,
 ) -> Relationship:
     """Return a relationship between two entities
 
@@ -71,6 +85,11 @@ def create_relationship(
 
         lazy: If False the target entity is embedded in the JSON response.
 
+        loading: How SQLAlchemy loads the target entity. Defaults to a joined
+                 eager load if `lazy` is False and to loading on access otherwise.
+                 `LoadingStrategy.selectin` avoids repeating the parent row for
+                 every child of a to-many relationship.
+
         join: Whether the relationship is 1-to-1 or 1-to-many. If 1-to-1 the property
               will be scalar, if 1-to-many it will be a list.
 
@@ -124,6 +143,11 @@ def create_relationship(
             raise GenyratorError('Must have a key_alias_in_json or target_idenfitier_column_name')
         key_alias_in_json = target_identifier_column_name
 
+    if loading is None:
+        loading = LoadingStrategy.select if lazy else LoadingStrategy.joined
+    if not lazy and loading in (LoadingStrategy.raise_, LoadingStrategy.noload):
+        raise GenyratorError('Relationships embedded in JSON cannot use the {} loading strategy'.format(loading.value))
+
     if isinstance(passive_deletes, str) and passive_deletes != 'all':
         passive_deletes = None
 
@@ -139,6 +163,7 @@ def create_relationship(
         key_alias_in_json=key_alias_in_json,
         nullable=nullable,
         lazy=lazy,
+        loading=loading,
         join=join,
         secondary_join_name=secondary_join_name,
         passive_deletes=passive_deletes,
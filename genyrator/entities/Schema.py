@@ -1,8 +1,13 @@
-from typing import List, Optional
+import compileall
+import os
+from typing import Iterable, List, Optional
 import attr
 
 from genyrator.entities.Entity import Entity
-from genyrator.entities.File import create_files_from_template_config, FileList
+from genyrator.errors import GenyratorError
+from genyrator.entities.File import (
+    File, FileList, MANIFEST_FILE_NAME, create_files_from_template_config, read_manifest, write_manifest,
+)
 from genyrator.template_config import create_template_config, TemplateConfig
 
 
@@ -14,34 +19,57 @@ class Schema(object):
     files:           FileList =       attr.ib()
     api_name:        str =            attr.ib()
     api_description: str =            attr.ib()
+    file_path:       List[str] =      attr.ib()
 
-    def write_files(self) -> None:
-        for file_list in self.files:
-            [f.write() for f in file_list]
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(*self.file_path, MANIFEST_FILE_NAME)
+
+    def write_files(self, compile_bytecode: bool = False) -> None:
+        """Write every file in the schema
+
+        Args:
+            compile_bytecode: Byte-compile the generated module in parallel after
+                              writing it, so the first import does not have to.
+                              Modules which were not rewritten keep their
+                              existing `.pyc` files.
+        """
+        self._write(f for file_list in self.files for f in file_list)
+        if compile_bytecode:
+            self.compile_bytecode()
+
+    def compile_bytecode(self) -> None:
+        if not compileall.compile_dir(os.path.join(*self.file_path), quiet=1, workers=0):
+            raise GenyratorError('Could not compile the generated module {}'.format(self.module_name))
 
     def write_resources(self):
-        for resource in self.files.resources:
-            resource.write()
+        self._write(self.files.resources)
 
     def write_db_init(self):
-        for model in self.files.db_models:
-            model.write()
+        self._write(self.files.db_init)
 
     def write_db_models(self):
-        for model in self.files.db_models:
-            model.write()
+        self._write(self.files.db_models)
 
     def write_fixtures(self):
-        for model in self.files.fixtures:
-            model.write()
+        self._write(self.files.fixtures)
 
     def write_core_files(self):
-        for core_file in self.files.core:
-            core_file.write()
+        self._write(self.files.core)
 
     def write_domain_models(self):
-        for domain_model in self.files.domain_models:
-            domain_model.write()
+        self._write(self.files.domain_models)
+
+    def _write(self, files: Iterable[File]) -> List[str]:
+        """Write files whose contents have changed and return their paths
+
+        The hash of every file is kept in a manifest next to the generated
+        module so unchanged files are skipped without being read.
+        """
+        manifest = read_manifest(self.manifest_path)
+        written = [f.path for f in files if f.write(manifest)]
+        write_manifest(self.manifest_path, manifest)
+        return written
 
 
 def create_schema(
@@ -51,7 +79,26 @@ def create_schema(
         api_name:        Optional[str] = None,
         api_description: Optional[str] = None,
         file_path:       Optional[List[str]] = None,
+        workers:         Optional[int] = None,
 ) -> Schema:
+    """Return a schema with a file rendered for every template
+
+    Args:
+        module_name:     The python module the app will be generated into.
+
+        entities:        The entities to generate the app from.
+
+        db_import_path:  Where the SQLAlchemy `db` is imported from. Has sensible default.
+
+        api_name:        The title of the RESTPlus API. Has sensible default.
+
+        api_description: The description of the RESTPlus API.
+
+        file_path:       The directory to write the files into. Has sensible default.
+
+        workers:         Render the files in a pool of this many processes. Output
+                         is identical to rendering in this process.
+    """
     db_import_path = db_import_path if db_import_path else '{}.sqlalchemy'.format(module_name)
     file_path =  file_path if file_path else [module_name]
     api_name = api_name if api_name else module_name
@@ -63,7 +110,7 @@ def create_schema(
         api_name=api_name,
         api_description=api_description,
     )
-    file_list = create_files_from_template_config(file_path, template_config)
+    file_list = create_files_from_template_config(file_path, template_config, workers=workers)
     return Schema(
         module_name=module_name,
         entities=entities,
@@ -71,4 +118,5 @@ def create_schema(
         files=file_list,
         api_name=api_name,
         api_description=api_description,
+        file_path=file_path,
     )
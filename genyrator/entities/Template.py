@@ -1,14 +1,32 @@
-from typing import List, Optional, NewType, Tuple, NamedTuple, Type
+from typing import Iterator, List, Optional, NewType, Tuple, NamedTuple, Type
 import attr
-from jinja2 import Template as JinjaTemplate, StrictUndefined
+from jinja2 import Template as JinjaTemplate
 
-from genyrator.entities.Entity import Entity
-from genyrator.path import create_relative_path
+from genyrator.entities.Entity import APIPath, Entity
+from genyrator.entities.Relationship import JoinOption, LoadingStrategy, eager_loading_strategies
+from genyrator.errors import GenyratorError
+from genyrator.inflector import pythonize, to_json_case
+from genyrator.template_environment import get_environment
+from genyrator.types import TypeOption
 
 OutPath = NewType('OutPath', Tuple[List[str], str])
 Import = NamedTuple('Import',
                     [('module_name', str),
                      ('imports',     List[str]), ])
+SerializedProperty = NamedTuple('SerializedProperty',
+                                [('json_name',   str),
+                                 ('python_name', str),
+                                 ('converter',   Optional[str]), ])
+SerializedRelationship = NamedTuple('SerializedRelationship',
+                                    [('json_name',          str),
+                                     ('property_name',      str),
+                                     ('target_python_name', str),
+                                     ('target_class_name',  str),
+                                     ('loader',             str),
+                                     ('many',               bool),
+                                     ('replaces_property',  bool),
+                                     ('target_identifier',  str),
+                                     ('identifier_converter', Optional[str]), ])
 
 
 @attr.s
@@ -19,17 +37,18 @@ class Template(object):
     relative_path:      List[str] =         attr.ib()
     out_path:           Optional[OutPath] = attr.ib()
 
-    def create_template(self):
-        path = create_relative_path(
-            [*self.template_file_path, self.template_file_name]
+    def create_template(self) -> JinjaTemplate:
+        return get_environment().get_template(
+            '/'.join([*self.relative_path, self.template_file_name])
         )
-        with open(path) as f:
-            template = JinjaTemplate(f.read(), undefined=StrictUndefined)
-        return template
 
     def render(self):
         return self.create_template().render(template=self)
 
+    def generate(self) -> Iterator[str]:
+        """Render the template piece by piece rather than into one string"""
+        return self.create_template().generate(template=self)
+
 
 def create_template(
         constructor,
@@ -62,6 +81,29 @@ class RootSchema(Template):
     entities:    List[Entity] = attr.ib()
 
 
+@attr.s
+class ConvertCase(Template):
+    entities: List[Entity] = attr.ib()
+
+    def python_names(self) -> List[str]:
+        """Every property name the generated app serializes, in a stable order"""
+        names = set()
+        for entity in self.entities:
+            names.update(['id', entity.identifier_column.python_name])
+            names.update(column.python_name for column in entity.columns)
+            names.update(entity.json_translation_map.values())
+            for relationship in entity.relationships:
+                names.update([relationship.property_name, relationship.key_alias_in_json])
+            names.update(p.python_name for p in entity.additional_properties)
+        return sorted(names)
+
+    def json_names(self) -> List[Tuple[str, str]]:
+        return [(name, to_json_case(name)) for name in self.python_names()]
+
+    def python_names_by_json_name(self) -> List[Tuple[str, str]]:
+        return sorted({json_name: pythonize(json_name) for _, json_name in self.json_names()}.items())
+
+
 @attr.s
 class ConvertDict(Template):
     module_name: str = attr.ib()
@@ -98,11 +140,44 @@ class RestplusModel(Template):
 
 @attr.s
 class Resource(Template):
-    module_name:       str =    attr.ib()
-    db_import_path:    str =    attr.ib()
-    entity:            Entity = attr.ib()
-    restplus_template: str =    attr.ib()
-    TypeOption:        Type =   attr.ib()
+    module_name:       str =          attr.ib()
+    db_import_path:    str =          attr.ib()
+    entity:            Entity =       attr.ib()
+    entities:          List[Entity] = attr.ib()
+    restplus_template: Template =     attr.ib()
+    TypeOption:        Type =         attr.ib()
+
+    def api_path_loaders(self, api_path: APIPath) -> List[str]:
+        """The SQLAlchemy loader option for each relationship along an API path
+
+        Eager relationships keep their own strategy. Lazy ones are loaded with
+        `selectinload` if they are collections and `joinedload` otherwise.
+        Names which are not relationships of a known entity use `joinedload`.
+        """
+        loaders = []
+        entity: Optional[Entity] = self.entity
+        for name in api_path.joined_entities:
+            relationship = next(
+                (r for r in entity.relationships if r.property_name == name), None,
+            ) if entity is not None else None
+            if relationship is None:
+                loaders.append('joinedload')
+                entity = None
+                continue
+            if relationship.loading in eager_loading_strategies:
+                loading = relationship.loading
+            elif relationship.join == JoinOption.to_many:
+                loading = LoadingStrategy.selectin
+            else:
+                loading = LoadingStrategy.joined
+            loaders.append('{}load'.format(loading.value))
+            entity = next((e for e in self.entities if e.class_name == relationship.target_entity_class_name), None)
+        return loaders
+
+    def api_path_loader_imports(self) -> List[str]:
+        return sorted(set(
+            loader for api_path in self.entity.api_paths or [] for loader in self.api_path_loaders(api_path)
+        ))
 
 
 @attr.s
@@ -132,12 +207,21 @@ class ConvertProperties(Template):
 
 @attr.s
 class ConvertModels(Template):
-    module_name: str = attr.ib()
+    module_name: str =          attr.ib()
+    entities:    List[Entity] = attr.ib()
 
 
 @attr.s
 class JoinEntities(Template):
-    module_name: str = attr.ib()
+    module_name:    str = attr.ib()
+    db_import_path: str = attr.ib()
+
+
+@attr.s
+class IdentifierCache(Template):
+    module_name:    str =          attr.ib()
+    db_import_path: str =          attr.ib()
+    entities:       List[Entity] = attr.ib()
 
 
 @attr.s
@@ -146,6 +230,12 @@ class ConvertDictToMarshmallow(Template):
     db_import_path: str = attr.ib()
 
 
+@attr.s
+class BulkImport(Template):
+    module_name:    str = attr.ib()
+    db_import_path: str = attr.ib()
+
+
 @attr.s
 class FixtureInit(Template):
     module_name:    str =          attr.ib()
@@ -157,3 +247,64 @@ class Fixture(Template):
     db_import_path: str = attr.ib()
     module_name: str =    attr.ib()
     entity: Entity =      attr.ib()
+
+
+@attr.s
+class Serializers(Template):
+    module_name: str =          attr.ib()
+    entities:    List[Entity] = attr.ib()
+
+    def properties(self, entity: Entity) -> List[SerializedProperty]:
+        """The columns of an entity with their JSON key and value converter"""
+        json_names = entity.column_json_names
+        return [
+            SerializedProperty(
+                json_name=json_names[column.python_name],
+                python_name=column.python_name,
+                converter=self._converter(column.type_option),
+            )
+            for column in entity.columns
+        ]
+
+    def eager_relationships(self, entity: Entity) -> List[SerializedRelationship]:
+        """The relationships of an entity which are always embedded in its JSON"""
+        property_keys = set(entity.json_translation_map.get(c.python_name, c.python_name) for c in entity.columns)
+        relationships = []
+        for relationship in entity.relationships:
+            if relationship.lazy:
+                continue
+            target = self._find_entity(relationship.target_entity_class_name)
+            relationships.append(SerializedRelationship(
+                json_name=to_json_case(relationship.property_name),
+                property_name=relationship.property_name,
+                target_python_name=target.python_name,
+                target_class_name=target.class_name,
+                loader=self._loader(relationship.loading),
+                many=relationship.join == JoinOption.to_many,
+                replaces_property=relationship.property_name in property_keys,
+                target_identifier=target.identifier_column.python_name,
+                identifier_converter=self._converter(target.identifier_column.type_option),
+            ))
+        return relationships
+
+    @staticmethod
+    def _loader(loading: LoadingStrategy) -> str:
+        """The loader option which loads a relationship for many rows at once"""
+        return {
+            LoadingStrategy.joined:   'joinedload',
+            LoadingStrategy.subquery: 'subqueryload',
+        }.get(loading, 'selectinload')
+
+    @staticmethod
+    def _converter(type_option: TypeOption) -> Optional[str]:
+        return {
+            TypeOption.UUID:     '_uuid_to_json',
+            TypeOption.date:     '_date_to_json',
+            TypeOption.datetime: '_date_to_json',
+        }.get(type_option)
+
+    def _find_entity(self, class_name: str) -> Entity:
+        for entity in self.entities:
+            if entity.class_name == class_name:
+                return entity
+        raise GenyratorError('Relationship to unknown entity {}'.format(class_name))
@@ -18,6 +18,7 @@ def create_entity_from_type_dict(
         relationships:          Optional[List[Relationship]] = None,
         table_name:             Optional[str] = None,
         uniques:                Optional[List[List[str]]] = None,
+        composite_indexes:      Optional[List[List[str]]] = None,
         api_paths:              Optional[List[APIPath]] = None,
         model_alias:            Optional[ImportAlias] = None,
         additional_properties:  Optional[List[AdditionalProperty]] = None,
@@ -34,7 +35,7 @@ def create_entity_from_type_dict(
         v = v.replace('?', '')
         type_option = string_to_type_option(v)
         foreign_key = foreign_keys_dict[k] if k in foreign_keys_dict else None
-        index = k in indexes
+        index = True if k in indexes else None
         if pythonize(k) == pythonize(identifier_column_name):
             identifier_column = create_identifier_column(k, type_option)
         else:
@@ -59,6 +60,7 @@ def create_entity_from_type_dict(
         relationships=relationships if relationships else [],
         table_name=table_name,
         uniques=uniques if uniques else [],
+        indexes=composite_indexes if composite_indexes else [],
         api_paths=api_paths,
         model_alias=model_alias,
         additional_properties=additional_properties if additional_properties is not None else [],
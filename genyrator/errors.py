@@ -2,3 +2,7 @@
 
 class GenyratorError(Exception):
     pass
+
+
+class GenyratorWarning(UserWarning):
+    pass
@@ -28,8 +28,13 @@ def create_template_config(
         create_template(Template.Config, ['config'], module_name=module_name),
     ]
     core_files = [
-        create_template(Template.Template, ['core', 'convert_case']),
+        create_template(Template.Template, ['core', 'conditional']),
+        create_template(Template.ConvertCase, ['core', 'convert_case'], entities=entities),
         create_template(Template.ConvertDict, ['core', 'convert_dict'], module_name=module_name),
+        create_template(Template.Template, ['core', 'expand']),
+        create_template(Template.Template, ['core', 'fields']),
+        create_template(Template.Template, ['core', 'filters']),
+        create_template(Template.Template, ['core', 'pagination']),
     ]
     db_init = [
         create_template(Template.Template, ['sqlalchemy', '__init__']),
@@ -46,14 +51,28 @@ def create_template_config(
         ),
         create_template(Template.ModelToDict, ['sqlalchemy', 'model_to_dict'], module_name=module_name),
         create_template(Template.ConvertProperties, ['sqlalchemy', 'convert_properties'], module_name=module_name),
-        create_template(Template.ConvertModels, ['sqlalchemy', 'convert_between_models'], module_name=module_name),
-        create_template(Template.JoinEntities, ['sqlalchemy', 'join_entities'], module_name=module_name),
+        create_template(
+            Template.ConvertModels, ['sqlalchemy', 'convert_between_models'], module_name=module_name, entities=entities,
+        ),
+        create_template(
+            Template.JoinEntities, ['sqlalchemy', 'join_entities'], module_name=module_name, db_import_path=db_import_path,
+        ),
+        create_template(
+            Template.IdentifierCache, ['sqlalchemy', 'identifier_cache'],
+            module_name=module_name, db_import_path=db_import_path, entities=entities,
+        ),
+        create_template(
+            Template.Serializers, ['sqlalchemy', 'serializers'], module_name=module_name, entities=entities,
+        ),
         create_template(Template.Template, ['sqlalchemy', 'model', 'types']),
         create_template(
             Template.ConvertDictToMarshmallow,
             ['sqlalchemy', 'convert_dict_to_marshmallow_result'],
             module_name=module_name, db_import_path=db_import_path,
         ),
+        create_template(
+            Template.BulkImport, ['sqlalchemy', 'bulk_import'], module_name=module_name, db_import_path=db_import_path,
+        ),
     ]
     fixtures = [
         create_template(Template.FixtureInit, ['sqlalchemy', 'fixture', '__init__'],
@@ -79,10 +98,10 @@ def create_template_config(
         *[create_template(
             Template.Resource, ['resources', 'resource'],
             entity=entity, out_path=Template.OutPath((['resources'], entity.class_name)),
-            db_import_path=db_import_path, module_name=module_name,
+            db_import_path=db_import_path, module_name=module_name, entities=entities,
             restplus_template=create_template(
                 Template.RestplusModel, ['resources', 'restplus_model'], entity=entity
-            ).render(),
+            ),
             TypeOption=TypeOption,
         ) for entity in entities],
         create_template(
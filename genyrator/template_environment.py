@@ -0,0 +1,51 @@
+import os
+from typing import Optional
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, StrictUndefined
+
+from genyrator.path import create_relative_path
+
+BYTECODE_CACHE_ENVIRONMENT_VARIABLE = 'GENYRATOR_BYTECODE_CACHE'
+
+_environment: Optional[Environment] = None
+
+
+def create_environment(bytecode_cache_path: Optional[str] = None) -> Environment:
+    """Return a Jinja environment which loads templates from `genyrator/templates`
+
+    Compiled templates are kept in memory for the life of the environment so
+    each template is only parsed and compiled once.
+
+    Args:
+        bytecode_cache_path: Directory in which to store compiled template bytecode.
+                             If set, later processes load the bytecode instead of
+                             recompiling the templates.
+    """
+    bytecode_cache = None
+    if bytecode_cache_path is not None:
+        os.makedirs(bytecode_cache_path, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(bytecode_cache_path)
+    return Environment(
+        loader=FileSystemLoader(create_relative_path(['genyrator', 'templates'])),
+        undefined=StrictUndefined,
+        cache_size=-1,
+        bytecode_cache=bytecode_cache,
+    )
+
+
+def configure_environment(bytecode_cache_path: Optional[str] = None) -> Environment:
+    """Replace the process-wide environment, eg. to enable the bytecode cache"""
+    global _environment
+    _environment = create_environment(bytecode_cache_path)
+    return _environment
+
+
+def get_environment() -> Environment:
+    """Return the process-wide environment, creating it on first use
+
+    The bytecode cache is enabled if the `GENYRATOR_BYTECODE_CACHE`
+    environment variable is set to a directory.
+    """
+    if _environment is None:
+        return configure_environment(os.environ.get(BYTECODE_CACHE_ENVIRONMENT_VARIABLE))
+    return _environment
@@ -1,6 +1,6 @@
 from datetime import datetime, date
 from enum import Enum
-from typing import Any, Optional
+from typing import Any, List, Optional
 from uuid import UUID
 
 
@@ -16,6 +16,26 @@ class TypeOption(Enum):
     UUID =     'UUID'
 
 
+class FilterOperator(Enum):
+    lt =     'lt'
+    lte =    'lte'
+    gt =     'gt'
+    gte =    'gte'
+    prefix = 'prefix'
+
+
+def type_option_to_filter_operators(type_option: TypeOption) -> List[FilterOperator]:
+    """The filter operators which make sense for the values of a type"""
+    comparisons = [FilterOperator.lt, FilterOperator.lte, FilterOperator.gt, FilterOperator.gte]
+    return {
+        TypeOption.string:   [*comparisons, FilterOperator.prefix],
+        TypeOption.int:      comparisons,
+        TypeOption.float:    comparisons,
+        TypeOption.datetime: comparisons,
+        TypeOption.date:     comparisons,
+    }.get(type_option, [])
+
+
 def string_to_type_option(string_type: str) -> TypeOption:
     return {
         'str':      TypeOption.string,
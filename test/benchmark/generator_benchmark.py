@@ -0,0 +1,248 @@
+"""Benchmark the generator against synthetic schemas
+
+Each schema size is run in a fresh process so that peak RSS is measured
+for that size alone. Results are written as JSON so runs from different
+commits can be compared:
+
+    python -m test.benchmark.generator_benchmark --output before.json
+    python -m test.benchmark.generator_benchmark --output after.json
+    python -m test.benchmark.generator_benchmark --compare before.json after.json
+
+Files render lazily, so without `--workers` the templates are rendered while
+they are streamed to disk in `render_and_write_files`. With `--workers` they
+are rendered in the pool during `create_files` instead.
+"""
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from genyrator import (
+    Entity, JoinOption, TypeOption, create_column, create_entity, create_identifier_column, create_relationship,
+)
+from genyrator.entities.Column import ForeignKeyRelationship
+from genyrator.entities.Entity import create_api_path
+from genyrator.entities.File import create_files_from_template_config
+from genyrator.entities.Schema import Schema
+from genyrator.entities.Relationship import Relationship
+from genyrator.template_config import create_template_config
+
+DEFAULT_SIZES = [10, 100, 1000, 5000]
+MODULE_NAME = 'benchmark_app'
+PHASES = [
+    'create_template_config',
+    'create_files',
+    'render_and_write_files',
+    'write_files_unchanged',
+]
+
+
+def _class_name(index: int) -> str:
+    return 'Entity{:05d}'.format(index)
+
+
+def _parent_index(index: int) -> Optional[int]:
+    return (index - 1) // 2 if index > 0 else None
+
+
+def create_synthetic_entities(size: int) -> List[Entity]:
+    """Return `size` entities joined into a binary tree
+
+    Every entity has a mix of column types. Each child has an eager to-one
+    relationship to its parent, with an API path to follow it, and each parent
+    has a lazy to-many relationship to its children.
+    """
+    children: Dict[int, List[int]] = {}
+    for index in range(1, size):
+        children.setdefault(_parent_index(index), []).append(index)  # type: ignore
+
+    entities = []
+    for index in range(size):
+        class_name = _class_name(index)
+        parent_index = _parent_index(index)
+        columns = [
+            create_column('name', TypeOption.string, index=True, nullable=False),
+            create_column('description', TypeOption.string),
+            create_column('rating', TypeOption.float, index=True, nullable=False),
+            create_column('stock', TypeOption.int),
+            create_column('in_print', TypeOption.bool),
+            create_column('published', TypeOption.date),
+            create_column('updated', TypeOption.datetime),
+            create_column('document', TypeOption.dict),
+        ]
+        relationships: List[Relationship] = []
+        api_paths = []
+        if parent_index is not None:
+            columns.append(create_column(
+                'parent_id', TypeOption.int,
+                foreign_key_relationship=ForeignKeyRelationship(
+                    target_entity=_class_name(parent_index),
+                    target_entity_identifier_column_type=TypeOption.UUID,
+                ),
+            ))
+            relationships.append(create_relationship(
+                target_entity_class_name=_class_name(parent_index),
+                source_identifier_column_name='identifier',
+                source_foreign_key_column_name='parent_id',
+                target_identifier_column_name='identifier',
+                key_alias_in_json='parent_id',
+                property_name='parent',
+                nullable=True,
+                lazy=False,
+                join=JoinOption.to_one,
+            ))
+            api_paths.append(create_api_path(joined_entities=['parent'], route='parent'))
+        for child_index in children.get(index, []):
+            relationships.append(create_relationship(
+                target_entity_class_name=_class_name(child_index),
+                source_identifier_column_name='identifier',
+                target_identifier_column_name='identifier',
+                target_foreign_key_column_name='parent_id',
+                property_name='children_{}'.format(child_index),
+                nullable=True,
+                lazy=True,
+                join=JoinOption.to_many,
+            ))
+        entities.append(create_entity(
+            class_name=class_name,
+            identifier_column=create_identifier_column('identifier', TypeOption.UUID),
+            columns=columns,
+            relationships=relationships,
+            api_paths=api_paths,
+        ))
+    return entities
+
+
+def _timed(fn: Callable[[], Any]) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def _peak_rss_kb() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports kilobytes
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def benchmark_size(size: int, workers: Optional[int] = None) -> Mapping[str, Any]:
+    """Time each phase of generating a schema of `size` entities"""
+    entities = create_synthetic_entities(size)
+    timings = {}
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = [directory, MODULE_NAME]
+        template_config, timings['create_template_config'] = _timed(lambda: create_template_config(
+            module_name=MODULE_NAME,
+            db_import_path='{}.sqlalchemy'.format(MODULE_NAME),
+            entities=entities,
+            api_name=MODULE_NAME,
+            api_description='',
+        ))
+        files, timings['create_files'] = _timed(
+            lambda: create_files_from_template_config(file_path, template_config, workers=workers)
+        )
+        schema = Schema(
+            module_name=MODULE_NAME, entities=entities, templates=template_config, files=files,
+            api_name=MODULE_NAME, api_description='', file_path=file_path,
+        )
+        _, timings['render_and_write_files'] = _timed(schema.write_files)
+        _, timings['write_files_unchanged'] = _timed(schema.write_files)
+        file_count = sum(len(file_list) for file_list in files)
+    return {
+        'entities':    size,
+        'files':       file_count,
+        'workers':     workers,
+        'seconds':     timings,
+        'peak_rss_kb': _peak_rss_kb(),
+    }
+
+
+def _run_size_in_subprocess(size: int, workers: Optional[int]) -> Mapping[str, Any]:
+    command = [sys.executable, '-m', 'test.benchmark.generator_benchmark', '--single', str(size)]
+    if workers is not None:
+        command += ['--workers', str(workers)]
+    completed = subprocess.run(command, check=True, stdout=subprocess.PIPE)
+    return json.loads(completed.stdout)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        ).stdout.decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(sizes: List[int], workers: Optional[int] = None) -> Mapping[str, Any]:
+    results = []
+    for size in sizes:
+        result = _run_size_in_subprocess(size, workers)
+        print(_format_result(result), file=sys.stderr)
+        results.append(result)
+    return {
+        'commit':  _git_commit(),
+        'python':  platform.python_version(),
+        'results': results,
+    }
+
+
+def _format_result(result: Mapping[str, Any]) -> str:
+    phases = ', '.join(
+        '{}={:.3f}s'.format(phase, result['seconds'][phase]) for phase in PHASES
+    )
+    return '{:>5} entities: {}, peak_rss={}MB'.format(
+        result['entities'], phases, result['peak_rss_kb'] // 1024,
+    )
+
+
+def compare(before: Mapping[str, Any], after: Mapping[str, Any]) -> str:
+    """Return a table of the change in every phase between two runs"""
+    before_by_size = {r['entities']: r for r in before['results']}
+    lines = ['{:>8} {:<36} {:>10} {:>10} {:>8}'.format('entities', 'phase', 'before', 'after', 'change')]
+    for result in after['results']:
+        previous = before_by_size.get(result['entities'])
+        if previous is None:
+            continue
+        # Runs from before a phase was renamed do not have it
+        measurements = [
+            (phase, previous['seconds'][phase], result['seconds'][phase])
+            for phase in PHASES if phase in previous['seconds'] and phase in result['seconds']
+        ]
+        measurements.append(('peak_rss_kb', previous['peak_rss_kb'], result['peak_rss_kb']))
+        for name, old, new in measurements:
+            change = '{:+.1%}'.format((new - old) / old) if old else 'n/a'
+            lines.append('{:>8} {:<36} {:>10.3f} {:>10.3f} {:>8}'.format(result['entities'], name, old, new, change))
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output', help='file to write the JSON results to')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'))
+    parser.add_argument('--single', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.single is not None:
+        json.dump(benchmark_size(args.single, args.workers), sys.stdout)
+    elif args.compare:
+        with open(args.compare[0]) as before, open(args.compare[1]) as after:
+            print(compare(json.load(before), json.load(after)))
+    else:
+        results = run_benchmarks(args.sizes, args.workers)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(results, f, indent=2)
+        else:
+            json.dump(results, sys.stdout, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+Feature: Conditional requests
+
+  Background:
+    Given I have the example "bookshop" application
+    And I put an example "book" entity
+
+  Scenario: Getting an unchanged book
+    When I get that "book" entity with "expand=0,fields=id,fields=name,fields=author"
+     And I get that "book" entity with "expand=0,fields=id,fields=name,fields=author" and the ETag of the previous response
+    Then I get http status "304"
+
+  Scenario: Getting a changed book
+    When I get that "book" entity with "expand=0,fields=id,fields=name,fields=author"
+     And I patch that "book" entity to set "name" to "Changed"
+     And I get that "book" entity with "expand=0,fields=id,fields=name,fields=author" and the ETag of the previous response
+    Then I get http status "200"
+
+  Scenario: Getting an unchanged book with its relationships
+    When I get that "book" entity with "expand=1"
+     And I get that "book" entity with "expand=1" and the ETag of the previous response
+    Then I get http status "304"
+
+  Scenario: Getting a book after its embedded author changes
+    Given I put an example "author" entity
+      And I put a book entity with a relationship to that author
+    When I get that "book" entity with "expand=1"
+     And I patch that "author" entity to set "name" to "Changed"
+     And I get that "book" entity with "expand=1" and the ETag of the previous response
+    Then I get http status "200"
+
+  Scenario: Listing books after an embedded author changes
+    Given I put an example "author" entity
+      And I put a book entity with a relationship to that author
+    When I list "book" filtered by "limit=2"
+     And I patch that "author" entity to set "name" to "Changed"
+     And I list "book" filtered by "limit=2" with the ETag of the previous response
+    Then I get http status "200"
+
+  Scenario: Listing unchanged books with their relationships
+    When I list "book" filtered by "limit=2"
+     And I list "book" filtered by "limit=2" with the ETag of the previous response
+    Then I get http status "304"
+
+  Scenario: Listing unchanged books
+    When I list "book" filtered by "limit=2,expand=0,fields=id,fields=author"
+     And I list "book" filtered by "limit=2,expand=0,fields=id,fields=author" with the ETag of the previous response
+    Then I get http status "304"
+
+  Scenario: Listing books after one is deleted
+    Given I put an example "book" entity called "other_book"
+    When I list "book" filtered by "limit=2,expand=0,fields=id,fields=author"
+     And I delete the "book" called "other_book"
+     And I list "book" filtered by "limit=2,expand=0,fields=id,fields=author" with the ETag of the previous response
+    Then I get http status "200"
+     And I have "1" results
+
+  Scenario: Listing books after one on the page is replaced by the next
+    Given I put an example "book" entity called "other_book"
+      And I put an example "book" entity called "third_book"
+      And I put an example "book" entity called "fourth_book"
+    When I list "book" filtered by "limit=2,expand=0,fields=id"
+     And I delete the "book" called "other_book"
+     And I list "book" filtered by "limit=2,expand=0,fields=id" with the ETag of the previous response
+    Then I get http status "200"
+     And I have "2" results
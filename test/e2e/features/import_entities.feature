@@ -0,0 +1,24 @@
+Feature: Importing entities in bulk
+
+  Background:
+    Given I have the example "bookshop" application
+      And I put an example "author" entity called "camus"
+
+  Scenario: Importing newline delimited JSON
+    When I import books as "ndjson" with an author from "camus"
+    Then "2" rows were imported with errors in rows "2,3"
+    When I list "book" filtered by "name=Stranger"
+    Then I have "1" results
+
+  Scenario: Importing a JSON array
+    When I import books as "array" with an author from "camus"
+    Then "2" rows were imported with errors in rows "2,3"
+
+  Scenario: Importing malformed and duplicate identifiers
+    Given I put an example "book" entity called "plague"
+    When I import books with malformed and duplicate identifiers of "plague"
+    Then "2" rows were imported with errors in rows "0,1,2,5"
+
+  Scenario: Importing a JSON array which is not valid JSON
+    When I import books as a JSON array which is cut short
+    Then the import failed as invalid JSON after "0" rows were imported
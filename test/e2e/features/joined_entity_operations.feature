@@ -45,3 +45,21 @@ Feature: Posting new entities with foreign keys
      When I "post" a "book_genre" join entity
      Then I can see that genre in the response from "book/{id}/genres"
 
+
+  Scenario: Getting an entity without expanding its relationships
+    Given I put an example "author" entity
+      And I put a book entity with a relationship to that author
+     When I get that "author" entity expanded "0" levels
+     Then "books.0" in the response is the identifier of that "book" entity
+
+  Scenario: Getting an entity with the relationships of its relationships
+    Given I put an example "author" entity
+      And I put a book entity with a relationship to that author
+     When I get that "author" entity expanded "2" levels
+     Then "books.0.author" in the response is that "author" entity
+
+  Scenario: Getting the relationships of the deepest expanded entities as identifiers
+    Given I put an example "author" entity
+      And I put a book entity with a relationship to that author
+     When I get that "author" entity expanded "1" levels
+     Then "books.0.author" in the response is the identifier of that "author" entity
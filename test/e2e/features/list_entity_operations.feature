@@ -15,3 +15,81 @@ Feature: Listing and filtering entities
   Scenario: Filtering by rating
     When I list "book" filtered by "rating=3.2"
     Then I have "2" results
+
+  Scenario: Paging through books
+    When I list "book" filtered by "limit=2"
+    Then I have "2" results
+     And there is a next page
+    When I follow the next page link
+    Then I have "1" results
+     And there is no next page
+
+  Scenario: Paging with a filter
+    When I list "book" filtered by "rating=3.2,limit=1"
+    Then I have "1" results
+    When I follow the next page link
+    Then I have "1" results
+     And there is no next page
+
+  Scenario: Listing with an invalid cursor
+    When I list "book" filtered by "cursor=not-a-cursor"
+    Then I get http status "400"
+
+  Scenario: Exporting books
+    When I export "book" filtered by "rating=3.2"
+    Then the export has "2" rows
+
+  Scenario: Deleting filtered books
+    When I delete "book" filtered by "rating=3.2"
+    Then I get http status "204"
+    When I list "book" filtered by "limit=10"
+    Then I have "1" results
+
+  Scenario: Listing some fields of books
+    When I list "book" filtered by "fields=id,fields=name"
+    Then I have "3" results
+     And every result only has the keys "id,name"
+
+  Scenario: Listing an unknown field
+    When I list "book" filtered by "fields=isbn"
+    Then I get http status "400"
+
+  Scenario: Filtering by a range of ratings
+    When I list "book" filtered by "rating[gte]=3,rating[lt]=4"
+    Then I have "2" results
+
+  Scenario: Filtering by a name prefix
+    When I list "book" filtered by "name[prefix]=Jungle"
+    Then I have "1" results
+
+  Scenario: Filtering by an invalid rating
+    When I list "book" filtered by "rating[gt]=high"
+    Then I get http status "400"
+
+  Scenario: Sorting by name
+    When I list "book" filtered by "sort=name"
+    Then the results are named "Jungle Book,Peter Rabbit,Wind in the Willows"
+
+  Scenario: Paging through books sorted by descending rating
+    When I list "book" filtered by "sort=-rating,limit=2"
+    Then the results are named "Jungle Book,Peter Rabbit"
+    When I follow the next page link
+    Then the results are named "Wind in the Willows"
+     And there is no next page
+
+  Scenario: Sorting by a column which is not sortable
+    When I list "book" filtered by "sort=published"
+    Then I get http status "400"
+
+  Scenario: Counting filtered books
+    When I count "book" filtered by "rating=3.2"
+    Then the total count is "2"
+
+  Scenario: Listing a page of books with their total count
+    When I list "book" filtered by "total_count=true,limit=1"
+    Then I have "1" results
+     And the total count is "3"
+
+  Scenario: Filtering by a name prefix is case sensitive
+    When I list "book" filtered by "name[prefix]=jungle"
+    Then I have "0" results
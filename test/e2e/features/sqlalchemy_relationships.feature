@@ -51,3 +51,31 @@ Feature: SQLAlchemy relationships
       Then "sql_book.related_books" should have "2" items in it
       When I get the "book" called "myThirdBook" SQLAlchemy model
       Then "sql_book.related_books" should have "0" items in it
+
+  Scenario: Deleting an author deletes their books in the database
+    Given I put an example "author" entity
+      And I put a book entity with a relationship to that author
+     When I delete that "author" entity
+     Then that "author" entity no longer exists
+      And that "book" entity no longer exists
+
+  Scenario: Deleting a favourite author unsets it
+    Given I put an example "author" entity called "author1"
+      And I put an example "author" entity called "author2" with a "favouriteAuthorId" from "author1"
+     When I delete the "author" called "author1"
+      And I get the "author" called "author2" SQLAlchemy model
+     Then "sql_author.favourite_author" should be None
+
+  Scenario: Deleting a book with related books
+    Given I put an example "book" entity called "myFirstBook"
+      And I put an example "book" entity called "mySecondBook"
+      And I put an example "related-book" entity called "join1" joining "myFirstBook" to "mySecondBook"
+     When I delete the "book" called "myFirstBook"
+     Then the "related-book" called "join1" no longer exists
+
+  Scenario: Writing a relationship to an author another process deleted
+    Given I put an example "author" entity
+      And I put a book entity with a relationship to that author
+      And another process deletes that "author" entity
+     When I put another book with a relationship to that author
+     Then I get http status "400"
@@ -0,0 +1,20 @@
+import inflection
+from expects import expect, equal
+from mamba import description, it
+
+from bookshop.core.convert_case import to_json_name, to_python_name, _JSON_NAMES, _PYTHON_NAMES
+
+with description('convert_case'):
+    with it('has a generated table entry for every known property'):
+        for python_name, json_name in _JSON_NAMES.items():
+            expect(json_name).to(equal(inflection.camelize(python_name, False)))
+        for json_name, python_name in _PYTHON_NAMES.items():
+            expect(python_name).to(equal(inflection.underscore(json_name)))
+
+    with it('converts names which are not in the generated tables'):
+        expect(to_json_name('not_a_column_name')).to(equal('notAColumnName'))
+        expect(to_python_name('notAColumnName')).to(equal('not_a_column_name'))
+
+    with it('converts known names in both directions'):
+        expect(to_json_name('favourite_author_id')).to(equal('favouriteAuthorId'))
+        expect(to_python_name('favouriteAuthorId')).to(equal('favourite_author_id'))
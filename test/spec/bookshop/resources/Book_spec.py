@@ -0,0 +1,54 @@
+import uuid
+
+from expects import expect, equal, be_below_or_equal
+from mamba import description, it
+from sqlalchemy import event
+
+from bookshop import app
+from bookshop import db
+from bookshop.sqlalchemy.model import Author, Book
+
+
+def add_books(count: int) -> None:
+    with app.app_context():
+        for _ in range(count):
+            author = Author(author_id=uuid.uuid4(), name='author')
+            collaborator = Author(author_id=uuid.uuid4(), name='collaborator')
+            db.session.add_all([author, collaborator])
+            db.session.flush()
+            db.session.add(Book(
+                book_id=uuid.uuid4(), name='book', rating=1.0, author_id=author.id, collaborator_id=collaborator.id,
+            ))
+        db.session.commit()
+
+
+def count_queries(url: str) -> int:
+    statements = []
+
+    def record(conn, cursor, statement, *args):  # type: ignore
+        statements.append(statement)
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            response = app.test_client().get(url)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+    expect(response.status_code).to(equal(200))
+    return len(statements)
+
+
+with description('book resource') as self:
+    with it('lists books with a query per relationship, whatever the number of books'):
+        add_books(2)
+        few_books = count_queries('/book')
+        add_books(20)
+
+        expect(count_queries('/book')).to(equal(few_books))
+        # The books, then the books and collaborations of their authors and collaborators
+        expect(few_books).to(be_below_or_equal(5))
+
+    with it('lists books without expanding them in a single query'):
+        add_books(2)
+
+        expect(count_queries('/book?expand=0')).to(equal(1))
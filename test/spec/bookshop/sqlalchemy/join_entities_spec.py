@@ -0,0 +1,91 @@
+import uuid
+
+from expects import expect, equal, have_len, be_a
+from mamba import description, it, before
+from sqlalchemy import event
+
+from bookshop import app
+from bookshop import db
+from bookshop.domain.Book import book as book_domain_model
+from bookshop.sqlalchemy.model import Author
+from bookshop.sqlalchemy.identifier_cache import identifier_cache
+from bookshop.sqlalchemy.join_entities import create_joined_entity_id_map, create_joined_entity_id_maps
+
+AUTHOR_UUID =       uuid.uuid4()
+COLLABORATOR_UUID = uuid.uuid4()
+
+
+def _count_queries(fn):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        result = fn()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+    return result, len(statements)
+
+
+with description('join_entities') as self:
+    with before.all:
+        with app.app_context():
+            db.session.add_all([
+                Author(author_id=AUTHOR_UUID, name='le guin'),
+                Author(author_id=COLLABORATOR_UUID, name='tiptree'),
+            ])
+            db.session.commit()
+
+    with before.each:
+        identifier_cache.clear()
+
+    with it('resolves identifiers which share a target model in one query'):
+        with app.app_context():
+            author = Author.query.filter_by(author_id=AUTHOR_UUID).one()
+            collaborator = Author.query.filter_by(author_id=COLLABORATOR_UUID).one()
+            data = {'authorId': str(AUTHOR_UUID), 'collaboratorId': str(COLLABORATOR_UUID).upper()}
+
+            result, queries = _count_queries(lambda: create_joined_entity_id_map(book_domain_model, data))
+
+            expect(queries).to(equal(1))
+            expect(result).to(equal({'author_id': author.id, 'collaborator_id': collaborator.id}))
+
+    with it('resolves many rows in one query and reports rows with missing entities'):
+        with app.app_context():
+            rows = [
+                {'authorId': str(AUTHOR_UUID)},
+                {'authorId': str(uuid.uuid4())},
+                {'collaboratorId': str(COLLABORATOR_UUID)},
+            ]
+
+            results, queries = _count_queries(lambda: create_joined_entity_id_maps(book_domain_model, rows))
+
+            expect(queries).to(equal(1))
+            expect(results).to(have_len(3))
+            expect(results[1]).to(be_a(list))
+            expect(results[2]).to(have_len(1))
+
+    with it('does not query for identifiers which are cached'):
+        with app.app_context():
+            data = {'authorId': str(AUTHOR_UUID), 'collaboratorId': str(COLLABORATOR_UUID)}
+            first_result, _ = _count_queries(lambda: create_joined_entity_id_map(book_domain_model, data))
+
+            result, queries = _count_queries(lambda: create_joined_entity_id_map(book_domain_model, data))
+
+            expect(queries).to(equal(0))
+            expect(result).to(equal(first_result))
+
+    with it('forgets a deleted entity'):
+        with app.app_context():
+            author = Author(author_id=uuid.uuid4(), name='deleted')
+            db.session.add(author)
+            db.session.commit()
+            data = {'authorId': str(author.author_id)}
+            expect(create_joined_entity_id_map(book_domain_model, data)).to(have_len(1))
+
+            db.session.delete(author)
+            db.session.commit()
+
+            expect(create_joined_entity_id_map(book_domain_model, data)).to(be_a(list))
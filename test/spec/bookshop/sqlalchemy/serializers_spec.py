@@ -0,0 +1,95 @@
+import datetime
+import uuid
+
+from expects import expect, equal
+from mamba import description, it, before
+
+from bookshop import app
+from bookshop import db
+from bookshop.core.convert_dict import python_dict_to_json_dict
+from bookshop.sqlalchemy.model import Book, Author
+from bookshop.sqlalchemy.model_to_dict import model_to_dict
+from bookshop.sqlalchemy.serializers import serialize_author, serialize_book
+
+AUTHOR_UUID =       uuid.uuid4()
+COLLABORATOR_UUID = uuid.uuid4()
+BOOK_UUID =         uuid.uuid4()
+
+with description('serializers') as self:
+    with before.all:
+        with app.app_context():
+            author = Author(author_id=AUTHOR_UUID, name='le guin')
+            collaborator = Author(author_id=COLLABORATOR_UUID, name='tiptree')
+            db.session.add_all([author, collaborator])
+            db.session.flush()
+            db.session.add(Book(
+                book_id=BOOK_UUID, name='the dispossessed', rating=4.6, author_id=author.id,
+                collaborator_id=collaborator.id, published=datetime.date(1974, 5, 1),
+            ))
+            db.session.commit()
+
+    with it('serializes a book like model_to_dict, with the embedded rows\' relationships as identifiers'):
+        with app.app_context():
+            book = Book.query.filter_by(book_id=BOOK_UUID).one()
+            result = serialize_book(book)
+            expected = python_dict_to_json_dict(model_to_dict(book))
+
+        expected['author'].update(books=[str(BOOK_UUID)], favouriteBook=str(BOOK_UUID), collaborations=[])
+        expected['collaborator'].update(books=[], favouriteBook=None, collaborations=[str(BOOK_UUID)])
+        expect(result).to(equal(expected))
+
+    with it('serializes an author with to-many eager relationships like model_to_dict'):
+        with app.app_context():
+            author = Author.query.filter_by(author_id=AUTHOR_UUID).one()
+            result = serialize_author(author)
+            expected = python_dict_to_json_dict(model_to_dict(author))
+
+        for book in [*expected['books'], expected['favouriteBook']]:
+            book.update(author=str(AUTHOR_UUID), collaborator=str(COLLABORATOR_UUID), genre=None)
+        expect(result).to(equal(expected))
+
+    with it('gives the relationships of rows at the deepest level as identifiers'):
+        with app.app_context():
+            author = Author.query.filter_by(author_id=AUTHOR_UUID).one()
+            result = serialize_author(author, depth=1)
+
+        expect(result['books'][0]['author']).to(equal(str(AUTHOR_UUID)))
+        expect(result['favouriteBook']['collaborator']).to(equal(str(COLLABORATOR_UUID)))
+
+    with it('converts identifiers and dates to strings'):
+        with app.app_context():
+            book = Book.query.filter_by(book_id=BOOK_UUID).one()
+            result = serialize_book(book)
+
+        expect(result['id']).to(equal(str(BOOK_UUID)))
+        expect(result['published']).to(equal('1974-05-01'))
+        expect(result['collaborator']['id']).to(equal(str(COLLABORATOR_UUID)))
+
+    with it('replaces eager relationships with their identifiers at depth 0'):
+        with app.app_context():
+            author = Author.query.filter_by(author_id=AUTHOR_UUID).one()
+            result = serialize_author(author, depth=0)
+
+        expect(result['books']).to(equal([str(BOOK_UUID)]))
+        expect(result['favouriteBook']).to(equal(str(BOOK_UUID)))
+
+    with it('embeds the eager relationships of related rows at depth 2'):
+        with app.app_context():
+            author = Author.query.filter_by(author_id=AUTHOR_UUID).one()
+            result = serialize_author(author, depth=2)
+
+        expect(result['books'][0]['author']['id']).to(equal(str(AUTHOR_UUID)))
+        expect(result['books'][0]['collaborator']['id']).to(equal(str(COLLABORATOR_UUID)))
+
+    with it('only serializes the requested fields'):
+        with app.app_context():
+            book = Book.query.filter_by(book_id=BOOK_UUID).one()
+            result = serialize_book(book, fields=['name', 'author'])
+
+        expect(result).to(equal({
+            'name': 'the dispossessed',
+            'author': {
+                'id': str(AUTHOR_UUID), 'name': 'le guin', 'favouriteAuthor': None, 'hatedAuthor': None,
+                'books': [str(BOOK_UUID)], 'favouriteBook': str(BOOK_UUID), 'collaborations': [],
+            },
+        }))
@@ -1,8 +1,11 @@
-from expects import expect, have_property, be_a, equal
+import warnings
+
+from expects import expect, have_property, be_a, be_false, be_true, equal, be_empty, have_len, raise_error
 from mamba import description, it
 
-from genyrator import create_column, TypeOption, Column
+from genyrator import create_column, TypeOption, Column, FilterOperator
 from genyrator.entities.Column import ForeignKey, ForeignKeyRelationship
+from genyrator.errors import GenyratorError
 
 with description('create_column'):
     with it('does not create a foreign key if no relationship is specified'):
@@ -24,3 +27,69 @@ with description('create_column'):
 
         expect(column).to(be_a(ForeignKey))
         expect(column.relationship).to(equal('entity_table.id'))
+
+    with it('indexes foreign keys unless told not to'):
+        def foreign_key(**kwargs):
+            return create_column(
+                name='test_id', type_option=TypeOption.int,
+                foreign_key_relationship=ForeignKeyRelationship(
+                    target_entity='EntityTable',
+                    target_entity_identifier_column_type=TypeOption.UUID,
+                ),
+                **kwargs,
+            )
+
+        expect(foreign_key().index).to(be_true)
+        expect(foreign_key(index=False).index).to(be_false)
+        expect(create_column(name='test', type_option=TypeOption.int, filter_operators=[]).index).to(be_false)
+
+    with it('gives orderable columns comparison filter operators'):
+        column = create_column(name='rating', type_option=TypeOption.float, index=True)
+
+        expect(column.filter_operators).to(equal([
+            FilterOperator.lt, FilterOperator.lte, FilterOperator.gt, FilterOperator.gte,
+        ]))
+
+    with it('does not give foreign keys filter operators'):
+        column = create_column(
+            name='test_id', type_option=TypeOption.int,
+            foreign_key_relationship=ForeignKeyRelationship(
+                target_entity='EntityTable',
+                target_entity_identifier_column_type=TypeOption.UUID,
+            )
+        )
+
+        expect(column.filter_operators).to(be_empty)
+
+    with it('does not give columns without an index filter operators'):
+        column = create_column(name='rating', type_option=TypeOption.float)
+
+        expect(column.filter_operators).to(be_empty)
+
+    with it('warns when filter operators are given for a column with no index'):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            create_column(name='name', type_option=TypeOption.string)
+            create_column(name='name', type_option=TypeOption.string, index=True)
+            create_column(name='name', type_option=TypeOption.string, filter_operators=[])
+            create_column(name='name', type_option=TypeOption.string, filter_operators=[FilterOperator.prefix])
+
+        expect(caught).to(have_len(1))
+
+    with it('does not allow filter operators which do not suit the type'):
+        expect(lambda: create_column(
+            name='flag', type_option=TypeOption.bool, index=True, filter_operators=[FilterOperator.lt],
+        )).to(raise_error(GenyratorError))
+        expect(lambda: create_column(
+            name='rating', type_option=TypeOption.int, index=True, filter_operators=[FilterOperator.prefix],
+        )).to(raise_error(GenyratorError))
+
+    with it('makes indexed columns which are not nullable sortable'):
+        expect(create_column(name='name', type_option=TypeOption.string, index=True, nullable=False).sortable).to(be_true)
+        expect(create_column(name='name', type_option=TypeOption.string, index=True).sortable).to(be_false)
+        expect(create_column(name='name', type_option=TypeOption.string, nullable=False).sortable).to(be_false)
+
+    with it('does not allow nullable columns to be sortable'):
+        expect(lambda: create_column(
+            name='name', type_option=TypeOption.string, index=True, sortable=True,
+        )).to(raise_error(GenyratorError))
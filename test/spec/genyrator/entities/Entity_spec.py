@@ -1,7 +1,8 @@
 from mamba import description, it
-from expects import expect, equal
+from expects import expect, equal, raise_error
 
 from genyrator.entities.Entity import create_entity
+from genyrator.errors import GenyratorError
 from genyrator.entities.Column import create_column, create_identifier_column
 from genyrator.types import TypeOption
 
@@ -32,3 +33,55 @@ with description('create_entity'):
         )
 
         expect(entity.uniques).to(equal([['test_id']]))
+
+    with it('caps the expand depth at the default expand depth unless given'):
+        entity = create_entity(
+            'Test', create_identifier_column('test_id', TypeOption.string), [], default_expand_depth=2,
+        )
+
+        expect(entity.max_expand_depth).to(equal(2))
+
+    with it('does not allow a default expand depth beyond the maximum'):
+        expect(lambda: create_entity(
+            'Test', create_identifier_column('test_id', TypeOption.string), [],
+            default_expand_depth=2, max_expand_depth=1,
+        )).to(raise_error(GenyratorError))
+
+    with it('adds composite indexes to the table args'):
+        entity = create_entity(
+            'Test',
+            create_identifier_column('test_id', TypeOption.string),
+            [
+                create_column('name', TypeOption.string, index=False, nullable=True),
+                create_column('rating', TypeOption.float, index=False, nullable=True),
+            ],
+            indexes=[['name', 'rating']],
+        )
+
+        expect(entity.table_args).to(equal(
+            "(UniqueConstraint('test_id', ), Index('ix_test_name_rating', 'name', 'rating', ), )"
+        ))
+
+    with it('does not allow indexes on unknown columns'):
+        expect(lambda: create_entity(
+            'Test', create_identifier_column('test_id', TypeOption.string), [], indexes=[['name']],
+        )).to(raise_error(GenyratorError))
+
+    with it('only accepts datetime or int version columns'):
+        def entity(type_option):
+            return create_entity(
+                'Test', create_identifier_column('test_id', TypeOption.string),
+                [create_column('updated', type_option, nullable=True)], version_column='updated',
+            )
+
+        expect(entity(TypeOption.datetime).version_column).to(equal('updated'))
+        expect(lambda: entity(TypeOption.string)).to(raise_error(GenyratorError))
+        expect(lambda: create_entity(
+            'Test', create_identifier_column('test_id', TypeOption.string), [], version_column='updated',
+        )).to(raise_error(GenyratorError))
+
+    with it('only deletes every row of an entity when asked to'):
+        entity = create_entity('Test', create_identifier_column('test_id', TypeOption.string), [])
+
+        expect(entity.supports_delete_all).to(equal(False))
+        expect(entity.supports_delete_one).to(equal(True))
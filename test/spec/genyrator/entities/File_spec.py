@@ -0,0 +1,96 @@
+import os
+import tempfile
+
+from expects import expect, equal, be_true, be_false, have_key
+from mamba import description, it
+
+from genyrator.entities.Entity import create_entity
+from genyrator.entities.Column import create_column, create_identifier_column
+from genyrator.entities.File import File, Manifest, create_files_from_template_config
+from genyrator.template_config import create_template_config
+from genyrator.types import TypeOption
+
+
+def _create_test_template_config():
+    entities = [
+        create_entity(
+            class_name,
+            create_identifier_column('test_id', TypeOption.UUID),
+            [create_column('name', TypeOption.string, index=True, nullable=False)],
+        )
+        for class_name in ['Test', 'OtherTest']
+    ]
+    return create_template_config(
+        module_name='test_module', db_import_path='test_module.sqlalchemy', entities=entities,
+        api_name='test', api_description='',
+    )
+
+
+class CountingTemplate:
+    def __init__(self):
+        self.renders = 0
+
+    def render(self):
+        self.renders += 1
+        return 'x = 1\n'
+
+    def generate(self):
+        yield 'x = '
+        yield '1\n'
+
+
+def _files_to_tuples(file_list):
+    return [[(f.file_name, f.file_path, f.contents) for f in files] for files in file_list]
+
+
+with description('create_files_from_template_config'):
+    with it('renders the same files in order when using workers'):
+        template_config = _create_test_template_config()
+
+        in_process = create_files_from_template_config(['test_module'], template_config)
+        in_workers = create_files_from_template_config(['test_module'], template_config, workers=2)
+
+        expect(_files_to_tuples(in_workers)).to(equal(_files_to_tuples(in_process)))
+
+    with it('does not rewrite a file with identical contents'):
+        with tempfile.TemporaryDirectory() as directory:
+            file = File(file_name='test.py', file_path=[directory], contents='x = 1\n')
+            manifest: Manifest = {}
+
+            expect(file.write(manifest)).to(be_true)
+            expect(file.write(manifest)).to(be_false)
+            expect(manifest).to(have_key(file.path))
+
+    with it('rewrites a file which was changed after it was written'):
+        with tempfile.TemporaryDirectory() as directory:
+            file = File(file_name='test.py', file_path=[directory], contents='x = 1\n')
+            manifest: Manifest = {}
+            file.write(manifest)
+            with open(file.path, 'w') as f:
+                f.write('x = 2\n')
+
+            expect(file.write(manifest)).to(be_true)
+            with open(file.path) as f:
+                expect(f.read()).to(equal('x = 1\n'))
+
+    with it('does not render a template until its contents are needed'):
+        template = CountingTemplate()
+        file = File(file_name='test.py', file_path=['test_module'], template=template)
+
+        expect(template.renders).to(equal(0))
+        expect(file.contents).to(equal('x = 1\n'))
+        expect(file.contents).to(equal('x = 1\n'))
+        expect(template.renders).to(equal(1))
+
+    with it('streams an unrendered template straight to disk'):
+        with tempfile.TemporaryDirectory() as directory:
+            template = CountingTemplate()
+            file = File(file_name='test.py', file_path=[directory], template=template)
+            manifest: Manifest = {}
+
+            expect(file.write(manifest)).to(be_true)
+            expect(file.write(manifest)).to(be_false)
+            expect(template.renders).to(equal(0))
+            expect(os.listdir(directory)).to(equal(['test.py']))
+            with open(file.path) as f:
+                expect(f.read()).to(equal('x = 1\n'))
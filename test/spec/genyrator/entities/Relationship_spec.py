@@ -0,0 +1,36 @@
+from expects import expect, equal, raise_error
+from mamba import description, it
+
+from genyrator import create_relationship, JoinOption, LoadingStrategy
+from genyrator.errors import GenyratorError
+
+with description('create_relationship'):
+    with it('loads embedded relationships with a join by default'):
+        relationship = create_relationship(
+            'Book', nullable=False, lazy=False, join=JoinOption.to_many,
+            source_identifier_column_name='author_id', target_identifier_column_name='book_id',
+        )
+
+        expect(relationship.loading).to(equal(LoadingStrategy.joined))
+
+    with it('loads lazy relationships on access by default'):
+        relationship = create_relationship(
+            'Book', nullable=False, lazy=True, join=JoinOption.to_many,
+            source_identifier_column_name='author_id', target_identifier_column_name='book_id',
+        )
+
+        expect(relationship.loading).to(equal(LoadingStrategy.select))
+
+    with it('keeps a given loading strategy'):
+        relationship = create_relationship(
+            'Book', nullable=False, lazy=False, join=JoinOption.to_many, loading=LoadingStrategy.selectin,
+            source_identifier_column_name='author_id', target_identifier_column_name='book_id',
+        )
+
+        expect(relationship.loading).to(equal(LoadingStrategy.selectin))
+
+    with it('does not allow embedded relationships which are never loaded'):
+        expect(lambda: create_relationship(
+            'Book', nullable=False, lazy=False, join=JoinOption.to_many, loading=LoadingStrategy.noload,
+            source_identifier_column_name='author_id', target_identifier_column_name='book_id',
+        )).to(raise_error(GenyratorError))
@@ -0,0 +1,45 @@
+import os
+import tempfile
+
+from expects import expect, contain, equal
+from mamba import description, it
+
+from genyrator.entities.Entity import create_entity
+from genyrator.entities.Column import create_column, create_identifier_column
+from genyrator.entities.Schema import create_schema
+from genyrator.types import TypeOption
+
+
+def _create_test_schema(directory: str):
+    entity = create_entity(
+        'Test',
+        create_identifier_column('test_id', TypeOption.UUID),
+        [create_column('name', TypeOption.string, index=True, nullable=False)],
+    )
+    return create_schema(module_name='test_module', entities=[entity], file_path=[directory, 'test_module'])
+
+
+def _bytecode_mtimes(directory: str):
+    return {
+        os.path.join(root, name): os.stat(os.path.join(root, name)).st_mtime_ns
+        for root, _, names in os.walk(directory)
+        for name in names
+        if name.endswith('.pyc')
+    }
+
+
+with description('Schema.write_files'):
+    with it('compiles the generated module to bytecode'):
+        with tempfile.TemporaryDirectory() as directory:
+            _create_test_schema(directory).write_files(compile_bytecode=True)
+
+            expect(os.listdir(os.path.join(directory, 'test_module', 'resources'))).to(contain('__pycache__'))
+
+    with it('does not recompile modules which were not rewritten'):
+        with tempfile.TemporaryDirectory() as directory:
+            _create_test_schema(directory).write_files(compile_bytecode=True)
+            compiled = _bytecode_mtimes(directory)
+
+            _create_test_schema(directory).write_files(compile_bytecode=True)
+
+            expect(_bytecode_mtimes(directory)).to(equal(compiled))
@@ -0,0 +1,31 @@
+import os
+import tempfile
+
+from expects import expect, be, be_empty, equal
+from mamba import description, it
+
+from genyrator.template_environment import create_environment, get_environment
+
+with description('template environment'):
+    with it('compiles each template once'):
+        environment = create_environment()
+
+        expect(environment.get_template('config.j2')).to(be(environment.get_template('config.j2')))
+
+    with it('shares one environment across the process'):
+        expect(get_environment()).to(be(get_environment()))
+
+    with it('writes compiled templates to the bytecode cache'):
+        with tempfile.TemporaryDirectory() as cache_path:
+            create_environment(cache_path).get_template('config.j2')
+
+            expect(os.listdir(cache_path)).not_to(be_empty)
+
+    with it('renders the same output from the bytecode cache'):
+        with tempfile.TemporaryDirectory() as cache_path:
+            cold = create_environment(cache_path).get_template('config.j2')
+            warm = create_environment(cache_path).get_template('config.j2')
+
+            expect(warm.render(template={'module_name': 'test'})).to(
+                equal(cold.render(template={'module_name': 'test'}))
+            )